@@ -0,0 +1,103 @@
+"""Benchmark for follow mode: detection latency and idle CPU against a live writer.
+
+A writer process appends synthetic syslog lines to two logs, each batch with
+a probe domain carrying its write time. Halfway through it rotates one log
+(rename, then a new file) and truncates the other, the way copytruncate
+does. The follower runs here and every probe must be reported exactly once;
+latency is the time from the probe being written to it being reported.
+
+Usage: python benchmarks/bench_follow.py [seconds] [lines_per_second]
+"""
+from datetime import datetime
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from follow import Follower
+from synthetic import iter_lines
+
+IDLE_SECONDS = 3
+CONFIG = {
+    'analysis': {'ioc_types': ['ip', 'domain', 'hash', 'email']},
+    'follow': {'poll_interval': 0.1, 'max_interval': 1.0}
+}
+
+
+def write_logs(paths, seconds, rate, probes):
+    """Append rate lines a second to paths for seconds; put the probe count on probes."""
+    lines = iter_lines('syslog', 0.1, seed=11)
+    files = [open(path, 'a') for path in paths]
+    batch = max(1, rate // 20)
+    count = 0
+    start = time.time()
+    changed = False
+    while time.time() - start < seconds:
+        if not changed and time.time() - start > seconds / 2:
+            files[0].close()
+            os.rename(paths[0], paths[0] + '.1')
+            files[0] = open(paths[0], 'a')
+            # copytruncate loses lines not yet read, so give the follower a poll first
+            time.sleep(CONFIG['follow']['max_interval'] * 1.5)
+            files[1].truncate(0)
+            files[1].seek(0)
+            changed = True
+        for f in files:
+            f.writelines(next(lines) for _ in range(batch))
+            f.write(f"probe from p{count}-{time.time_ns()}.probe.example\n")
+            f.flush()
+            count += 1
+        time.sleep(0.05)
+    for f in files:
+        f.close()
+    probes.put(count)
+
+
+async def follow(follower, seconds, marks):
+    loop = asyncio.get_running_loop()
+    loop.call_later(seconds + 1, lambda: marks.__setitem__('idle', time.process_time()))
+    await follower.follow(seconds + 1 + IDLE_SECONDS)
+    marks['end'] = time.process_time()
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 6
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, name) for name in ('a.log', 'b.log')]
+        for path in paths:
+            open(path, 'w').close()
+        output = io.StringIO()
+        follower = Follower(CONFIG, paths, output)
+        probes = multiprocessing.Queue()
+        writer = multiprocessing.Process(target=write_logs, args=(paths, seconds, rate, probes))
+        writer.start()
+        marks = {}
+        asyncio.run(follow(follower, seconds, marks))
+        writer.join()
+        written = probes.get()
+
+    latencies = []
+    for line in output.getvalue().splitlines():
+        record = json.loads(line)
+        if record['value'].endswith('.probe.example'):
+            written_ns = int(record['value'].split('-')[1].split('.')[0])
+            detected = datetime.fromisoformat(record['detected']).timestamp()
+            latencies.append(detected - written_ns / 1e9)
+    latencies.sort()
+    print(f"probes written {written}, reported {len(latencies)}; {follower.reported} new indicators in total")
+    print(f"latency p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms  max {latencies[-1] * 1000:7.1f} ms")
+    print(f"idle CPU {(marks['end'] - marks['idle']) / IDLE_SECONDS * 100:.2f}% of a core")
+    return 0 if len(latencies) == written else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Render time and peak memory of the HTML report against timeline size.
+
+Compares rendering the whole report into one string (the original approach)
+with the streamed, paged HTMLReporter.
+
+Usage: python benchmarks/bench_html_report.py [max_events]
+"""
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from jinja2 import Template
+from reporting.html_reporter import HTMLReporter
+
+TEMPLATES = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+SINGLE_PAGE = """<html><body>
+{% for type, values in iocs.items() %}<h3>{{ type }}</h3><ul>{% for value in values %}<li>{{ value }}</li>{% endfor %}</ul>{% endfor %}
+{% for event in timeline %}<div><strong>{{ event.timestamp }}</strong> [{{ event.source }}]<br>{{ event.description }}</div>{% endfor %}
+</body></html>"""
+
+
+def events(count):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        yield {
+            'timestamp': start + timedelta(seconds=i),
+            'source': 'Log File',
+            'type': 'Log Entry',
+            'description': f"Jan  1 host sshd[{1000 + i % 5000}]: Failed password for root from 10.0.{i % 256}.{i % 250} port 22"
+        }
+
+
+def measure(render):
+    # Time and memory are measured in separate runs since tracemalloc slows allocation
+    start = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    max_events = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    iocs = {'ip': [f"10.0.{i // 256}.{i % 256}" for i in range(5000)]}
+    sizes = [size for size in (1000, 10000, 100000, 1000000) if size <= max_events]
+    with tempfile.TemporaryDirectory() as report_path:
+        config = {'reporting': {
+            'company_name': 'Benchmark', 'template_path': TEMPLATES,
+            'template_cache': os.path.join(report_path, 'cache')
+        }}
+        for size in sizes:
+            def single():
+                html = Template(SINGLE_PAGE).render(iocs=iocs, timeline=list(events(size)))
+                with open(os.path.join(report_path, 'single.html'), 'w') as f:
+                    f.write(html)
+
+            def streamed():
+                HTMLReporter(config).generate_report(iocs, events(size), [], report_path)
+
+            single_time, single_peak = measure(single)
+            stream_time, stream_peak = measure(streamed)
+            print(f"{size:8d} events  single {single_time:6.2f} s {single_peak:8.1f} MB  "
+                  f"streamed {stream_time:6.2f} s {stream_peak:8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Throughput benchmark for the single-pass IOC scanner.
+
+Usage: python benchmarks/bench_ioc_scanner.py [size_mb]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.ioc_extractor import IOCExtractor
+
+CONFIG = {'analysis': {'ioc_types': ['ip', 'domain', 'hash', 'email'], 'timeline_max_events': 1000}}
+
+
+def write_corpus(path, size_mb, seed=1337):
+    rng = random.Random(seed)
+    templates = [
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host sshd[{pid}]: Accepted password for root from {ip} port {port} ssh2\n",
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host sshd[{pid}]: Failed password for invalid user admin from {ip} port {port} ssh2\n",
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host CRON[{pid}]: pam_unix(cron:session): session closed for user root\n",
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host postfix/smtpd[{pid}]: from=<{user}@{domain}> relay={domain}\n",
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host av[{pid}]: quarantined file sha256={sha}\n",
+        "Jan {d:2d} 02:{m:02d}:{s:02d} host kernel: [UFW BLOCK] IN=eth0 OUT= SRC={ip} DST={ip} PROTO=TCP\n",
+    ]
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w') as f:
+        while written < target:
+            line = rng.choice(templates).format(
+                d=rng.randint(1, 28), m=rng.randint(0, 59), s=rng.randint(0, 59),
+                pid=rng.randint(100, 65000), port=rng.randint(1024, 65535),
+                ip='.'.join(str(rng.randint(1, 254)) for _ in range(4)),
+                user=rng.choice(['alice', 'bob', 'svc.backup']),
+                domain=rng.choice(['example.com', 'evil-c2.net', 'mail.corp.local.org']),
+                sha='%064x' % rng.getrandbits(256)
+            )
+            f.write(line)
+            written += len(line)
+    return written
+
+
+def reference_extract(log_file, patterns):
+    """The original per-line, per-pattern extraction loop."""
+    found = {ioc: set() for ioc in patterns}
+    with open(log_file, 'r') as f:
+        for line in f:
+            for ioc_type, pattern in patterns.items():
+                found[ioc_type].update(re.findall(pattern, line))
+    return found
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    with tempfile.TemporaryDirectory() as evidence_path:
+        log_file = os.path.join(evidence_path, 'log_file.txt')
+        size = write_corpus(log_file, size_mb)
+        mb = size / (1024 * 1024)
+
+        patterns = IOCExtractor(CONFIG).ioc_patterns
+        expected, elapsed = timed(lambda: reference_extract(log_file, patterns))
+        print(f"reference   {mb / elapsed:8.1f} MB/s")
+
+        for mode in ('text', 'bytes'):
+            config = {'analysis': dict(CONFIG['analysis'], scan_mode=mode)}
+            found, elapsed = timed(lambda: IOCExtractor(config).extract_from_evidence(evidence_path))
+            status = 'identical' if found.to_sets() == expected else 'MISMATCH'
+            print(f"scan {mode:6s} {mb / elapsed:8.1f} MB/s  ({status})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Memory comparison of IOCStore against a dict of sets of strings.
+
+Usage: python benchmarks/bench_ioc_store.py [indicators]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.ioc_store import IOCStore
+
+
+def indicators(count, seed=7):
+    rng = random.Random(seed)
+    for position in range(count):
+        if position % 2:
+            yield 'hash', '%064x' % rng.getrandbits(256), position
+        else:
+            yield 'ip', '.'.join(str(rng.randint(1, 254)) for _ in range(4)), position
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def build_sets(count):
+    found = {'ip': set(), 'hash': set()}
+    for ioc_type, value, _ in indicators(count):
+        found[ioc_type].add(value)
+    return found
+
+
+def build_store(count):
+    store = IOCStore(['ip', 'hash'])
+    for ioc_type, value, position in indicators(count):
+        store.observe(ioc_type, value, position)
+    store.flush()
+    return store
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sets, set_bytes, set_time = measure(lambda: build_sets(count))
+    store, store_bytes, store_time = measure(lambda: build_store(count))
+    status = 'identical' if store.to_sets() == sets else 'MISMATCH'
+    print(f"dict of sets  {set_bytes / 2**20:8.1f} MiB  {set_time:6.2f}s")
+    print(f"IOCStore      {store_bytes / 2**20:8.1f} MiB  {store_time:6.2f}s  (with counts and positions, {status})")
+
+
+if __name__ == '__main__':
+    main()
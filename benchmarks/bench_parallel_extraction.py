@@ -0,0 +1,36 @@
+"""Scaling benchmark for parallel memory-mapped IOC extraction.
+
+Usage: python benchmarks/bench_parallel_extraction.py [size_mb] [max_workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.ioc_extractor import IOCExtractor
+from bench_ioc_scanner import CONFIG, write_corpus
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    with tempfile.TemporaryDirectory() as evidence_path:
+        size = write_corpus(os.path.join(evidence_path, 'log_file.txt'), size_mb)
+        mb = size / (1024 * 1024)
+        expected = None
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            config = {'analysis': dict(CONFIG['analysis'], workers=workers, chunk_size=4 << 20)}
+            start = time.perf_counter()
+            found = IOCExtractor(config).extract_from_evidence(evidence_path)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected, baseline = found.to_sets(), elapsed
+            status = 'identical' if found.to_sets() == expected else 'MISMATCH'
+            print(f"workers={workers:2d} {mb / elapsed:8.1f} MB/s  speedup {baseline / elapsed:5.2f}x  ({status})")
+
+
+if __name__ == '__main__':
+    main()
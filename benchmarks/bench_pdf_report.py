@@ -0,0 +1,46 @@
+"""Render time and peak memory of the PDF report for a large timeline.
+
+Every event is listed (no cap) and the run is checked against a time and
+memory budget.
+
+Usage: python benchmarks/bench_pdf_report.py [events] [max_seconds] [max_mb]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.ioc_store import IOCStore
+from bench_html_report import events
+from reporting.pdf_reporter import PDFReporter
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 120
+    max_mb = float(sys.argv[3]) if len(sys.argv) > 3 else 128
+    iocs = IOCStore(['ip', 'hash'])
+    for i in range(20000):
+        iocs.observe('ip', f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", i)
+    config = {'reporting': {'company_name': 'Benchmark', 'pdf_max_events': 0, 'pdf_max_iocs': 0}}
+    with tempfile.TemporaryDirectory() as report_path:
+        start = time.perf_counter()
+        PDFReporter(config).generate_report(iocs, events(count), [], report_path)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(report_path, 'report.pdf')) / (1024 * 1024)
+
+        # Memory is measured in a second run since tracemalloc slows allocation
+        tracemalloc.start()
+        PDFReporter(config).generate_report(iocs, events(count), [], report_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    peak /= 1024 * 1024
+    status = 'within budget' if elapsed <= max_seconds and peak <= max_mb else 'OVER BUDGET'
+    print(f"{count} events  {elapsed:6.2f} s  peak {peak:6.1f} MB  pdf {size:6.1f} MB  ({status})")
+
+
+if __name__ == '__main__':
+    main()
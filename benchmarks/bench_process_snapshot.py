@@ -0,0 +1,47 @@
+"""Benchmark for the /proc process snapshot on a synthetic procfs tree.
+
+Usage: python benchmarks/bench_process_snapshot.py [processes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collectors.process_collector import LinuxProcessCollector
+
+
+def write_proc_tree(root, count):
+    with open(os.path.join(root, 'stat'), 'w') as f:
+        f.write("cpu  1 2 3 4\nbtime 1700000000\n")
+    for pid in range(1, count + 1):
+        base = os.path.join(root, str(pid))
+        os.mkdir(base)
+        with open(os.path.join(base, 'stat'), 'w') as f:
+            f.write(f"{pid} (worker {pid}) S 1 {pid} {pid} 0 -1 4194560 100 0 0 0 "
+                    f"5 3 0 0 20 0 1 0 {pid * 10} 1000000 250 18446744073709551615\n")
+        with open(os.path.join(base, 'cmdline'), 'wb') as f:
+            f.write(b"/usr/bin/worker\0--id\0" + str(pid).encode() + b"\0")
+        with open(os.path.join(base, 'status'), 'w') as f:
+            f.write(f"Name:\tworker\nState:\tS (sleeping)\nPid:\t{pid}\nUid:\t1000\t1000\t1000\t1000\nThreads:\t1\n")
+        os.symlink('/usr/bin/worker', os.path.join(base, 'exe'))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None) as root:
+        write_proc_tree(root, count)
+        config = {'collection': {'linux': {'max_processes': count}}}
+        collector = LinuxProcessCollector(config, root)
+        start = time.perf_counter()
+        records = collector.snapshot()
+        elapsed = time.perf_counter() - start
+        print(f"snapshot  {len(records)} processes in {elapsed:.3f}s")
+        start = time.perf_counter()
+        rows = [record.to_dict() for record in records]
+        print(f"to_dict   {len(rows)} records in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark for startup: the import time of main and batch, measured with -X importtime.
+
+Usage: python benchmarks/bench_startup.py [runs] [--max-ms N]
+
+Fails (exit status 1) if importing them pulls in a module that should only
+load when a run selects it (see src/plugins.py), or if --max-ms is given and
+the median import time exceeds it.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+LAZY = ('reportlab', 'jinja2', 'wmi', 'win32evtlog', 'sqlite3', 'reporting', 'analysis.ioc_extractor',
+        'analysis.timeline_analyzer', 'analysis.ioc_scanner', 'analysis.pipeline', 'analysis.rotated_logs',
+        'analysis.checkpoint', 'analysis.timeline_store', 'analysis.threat_intel',
+        'collectors.linux_collector', 'collectors.windows_collector')
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_times(module):
+    """Return {module: (self_us, cumulative_us)} for one fresh interpreter importing module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            times[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup import time.")
+    parser.add_argument("runs", nargs='?', type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ('main', 'batch'):
+        runs = [import_times(module) for _ in range(args.runs)]
+        total_ms = statistics.median(times[module][1] for times in runs) / 1000
+        print(f"import {module}: {total_ms:.1f} ms median of {args.runs}, {len(runs[-1])} modules")
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:5]
+        for name, (self_us, _) in slowest:
+            print(f"    {name:40s} {self_us / 1000:7.1f} ms self")
+
+        eager = sorted(lazy for lazy in LAZY
+                       if any(name == lazy or name.startswith(lazy + '.') for name in runs[-1]))
+        if eager:
+            print(f"  imported at startup but should load lazily: {', '.join(eager)}")
+            failed = True
+        if args.max_ms is not None and total_ms > args.max_ms:
+            print(f"  import time {total_ms:.1f} ms exceeds {args.max_ms:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
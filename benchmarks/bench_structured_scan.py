@@ -0,0 +1,113 @@
+"""Benchmark for the streaming structured-evidence scan against a recursive per-value scan.
+
+Scans the same synthetic Windows evidence as NDJSON and as one pretty-printed
+windows_evidence.json, checks both scans find the same IOCs with the same hit
+counts, and reports time and peak traced memory. Also scans a record nested deeper than the recursion
+limit.
+
+Usage: python benchmarks/bench_structured_scan.py [records_per_channel]
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.ioc_extractor import IOCExtractor
+from analysis.ioc_store import IOCStore
+from collectors.event_logs import DEFAULT_CHANNELS, collect_event_logs, iter_records
+from collectors.evidence_stream import EvidenceWriter
+from synthetic import SyntheticEventSource
+
+CONFIG = {'analysis': {'ioc_types': ['ip', 'domain', 'hash', 'email']}}
+
+
+def recursive_scan(extractor, data, found):
+    """The previous approach: recurse into every value and run each pattern on it.
+
+    Unlike the original, string items of lists are scanned too, so both
+    approaches find the same IOCs.
+    """
+    if isinstance(data, dict):
+        for value in data.values():
+            recursive_scan(extractor, value, found)
+    elif isinstance(data, list):
+        for item in data:
+            recursive_scan(extractor, item, found)
+    else:
+        text = str(data)
+        for ioc_type in extractor.ioc_types:
+            for match in re.findall(extractor.ioc_patterns[ioc_type], text):
+                if ioc_type != 'hash' or extractor._is_valid_hash(match):
+                    found.observe(ioc_type, match.lower())
+
+
+def counted(found):
+    return {ioc_type: sorted((value, count) for value, count, _, _ in found.records(ioc_type)) for ioc_type in found}
+
+
+def scan_recursive(path):
+    extractor = IOCExtractor(CONFIG)
+    found = IOCStore(extractor.ioc_types)
+    with open(path, 'r') as f:
+        if path.endswith('.ndjson'):
+            for line in f:
+                recursive_scan(extractor, json.loads(line), found)
+        else:
+            recursive_scan(extractor, json.load(f), found)
+    return counted(found)
+
+
+def scan_streaming(path):
+    return counted(IOCExtractor(CONFIG).extract_from_structured(os.path.dirname(path)))
+
+
+def measure(scan, path):
+    """Time a scan, then repeat it under tracemalloc (which slows it down) for the peak."""
+    start = time.perf_counter()
+    found = scan(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    scan(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return found, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    source = SyntheticEventSource(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson = os.path.join(tmp, 'ndjson', 'windows_evidence.ndjson')
+        document = os.path.join(tmp, 'json', 'windows_evidence.json')
+        os.makedirs(os.path.dirname(ndjson))
+        os.makedirs(os.path.dirname(document))
+        with EvidenceWriter(ndjson) as writer:
+            collect_event_logs(source, writer)
+        with open(document, 'w') as f:
+            json.dump({'event_logs': [record for channel in DEFAULT_CHANNELS
+                                      for record in iter_records(source, channel)]}, f, indent=2)
+
+        for path in (ndjson, document):
+            print(f"{os.path.basename(path)} ({os.path.getsize(path) / 2**20:.0f} MiB)")
+            expected, old_time, old_peak = measure(scan_recursive, path)
+            found, new_time, new_peak = measure(scan_streaming, path)
+            status = 'identical' if found == expected else 'MISMATCH'
+            print(f"  recursive  {old_time:7.2f}s  peak {old_peak / 2**20:8.1f} MiB")
+            print(f"  streaming  {new_time:7.2f}s  peak {new_peak / 2**20:8.1f} MiB  "
+                  f"({old_time / new_time:.1f}x, {status})")
+
+        deep = os.path.join(tmp, 'deep')
+        os.makedirs(deep)
+        depth = sys.getrecursionlimit() * 10
+        with open(os.path.join(deep, 'deep.ndjson'), 'w') as f:
+            f.write('{"a": ' * depth + '"10.0.0.1"' + '}' * depth + '\n')
+        print(f"nested {depth} deep: {scan_streaming(os.path.join(deep, 'deep.ndjson'))['ip']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Build, load and lookup timings for the threat-intel index.
+
+Usage: python benchmarks/bench_threat_intel.py [feed_entries] [lookups]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.threat_intel import ThreatIntelIndex, build_index
+
+
+def write_feed(path, entries, seed=11):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        for i in range(entries):
+            kind = i % 4
+            if kind == 0:
+                f.write('.'.join(str(rng.randint(1, 254)) for _ in range(4)) + '\n')
+            elif kind == 1:
+                f.write('%d.%d.%d.0/24\n' % (rng.randint(1, 254), rng.randint(0, 255), rng.randint(0, 255)))
+            elif kind == 2:
+                f.write('host%d.bad%d.example\n' % (rng.getrandbits(24), rng.getrandbits(16)))
+            else:
+                f.write('%064x\n' % rng.getrandbits(256))
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    with tempfile.TemporaryDirectory() as work:
+        feed = os.path.join(work, 'feed.txt')
+        write_feed(feed, entries)
+
+        start = time.perf_counter()
+        build_index([feed], os.path.join(work, 'index'))
+        print(f"build  {time.perf_counter() - start:8.2f} s for {entries} entries")
+
+        start = time.perf_counter()
+        index = ThreatIntelIndex(os.path.join(work, 'index'))
+        print(f"load   {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+        rng = random.Random(3)
+        ips = ['.'.join(str(rng.randint(1, 254)) for _ in range(4)) for _ in range(lookups)]
+        start = time.perf_counter()
+        matches = sum(1 for ip in ips for _ in index.match('ip', ip))
+        elapsed = time.perf_counter() - start
+        print(f"match  {lookups / elapsed:8.0f} IPs/s  ({matches} matches)")
+
+
+if __name__ == '__main__':
+    main()
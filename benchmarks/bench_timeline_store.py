@@ -0,0 +1,56 @@
+"""Benchmark for TimelineStore: loading events, then 30-minute range queries and paging.
+
+Usage: python benchmarks/bench_timeline_store.py [events]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analysis.timeline_store import TimelineStore
+
+START = 1772323200
+SOURCES = ('Log File', 'Linux Auth Log', 'Process', 'Windows Event Log')
+
+
+def events(count, seed=7):
+    rng = random.Random(seed)
+    epoch = START
+    for number in range(count):
+        epoch += rng.choice((0, 1, 1, 2))
+        yield {'timestamp': epoch, 'source': rng.choice(SOURCES), 'type': None,
+               'description': f"event {number} from host{rng.randint(1, 50)}"}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TimelineStore(os.path.join(tmp, 'timeline.sqlite'))
+        start = time.perf_counter()
+        store.replace_events(events(count))
+        print(f"load {count} events          {time.perf_counter() - start:8.3f}s")
+
+        first, last = store.span()
+        rng = random.Random(1)
+        windows = [rng.uniform(first.timestamp(), last.timestamp() - 1800) for _ in range(100)]
+        start = time.perf_counter()
+        found = sum(len(list(store.window(low, low + 1800))) for low in windows)
+        print(f"100 x 30 min windows         {(time.perf_counter() - start) / 100 * 1000:8.2f}ms each "
+              f"({found // 100} events)")
+
+        start = time.perf_counter()
+        found = sum(len(list(store.window(low, low + 1800, ['Process']))) for low in windows)
+        print(f"100 x 30 min, one source     {(time.perf_counter() - start) / 100 * 1000:8.2f}ms each "
+              f"({found // 100} events)")
+
+        start = time.perf_counter()
+        found = sum(len(page) for page in store.pages())
+        print(f"page through every event     {time.perf_counter() - start:8.3f}s ({found} events)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
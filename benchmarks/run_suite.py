@@ -0,0 +1,158 @@
+"""End-to-end benchmark suite with stored baselines and a regression gate.
+
+Runs IOCExtractor.extract_from_evidence, TimelineAnalyzer.build_timeline,
+HTMLReporter and PDFReporter over synthetic syslog, auth and web logs (see
+synthetic.py), each scenario in a fresh process so peak RSS is its own.
+Records latency (median of --repeat runs), throughput and peak RSS.
+
+Usage:
+  python benchmarks/run_suite.py [--size-mb N] [--ioc-density F] [--kinds syslog,auth,web]
+                                 [--scenarios extract,timeline,html,pdf] [--repeat N]
+                                 [--save NAME] [--compare NAME] [--threshold F]
+
+--save NAME stores the results as benchmarks/baselines/NAME.json.
+--compare NAME exits with status 1 if any scenario's throughput dropped,
+or its peak RSS grew, by more than --threshold (default 0.15) against that
+baseline.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import yaml
+from analysis.ioc_extractor import IOCExtractor
+from analysis.timeline_analyzer import TimelineAnalyzer
+from instrumentation import peak_rss_mb
+from reporting.html_reporter import HTMLReporter
+from reporting.pdf_reporter import PDFReporter
+from synthetic import KINDS, generate_log
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+SCENARIOS = ('extract', 'timeline', 'html', 'pdf')
+
+
+def load_config(workdir):
+    """The repo's config with paths pointed into the benchmark's work directory."""
+    with open(os.path.join(ROOT, 'config', 'config.yaml'), 'r') as f:
+        config = yaml.safe_load(f)
+    config['analysis'].update(checkpoint_path=None, threat_intel={})
+    config['reporting'].update(
+        template_path=os.path.join(ROOT, 'templates'),
+        template_cache=os.path.join(workdir, 'template-cache')
+    )
+    return config
+
+
+def run_scenario(scenario, evidence_path, workdir, repeat):
+    """Run one scenario repeatedly in this process and return its measurements."""
+    config = load_config(workdir)
+    report_path = os.path.join(workdir, f'report-{scenario}')
+    if scenario in ('html', 'pdf'):
+        iocs = IOCExtractor(config).extract_from_evidence(evidence_path)
+        timeline = list(TimelineAnalyzer(config).build_timeline(evidence_path))
+
+    def run():
+        if scenario == 'extract':
+            IOCExtractor(config).extract_from_evidence(evidence_path)
+        elif scenario == 'timeline':
+            for _ in TimelineAnalyzer(config).build_timeline(evidence_path):
+                pass
+        elif scenario == 'html':
+            HTMLReporter(config).generate_report(iocs, timeline, [], report_path)
+        else:
+            PDFReporter(config).generate_report(iocs, timeline, [], report_path)
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    return {'latency_s': statistics.median(latencies), 'min_s': min(latencies), 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_suite(kinds, scenarios, size_mb, ioc_density, repeat, seed=1337):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for kind in kinds:
+            evidence_path = os.path.join(workdir, kind)
+            os.makedirs(evidence_path)
+            size = generate_log(os.path.join(evidence_path, 'log_file.txt'), kind, size_mb, ioc_density, seed)
+            for scenario in scenarios:
+                with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+                    result = executor.submit(run_scenario, scenario, evidence_path, workdir, repeat).result()
+                result['bytes'] = size
+                result['mb_per_s'] = size / (1024 * 1024) / result['latency_s']
+                results[f'{kind}/{scenario}'] = result
+                print(f"{kind + '/' + scenario:18s} {result['latency_s']:8.3f} s  {result['mb_per_s']:8.2f} MB/s  "
+                      f"peak {result['peak_rss_mb']:7.1f} MB")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the list of regressions of results against a baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['mb_per_s'] < base['mb_per_s'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {result['mb_per_s']:.2f} MB/s vs baseline {base['mb_per_s']:.2f}")
+        if base['peak_rss_mb'] and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.1f} MB vs baseline {base['peak_rss_mb']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--ioc-density", type=float, default=0.1)
+    parser.add_argument("--kinds", default=','.join(KINDS))
+    parser.add_argument("--scenarios", default=','.join(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="NAME", help="Store the results as a named baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Fail on regressions against a named baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    params = {'size_mb': args.size_mb, 'ioc_density': args.ioc_density, 'repeat': args.repeat}
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json'), 'r') as f:
+            baseline = json.load(f)
+        if baseline['params'] != params:
+            parser.error(f"Baseline {args.compare} was recorded with {baseline['params']}, not {params}")
+
+    results = run_suite(args.kinds.split(','), args.scenarios.split(','), args.size_mb, args.ioc_density, args.repeat)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f'{args.save}.json'), 'w') as f:
+            json.dump({
+                'params': params,
+                'python': platform.python_version(),
+                'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                'results': results
+            }, f, indent=2)
+        print(f"Saved baseline {args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against baseline {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
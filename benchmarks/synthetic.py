@@ -0,0 +1,200 @@
+"""Deterministic synthetic evidence: syslog, auth and web access logs, and event logs.
+
+The same kind, size, IOC density and seed always produce the same file.
+ioc_density is the fraction of lines carrying an extra indicator (domain,
+email or hash); auth and web lines also carry the client IP, as real ones do.
+SyntheticEventSource serves generated Windows event log channels; the
+benchmarks and the tests share it.
+
+Usage: python benchmarks/synthetic.py OUTPUT [--kind syslog|auth|web] [--size-mb N]
+                                      [--ioc-density F] [--seed N]
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collectors.event_logs import EventSource
+
+KINDS = ('syslog', 'auth', 'web')
+START = 1772323200  # 2026-03-01 00:00:00 UTC
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+HOSTS = ('web01', 'web02', 'db01', 'bastion', 'mail01')
+USERS = ('root', 'admin', 'alice', 'bob', 'deploy', 'svc.backup', 'oracle', 'test')
+DOMAINS = ('example.com', 'corp.example.org', 'cdn.examplecdn.net', 'evil-c2.net',
+           'update.badsite.ru', 'mail.partner.co.uk', 'files.sharehost.io')
+PATHS = ('/', '/index.html', '/login', '/api/v1/items', '/static/app.js', '/admin', '/wp-login.php',
+         '/search?q=report', '/images/logo.png', '/.env')
+AGENTS = ('Mozilla/5.0 (X11; Linux x86_64)', 'curl/8.4.0', 'python-requests/2.31',
+          'Mozilla/5.0 (Windows NT 10.0; Win64; x64)', 'sqlmap/1.7')
+SYSLOG_MESSAGES = (
+    'CRON[{pid}]: (root) CMD (run-parts /etc/cron.hourly)',
+    'systemd[1]: Started Session {pid} of user {user}.',
+    'kernel: [{pid}.{pid}] eth0: link up, 1000Mbps, full-duplex',
+    'dhclient[{pid}]: bound to 10.0.0.{octet} -- renewal in 1800 seconds.',
+    'rsyslogd: action \'action-0-builtin:omfile\' resumed',
+)
+AUTH_MESSAGES = (
+    'sshd[{pid}]: Accepted password for {user} from {ip} port {port} ssh2',
+    'sshd[{pid}]: Failed password for invalid user {user} from {ip} port {port} ssh2',
+    'sshd[{pid}]: Disconnected from authenticating user {user} {ip} port {port} [preauth]',
+    'sudo: {user} : TTY=pts/0 ; PWD=/home/{user} ; USER=root ; COMMAND=/bin/bash',
+    'sshd[{pid}]: pam_unix(sshd:session): session opened for user {user}(uid=1000) by (uid=0)',
+)
+EXTRAS = (
+    ' resolved {domain}',
+    ' mail from=<{user}@{domain}>',
+    ' file sha256={sha256}',
+    ' md5={md5} quarantined',
+)
+
+
+class _Pools:
+    """Finite pools of indicator values, so unique counts stay realistic."""
+
+    def __init__(self, rng, size=5000):
+        self.ips = ['%d.%d.%d.%d' % (rng.randint(1, 223), rng.randint(0, 255), rng.randint(0, 255),
+                                     rng.randint(1, 254)) for _ in range(size)]
+        self.sha256 = ['%064x' % rng.getrandbits(256) for _ in range(size // 5)]
+        self.md5 = ['%032x' % rng.getrandbits(128) for _ in range(size // 5)]
+
+
+def _syslog_time(epoch):
+    t = time.gmtime(epoch)
+    return f"{MONTHS[t.tm_mon - 1]} {t.tm_mday:2d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+
+
+def _web_time(epoch):
+    t = time.gmtime(epoch)
+    return f"{t.tm_mday:02d}/{MONTHS[t.tm_mon - 1]}/{t.tm_year}:{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} +0000"
+
+
+def _line(kind, rng, pools, epoch, ioc_density):
+    fields = {
+        'pid': rng.randint(100, 65000), 'port': rng.randint(1024, 65535), 'user': rng.choice(USERS),
+        'ip': rng.choice(pools.ips), 'octet': rng.randint(2, 254)
+    }
+    extra = ''
+    if rng.random() < ioc_density:
+        extra = rng.choice(EXTRAS).format(
+            domain=rng.choice(DOMAINS), user=fields['user'],
+            sha256=rng.choice(pools.sha256), md5=rng.choice(pools.md5)
+        )
+    if kind == 'web':
+        return (f'{fields["ip"]} - - [{_web_time(epoch)}] "GET {rng.choice(PATHS)} HTTP/1.1" '
+                f'{rng.choice((200, 200, 200, 301, 404, 500))} {rng.randint(200, 50000)} '
+                f'"https://{rng.choice(DOMAINS)}/" "{rng.choice(AGENTS)}{extra}"\n')
+    messages = AUTH_MESSAGES if kind == 'auth' else SYSLOG_MESSAGES
+    return f"{_syslog_time(epoch)} {rng.choice(HOSTS)} {rng.choice(messages).format(**fields)}{extra}\n"
+
+
+def iter_lines(kind='syslog', ioc_density=0.1, seed=1337):
+    """Yield an endless, deterministic stream of log lines in time order."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown log kind {kind}; expected one of {', '.join(KINDS)}")
+    rng = random.Random(seed)
+    pools = _Pools(rng)
+    epoch = START
+    while True:
+        epoch += rng.choice((0, 0, 1, 1, 2, 5))
+        yield _line(kind, rng, pools, epoch, ioc_density)
+
+
+def generate_log(path, kind='syslog', size_mb=8, ioc_density=0.1, seed=1337):
+    """Write about size_mb of synthetic log lines to path; return the bytes written."""
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    with open(path, 'w') as f:
+        for line in iter_lines(kind, ioc_density, seed):
+            f.write(line)
+            written += len(line)
+            if written >= target:
+                break
+    return written
+
+
+class SyntheticEventSource(EventSource):
+    """Deterministic generated event logs of records_per_channel records each.
+
+    Records are generated a page at a time, newest first. read_delay adds
+    that many seconds per page to stand in for the latency of the real API;
+    opening a channel in unreadable raises PermissionError, as the Security
+    log does for users who are not administrators. The source counts the
+    pages served, the handles closed and the most pages read at once.
+    """
+
+    SOURCES = ("Service Control Manager", "Microsoft-Windows-Security-Auditing", "EventLog",
+               "Application Error", "Microsoft-Windows-Kernel-General", "MsiInstaller")
+    EVENT_IDS = (4624, 4625, 4634, 4672, 4688, 7036, 7045, 1000, 1033, 6005, 6006, 12, 13)
+    USERS = ("SYSTEM", "Administrator", "alice", "svc_backup", "LOCAL SERVICE")
+    START = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    def __init__(self, records_per_channel=1000, page_size=200, read_delay=0.0, seed=1337, unreadable=()):
+        self.records_per_channel = records_per_channel
+        self.page_size = page_size
+        self.read_delay = read_delay
+        self.seed = seed
+        self.unreadable = set(unreadable)
+        self.pages = 0
+        self.closed = 0
+        self.reading = 0
+        self.most_reading = 0
+        self.lock = threading.Lock()
+
+    def open(self, channel):
+        if channel in self.unreadable:
+            raise PermissionError(f"access to the {channel} log is denied")
+        return {"channel": channel, "rng": random.Random(self.seed ^ zlib.crc32(channel.encode())), "served": 0}
+
+    def read_page(self, handle):
+        with self.lock:
+            self.pages += 1
+            self.reading += 1
+            self.most_reading = max(self.most_reading, self.reading)
+        if self.read_delay:
+            time.sleep(self.read_delay)
+        with self.lock:
+            self.reading -= 1
+        count = min(self.page_size, self.records_per_channel - handle["served"])
+        rng = handle["rng"]
+        page = []
+        for number in range(handle["served"], handle["served"] + count):
+            address = f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            page.append({
+                "log_type": handle["channel"],
+                "event_category": rng.randint(0, 16),
+                "time_generated": (self.START - timedelta(seconds=number)).isoformat(),
+                "source_name": rng.choice(self.SOURCES),
+                "event_id": rng.choice(self.EVENT_IDS),
+                "event_type": rng.choice((1, 2, 4, 8, 16)),
+                "event_data": [rng.choice(self.USERS), address, str(rng.randint(1000, 9999))]
+            })
+        handle["served"] += count
+        return page
+
+    def close(self, handle):
+        with self.lock:
+            self.closed += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic log file.")
+    parser.add_argument("output")
+    parser.add_argument("--kind", choices=KINDS, default='syslog')
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--ioc-density", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1337)
+    args = parser.parse_args()
+    written = generate_log(args.output, args.kind, args.size_mb, args.ioc_density, args.seed)
+    print(f"Wrote {written} bytes of {args.kind} to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
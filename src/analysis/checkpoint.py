@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import os
+import time
+
+from analysis.ioc_store import IOCStore
+from analysis.rotated_logs import open_member
+from analysis.timeline_store import TimelineStore
+
+# Bytes at the start of a file hashed to detect it being replaced in place.
+HEAD_BYTES = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    head_hash TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS iocs (
+    type TEXT NOT NULL,
+    value TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    count INTEGER NOT NULL DEFAULT 1,
+    first_position INTEGER NOT NULL DEFAULT 0,
+    last_position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (type, value)
+) WITHOUT ROWID;
+"""
+
+# Columns added to iocs after its first version, with their defaults for old rows
+IOC_COLUMNS = {'count': 1, 'first_position': 0, 'last_position': 0}
+
+
+def _head_hash(path, length):
+    with open_member(path) as f:
+        return hashlib.sha256(f.read(min(length, HEAD_BYTES))).hexdigest()
+
+
+class CheckpointStore(TimelineStore):
+    """SQLite store that lets analysis resume where the previous run stopped.
+
+    For each evidence file it records the inode, size, processed offset and a
+    hash of the first bytes. A later run only reads past that offset unless the
+    file was rotated (new inode), truncated (smaller) or rewritten (different
+    head), in which case it starts over from byte 0. A file that now holds
+    content recorded under another path, such as log_file.txt renamed to
+    log_file.txt.1 or compressed to log_file.txt.2.gz by rotation, resumes at
+    that path's offset. Offsets and head hashes of compressed files are in
+    decompressed bytes. IOCs keep first-seen and last-seen run times, and
+    timeline events accumulate across runs in the TimelineStore tables.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(iocs)")}
+        with self.conn:
+            for column, default in IOC_COLUMNS.items():
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE iocs ADD COLUMN {column} INTEGER NOT NULL DEFAULT {default}")
+
+    def resume_offset(self, path):
+        """Return the offset to resume path from, or 0 when it must be rescanned."""
+        key = os.path.abspath(path)
+        row = self.conn.execute(
+            "SELECT inode, size, offset, head_hash FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return self._moved_offset(path)
+        inode, size, offset, head_hash = row
+        st = os.stat(path)
+        if st.st_ino != inode:
+            logging.info(f"{path} was rotated; rescanning from the start")
+            return self._moved_offset(path)
+        if st.st_size < size:
+            logging.info(f"{path} was truncated; rescanning from the start")
+            return self._moved_offset(path)
+        if _head_hash(path, offset) != head_hash:
+            logging.info(f"{path} was rewritten; rescanning from the start")
+            return self._moved_offset(path)
+        return offset
+
+    def _moved_offset(self, path):
+        """Return the offset recorded for another path whose content path now holds, or 0."""
+        key = os.path.abspath(path)
+        heads = {}
+        rows = self.conn.execute(
+            "SELECT path, offset, head_hash FROM files WHERE path != ? AND offset > 0 ORDER BY offset DESC", (key,)
+        )
+        for other, offset, head_hash in rows:
+            length = min(offset, HEAD_BYTES)
+            if length not in heads:
+                heads[length] = _head_hash(path, length)
+            if heads[length] == head_hash:
+                logging.info(f"{path} holds the content recorded for {other}; resuming from byte {offset}")
+                return offset
+        return 0
+
+    def is_unchanged(self, path):
+        """Return whether path still has the inode, size and head it was last saved with."""
+        row = self.conn.execute(
+            "SELECT inode, size, offset, head_hash FROM files WHERE path = ?", (os.path.abspath(path),)
+        ).fetchone()
+        if row is None:
+            return False
+        inode, size, offset, head_hash = row
+        st = os.stat(path)
+        return st.st_ino == inode and st.st_size == size and _head_hash(path, offset) == head_hash
+
+    def save_offset(self, path, offset):
+        st = os.stat(path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, inode, size, offset, head_hash, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(path), st.st_ino, st.st_size, offset, _head_hash(path, offset), time.time())
+            )
+
+    def record_iocs(self, found_iocs, seen=None):
+        """Upsert the IOCs of an IOCStore found in this run with seen as their last-seen time.
+
+        Counts add up across runs, so pass each run's new observations once.
+        """
+        seen = time.time() if seen is None else seen
+        rows = (
+            (ioc_type, value, seen, seen, count, first, last)
+            for ioc_type in found_iocs for value, count, first, last in found_iocs.records(ioc_type)
+        )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO iocs (type, value, first_seen, last_seen, count, first_position, last_position) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (type, value) DO UPDATE SET last_seen = excluded.last_seen, "
+                "count = count + excluded.count, "
+                "first_position = MIN(first_position, excluded.first_position), "
+                "last_position = MAX(last_position, excluded.last_position)",
+                rows
+            )
+
+    def load_iocs(self, ioc_types):
+        """Return the recorded IOCs as an IOCStore with their counts and positions."""
+        found = IOCStore(ioc_types)
+        rows = self.conn.execute("SELECT type, value, count, first_position, last_position FROM iocs")
+        for ioc_type, value, count, first, last in rows:
+            if ioc_type in found:
+                found.observe(ioc_type, value, first, count)
+                found.observe(ioc_type, value, last, 0)
+        return found
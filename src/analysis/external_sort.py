@@ -0,0 +1,80 @@
+import heapq
+import logging
+import pickle
+import tempfile
+from pathlib import Path
+
+
+def _write_run(directory, index, items):
+    path = Path(directory) / f"run_{index:05d}.pickle"
+    with open(path, 'wb') as f:
+        pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+        for item in items:
+            pickler.dump(item)
+            pickler.clear_memo()
+    return path
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        unpickler = pickle.Unpickler(f)
+        while True:
+            try:
+                yield unpickler.load()
+            except EOFError:
+                return
+
+
+class ExternalSorter:
+    """Sort items by key while holding at most buffer_size of them in memory.
+
+    Items are sorted in memory until the buffer fills, then spilled to disk as
+    sorted runs which are lazily merged. Inputs that fit in the buffer never
+    touch the disk.
+    """
+
+    def __init__(self, key, buffer_size, tmp_dir=None):
+        self.key = key
+        self.buffer_size = buffer_size
+        self.tmp_dir = tmp_dir
+        self._buffer = []
+        self._runs = []
+        self._directory = None
+
+    def add(self, item):
+        self._buffer.append(item)
+        if len(self._buffer) >= self.buffer_size:
+            self._spill()
+
+    def _spill(self):
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(dir=self.tmp_dir, prefix="timeline_sort_")
+        self._buffer.sort(key=self.key)
+        self._runs.append(_write_run(self._directory.name, len(self._runs), self._buffer))
+        self._buffer = []
+
+    def sorted(self):
+        """Yield every added item in key order, then remove the spilled runs."""
+        try:
+            if not self._runs:
+                self._buffer.sort(key=self.key)
+                yield from self._buffer
+                return
+            if self._buffer:
+                self._spill()
+            logging.info(f"Merging {len(self._runs)} sorted runs from {self._directory.name}")
+            yield from heapq.merge(*(_read_run(path) for path in self._runs), key=self.key)
+        finally:
+            self._buffer = []
+            self._runs = []
+            if self._directory is not None:
+                self._directory.cleanup()
+                self._directory = None
+
+
+def external_sort(items, key, buffer_size, tmp_dir=None):
+    """Yield items sorted by key, spilling to disk beyond buffer_size items."""
+    sorter = ExternalSorter(key, buffer_size, tmp_dir)
+    for item in items:
+        sorter.add(item)
+    yield from sorter.sorted()
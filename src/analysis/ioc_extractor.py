@@ -1,10 +1,13 @@
 import re
 import json
-from pathlib import Path
 import logging
 import hashlib
 import os
 
+from analysis.ioc_store import IOCStore
+from analysis.ioc_scanner import IOCScanner, DEFAULT_BLOCK_SIZE, DEFAULT_CHUNK_SIZE
+from analysis.structured_scan import StructuredScanner, structured_files
+
 class IOCExtractor:
     def __init__(self, config):
         self.config = config
@@ -15,7 +18,19 @@ class IOCExtractor:
             'hash': r'\b[a-fA-F0-9]{32,128}\b',
             'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
         }
-        self.found_iocs = {ioc: set() for ioc in self.ioc_types}
+        self.found_iocs = IOCStore(self.ioc_types)
+        self.block_size = config['analysis'].get('scan_block_size', DEFAULT_BLOCK_SIZE)
+        self.workers = config['analysis'].get('workers', 1)
+        self.chunk_size = config['analysis'].get('chunk_size', DEFAULT_CHUNK_SIZE)
+        self.scanner = IOCScanner(
+            {ioc: self.ioc_patterns[ioc] for ioc in self.ioc_types if ioc in self.ioc_patterns},
+            binary=config['analysis'].get('scan_mode', 'text') == 'bytes',
+            exact_positions=config['analysis'].get('ioc_positions', 'block') == 'exact'
+        )
+        structured_config = config['analysis'].get('structured_scan') or {}
+        self.structured = StructuredScanner(
+            self.scanner, structured_config.get('fields'), structured_config.get('exclude_fields'), self.block_size
+        )
 
     def extract_from_evidence(self, evidence_path):
         """Extract Indicators of Compromise (IOCs) from the evidence."""
@@ -25,35 +40,43 @@ class IOCExtractor:
             logging.warning(f"Log file {log_file} does not exist.")
             return self.found_iocs
         
-        with open(log_file, 'r') as f:
-            for line in f:
-                for ioc_type, pattern in self.ioc_patterns.items():
-                    matches = re.findall(pattern, line)
-                    self.found_iocs[ioc_type].update(matches)
+        if self.workers > 1:
+            self.scanner.scan_file_parallel(log_file, self.found_iocs, self.workers,
+                                            self.chunk_size, self.block_size)
+        else:
+            self.scanner.scan_file(log_file, self.found_iocs, self.block_size)
         
         logging.info(f"Extracted IOCs: {self.found_iocs}")
         return self.found_iocs
 
-    def _scan_data(self, data):
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, (dict, list)):
-                    self._scan_data(v)
-                else:
-                    self._check_iocs(str(v))
-        elif isinstance(data, list):
-            for item in data:
-                self._scan_data(item)
-
-    def _check_iocs(self, text):
-        for ioc_type in self.ioc_types:
-            pattern = self.ioc_patterns.get(ioc_type)
-            if pattern:
-                matches = re.findall(pattern, text)
-                for match in matches:
-                    if ioc_type == 'hash' and not self._is_valid_hash(match):
-                        continue
-                    self.found_iocs[ioc_type].add(match.lower())
+    @property
+    def binary(self):
+        return self.scanner.binary
+
+    def start(self, log_file):
+        """Prepare to consume blocks of log_file from a LinePipeline."""
+
+    def consume(self, block, offset=0):
+        """Scan a block of whole log lines starting at offset in the file."""
+        self.scanner.scan(block, self.found_iocs, offset)
+
+    def finish(self):
+        logging.info(f"Extracted IOCs: {self.found_iocs}")
+        return self.found_iocs
+
+    def extract_from_structured(self, evidence_path):
+        """Extract IOCs from the structured (NDJSON and JSON) evidence files in the evidence directory.
+
+        Files are streamed and their string values scanned in batches (see
+        analysis.structured_scan), never loaded whole.
+        """
+        observe = self.found_iocs.observe
+        for path in structured_files(evidence_path):
+            for ioc_type, match, count in self.structured.iter_matches(path):
+                if ioc_type == 'hash' and not self._is_valid_hash(match):
+                    continue
+                observe(ioc_type, match.lower(), count=count)
+        return self.found_iocs
 
     def _is_valid_hash(self, value):
         length = len(value)
@@ -0,0 +1,256 @@
+from collections import Counter
+import locale
+import mmap
+import os
+import re
+
+from analysis.ioc_store import IOCStore
+
+# Literal characters a line must contain before a pattern can possibly match.
+# Types without an entry are always scanned.
+REQUIRED_LITERALS = {
+    'ip': '.',
+    'domain': '.',
+    'email': '@'
+}
+
+# Equivalent forms of the default patterns that start with a character class
+# instead of ``\b``, which lets the regex engine skip ahead to candidate
+# characters. The word boundary is checked by the lookbehind instead.
+FAST_EQUIVALENTS = {
+    r'\b(?:\d{1,3}\.){3}\d{1,3}\b': r'\d(?<=\b\d)\d{0,2}(?:\.\d{1,3}){3}\b',
+    r'\b[a-fA-F0-9]{32,128}\b': r'[a-fA-F0-9](?<=\b[a-fA-F0-9])[a-fA-F0-9]{31,127}\b'
+}
+
+# Only lines containing the literal are scanned when it appears on fewer than
+# one in this many lines; otherwise the whole block is scanned at once.
+SPARSE_LITERAL_RATIO = 8
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_CHUNK_SIZE = 64 << 20
+
+# Scanners built inside pool workers, keyed by their patterns and mode.
+_worker_scanners = {}
+
+
+def iter_blocks(f, block_size=DEFAULT_BLOCK_SIZE, limit=None):
+    """Yield large blocks of whole lines from an open file (text or binary).
+
+    With a limit, at most that many characters (bytes for binary files) are read.
+    """
+    tail = None
+    while True:
+        if limit is None:
+            block = f.read(block_size)
+        else:
+            block = f.read(min(block_size, limit))
+            limit -= len(block)
+        if not block:
+            break
+        if tail:
+            block = tail + block
+        newline = b'\n' if isinstance(block, bytes) else '\n'
+        cut = block.rfind(newline) + 1
+        if cut == 0:
+            tail = block
+            continue
+        tail = block[cut:]
+        yield block[:cut]
+    if tail:
+        yield tail
+
+
+def last_line_end(path):
+    """Return the byte offset just past the last complete line of a file."""
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - DEFAULT_BLOCK_SIZE)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline != -1:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def split_ranges(mm, chunk_size, start=0, end=None):
+    """Split a mapped file into (start, end) byte ranges ending on newlines."""
+    size = len(mm) if end is None else end
+    ranges = []
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = mm.find(b'\n', end - 1, size)
+            end = size if newline == -1 else newline + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def iter_range_blocks(mm, start, end, block_size=DEFAULT_BLOCK_SIZE):
+    """Yield blocks of whole lines from a byte range of a mapped file."""
+    while start < end:
+        stop = min(start + block_size, end)
+        if stop < end:
+            newline = mm.rfind(b'\n', start, stop)
+            if newline == -1:
+                newline = mm.find(b'\n', stop, end)
+            stop = end if newline == -1 else newline + 1
+        yield mm[start:stop]
+        start = stop
+
+
+def _scan_range(patterns, binary, exact_positions, path, start, end, block_size):
+    key = (tuple(patterns.items()), binary, exact_positions)
+    scanner = _worker_scanners.get(key)
+    if scanner is None:
+        scanner = _worker_scanners[key] = IOCScanner(patterns, binary, exact_positions)
+    encoding = locale.getpreferredencoding(False)
+    found = IOCStore(patterns)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for block in iter_range_blocks(mm, start, end, block_size):
+            scanner.scan(block if binary else block.decode(encoding), found, start)
+            start += len(block)
+    found.flush()
+    return found
+
+
+def candidate_lines(text, literal):
+    """Yield (offset, line) for only the lines of text that contain literal."""
+    newline = b'\n' if isinstance(text, bytes) else '\n'
+    pos = text.find(literal)
+    while pos != -1:
+        start = text.rfind(newline, 0, pos) + 1
+        end = text.find(newline, pos)
+        end = len(text) if end == -1 else end + 1
+        yield start, text[start:end]
+        pos = text.find(literal, end)
+
+
+class IOCScanner:
+    """Scan text for several IOC types using precompiled patterns.
+
+    A combined pattern of every enabled type is searched first. When it finds
+    nothing the text cannot contain any IOC and is skipped in a single pass;
+    otherwise each type is scanned starting at the first candidate position,
+    which gives exactly the same matches as running ``re.findall`` per type.
+    None of the patterns can match across a newline, so scanning large blocks
+    of lines is equivalent to scanning line by line, and a type whose required
+    literal (such as '@' for emails) is rare is only run on the lines that
+    contain it.
+
+    In binary mode the patterns run on raw bytes and only the matches are
+    decoded. ``\\b`` and ``\\d`` are then ASCII-only, so results can differ from
+    text mode for lines containing non-ASCII letters or digits.
+
+    scan() counts the matches of each piece of text it scans (the block, or a
+    line for a rare literal) at once and records them at that piece's
+    offset. With exact_positions every match is recorded at its own offset,
+    which costs a call per match.
+    """
+
+    def __init__(self, patterns, binary=False, exact_positions=False):
+        self.patterns = dict(patterns)
+        self.binary = binary
+        self.exact_positions = exact_positions
+        encode = (lambda s: s.encode('ascii')) if binary else (lambda s: s)
+        self.types = list(patterns)
+        self._gate = re.compile(encode('|'.join(f'(?:{p})' for p in patterns.values())))
+        self._scanners = []
+        for ioc_type, pattern in patterns.items():
+            literal = REQUIRED_LITERALS.get(ioc_type)
+            if literal is not None:
+                literal = encode(literal)
+            pattern = FAST_EQUIVALENTS.get(pattern, pattern)
+            self._scanners.append((ioc_type, literal, re.compile(encode(pattern))))
+
+    def _segments(self, text):
+        """Yield (ioc_type, pattern, text, offset, start) for each piece to scan."""
+        gate = self._gate.search(text)
+        if gate is None:
+            return
+        start = gate.start()
+        newline = b'\n' if self.binary else '\n'
+        lines = None
+        for ioc_type, literal, pattern in self._scanners:
+            if literal is None:
+                yield ioc_type, pattern, text, 0, start
+                continue
+            hits = text.count(literal, start)
+            if not hits:
+                continue
+            if lines is None:
+                lines = text.count(newline, start) + 1
+            if hits * SPARSE_LITERAL_RATIO < lines:
+                for offset, line in candidate_lines(text, literal):
+                    yield ioc_type, pattern, line, offset, 0
+            else:
+                yield ioc_type, pattern, text, 0, start
+
+    def iter_matches(self, text):
+        """Yield (ioc_type, match) pairs found in text."""
+        for ioc_type, pattern, segment, _, start in self._segments(text):
+            for match in pattern.findall(segment, start):
+                if self.binary:
+                    match = match.decode('ascii')
+                yield ioc_type, match
+
+    def iter_positions(self, text):
+        """Yield (ioc_type, match, offset in text) for every match in text."""
+        binary = self.binary
+        for ioc_type, pattern, segment, offset, start in self._segments(text):
+            for match in pattern.finditer(segment, start):
+                value = match.group()
+                yield ioc_type, value.decode('ascii') if binary else value, offset + match.start()
+
+    def scan(self, text, found, base=0):
+        """Record the matches in text in the ``found`` IOCStore.
+
+        Callers pass the file offset of the block as base. Matches are recorded
+        at base plus the offset of the block or line they were found in, or of
+        the match itself with exact_positions.
+        """
+        if self.exact_positions:
+            observe = found.observe
+            for ioc_type, value, position in self.iter_positions(text):
+                observe(ioc_type, value, base + position)
+            return
+        observe_counts = found.observe_counts
+        binary = self.binary
+        for ioc_type, pattern, segment, offset, start in self._segments(text):
+            counts = Counter(pattern.findall(segment, start))
+            if binary:
+                counts = {value.decode('ascii'): count for value, count in counts.items()}
+            observe_counts(ioc_type, counts, base + offset)
+
+    def scan_file(self, path, found, block_size=DEFAULT_BLOCK_SIZE):
+        """Scan a file in large blocks of lines and return the bytes read."""
+        base = 0
+        with open(path, 'rb' if self.binary else 'r') as f:
+            for block in iter_blocks(f, block_size):
+                self.scan(block, found, base)
+                base += len(block)
+        return os.path.getsize(path)
+
+    def scan_file_parallel(self, path, found, workers, chunk_size=DEFAULT_CHUNK_SIZE,
+                           block_size=DEFAULT_BLOCK_SIZE, start=0, end=None):
+        """Scan newline-aligned byte ranges of a memory-mapped file in a process pool.
+
+        Only bytes from start up to end (default: the end of the file) are scanned.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        size = os.path.getsize(path) if end is None else end
+        if size <= start:
+            return 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ranges = split_ranges(mm, chunk_size, start, size)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_scan_range, self.patterns, self.binary, self.exact_positions, path, start, end, block_size)
+                for start, end in ranges
+            ]
+            for future in futures:
+                found.merge(future.result())
+        return size - start
@@ -0,0 +1,298 @@
+from array import array
+import socket
+import sys
+
+# Observations are staged in a small dict and merged into the sorted tables in
+# batches once the stage holds this many values (or half the table, if larger).
+STAGE_MIN = 1 << 16
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+
+def _ipv4_key(value):
+    try:
+        raw = socket.inet_aton(value)
+    except (OSError, ValueError):
+        return None
+    # inet_aton also accepts forms like '1.2.3' or '010.0.0.1'; keep only exact round trips
+    return int.from_bytes(raw, 'big') if socket.inet_ntoa(raw) == value else None
+
+
+def _ipv6_key(value):
+    try:
+        raw = socket.inet_pton(socket.AF_INET6, value)
+    except (OSError, ValueError):
+        return None
+    return raw if socket.inet_ntop(socket.AF_INET6, raw) == value else None
+
+
+def _hash_key(value):
+    if len(value) % 2 or not _HEX_DIGITS.issuperset(value):
+        return None
+    return bytes.fromhex(value)
+
+
+def classify(ioc_type, value):
+    """Return (table kind, packed key) for an indicator value.
+
+    Only values that decode back to exactly the same string are packed, so the
+    store never changes an indicator; anything else is kept as an interned str.
+    """
+    if ioc_type == 'ip':
+        key = _ipv4_key(value)
+        if key is not None:
+            return 'ipv4', key
+        if ':' in value:
+            key = _ipv6_key(value)
+            if key is not None:
+                return 'ipv6', key
+    elif ioc_type == 'hash':
+        key = _hash_key(value)
+        if key is not None:
+            return f'hash{len(key)}', key
+    return 'str', sys.intern(value)
+
+
+def _decoder(kind):
+    if kind == 'ipv4':
+        return lambda key: socket.inet_ntoa(key.to_bytes(4, 'big'))
+    if kind == 'ipv6':
+        return lambda key: socket.inet_ntop(socket.AF_INET6, key)
+    if kind.startswith('hash'):
+        return bytes.hex
+    return lambda key: key
+
+
+class _SortedTable:
+    """Sorted keys with parallel arrays of counts and first/last positions.
+
+    Keys live in an array of 32-bit ints (IPv4), a bytearray of fixed-width
+    records (IPv6, hashes) or a list of interned strings.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        if kind == 'ipv4':
+            self.width = None
+            self.keys = array('I')
+        elif kind == 'str':
+            self.width = None
+            self.keys = []
+        else:
+            self.width = 16 if kind == 'ipv6' else int(kind[4:])
+            self.keys = bytearray()
+        self.counts = array('Q')
+        self.first = array('q')
+        self.last = array('q')
+
+    def __len__(self):
+        return len(self.counts)
+
+    def key_at(self, index):
+        if self.width is None:
+            return self.keys[index]
+        start = index * self.width
+        return bytes(self.keys[start:start + self.width])
+
+    def index(self, key):
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self) and self.key_at(lo) == key else -1
+
+    def rows(self):
+        for index in range(len(self)):
+            yield self.key_at(index), self.counts[index], self.first[index], self.last[index]
+
+    def merge(self, rows):
+        """Merge rows of (key, count, first, last) sorted by unique key."""
+        merged = _SortedTable(self.kind)
+        keys, counts, first, last = merged.keys, merged.counts, merged.first, merged.last
+        append_key = keys.extend if self.width else keys.append
+
+        def emit(row):
+            append_key(row[0])
+            counts.append(row[1])
+            first.append(row[2])
+            last.append(row[3])
+
+        old = self.rows()
+        current = next(old, None)
+        for row in rows:
+            while current is not None and current[0] < row[0]:
+                emit(current)
+                current = next(old, None)
+            if current is not None and current[0] == row[0]:
+                row = (row[0], row[1] + current[1], min(row[2], current[2]), max(row[3], current[3]))
+                current = next(old, None)
+            emit(row)
+        while current is not None:
+            emit(current)
+            current = next(old, None)
+        self.keys, self.counts, self.first, self.last = keys, counts, first, last
+
+
+class IOCView:
+    """Read-only, set-like view of one IOC type in an IOCStore."""
+
+    def __init__(self, store, ioc_type):
+        self._store = store
+        self.ioc_type = ioc_type
+
+    def __len__(self):
+        return sum(len(table) for table in self._store._flushed(self.ioc_type).values())
+
+    def __iter__(self):
+        for value, _, _, _ in self._store.records(self.ioc_type):
+            yield value
+
+    def __contains__(self, value):
+        # Staged values are looked up where they are, so checking membership
+        # between observations (as follow mode does) never forces a flush.
+        if value in self._store._staged.get(self.ioc_type, ()):
+            return True
+        kind, key = classify(self.ioc_type, value)
+        table = self._store._tables.get(self.ioc_type, {}).get(kind)
+        return table is not None and table.index(key) != -1
+
+    def add(self, value, position=0):
+        self._store.observe(self.ioc_type, value, position)
+
+    def update(self, values, position=0):
+        for value in values:
+            self._store.observe(self.ioc_type, value, position)
+
+
+class IOCStore:
+    """Compact, counted store of indicators with first/last-seen positions.
+
+    IPv4 addresses are kept as 32-bit ints, IPv6 addresses and hashes as
+    fixed-width bytes and everything else as interned strings, each in sorted
+    array-backed tables. Stores from parallel workers or checkpoints are
+    combined with merge(). It behaves like the old dict of sets for reading:
+    ``store.items()`` yields (type, view) pairs whose views iterate values
+    lazily and support ``len()`` and ``in``.
+    """
+
+    def __init__(self, ioc_types=()):
+        self._tables = {ioc_type: {} for ioc_type in ioc_types}
+        self._staged = {ioc_type: {} for ioc_type in ioc_types}
+        self._staged_count = 0
+
+    def observe(self, ioc_type, value, position=0, count=1):
+        staged = self._staged.get(ioc_type)
+        if staged is None:
+            staged = self._staged[ioc_type] = {}
+            self._tables[ioc_type] = {}
+        entry = staged.get(value)
+        if entry is None:
+            staged[value] = [count, position, position]
+            self._staged_count += 1
+            if self._staged_count >= STAGE_MIN and self._staged_count >= self._stored_count() // 2:
+                self.flush()
+        else:
+            entry[0] += count
+            if position < entry[1]:
+                entry[1] = position
+            elif position > entry[2]:
+                entry[2] = position
+
+    def observe_counts(self, ioc_type, counts, position=0):
+        """Record a mapping of {value: count} seen at one position, such as a scanned block's offset."""
+        staged = self._staged.get(ioc_type)
+        if staged is None:
+            staged = self._staged[ioc_type] = {}
+            self._tables[ioc_type] = {}
+        before = len(staged)
+        for value, count in counts.items():
+            entry = staged.get(value)
+            if entry is None:
+                staged[value] = [count, position, position]
+            else:
+                entry[0] += count
+                if position < entry[1]:
+                    entry[1] = position
+                elif position > entry[2]:
+                    entry[2] = position
+        self._staged_count += len(staged) - before
+        if self._staged_count >= STAGE_MIN and self._staged_count >= self._stored_count() // 2:
+            self.flush()
+
+    def _stored_count(self):
+        return sum(len(table) for tables in self._tables.values() for table in tables.values())
+
+    def flush(self):
+        """Merge every staged observation into the sorted tables."""
+        for ioc_type, staged in self._staged.items():
+            if not staged:
+                continue
+            by_kind = {}
+            for value, (count, first, last) in staged.items():
+                kind, key = classify(ioc_type, value)
+                by_kind.setdefault(kind, []).append((key, count, first, last))
+            tables = self._tables[ioc_type]
+            for kind, rows in by_kind.items():
+                rows.sort()
+                table = tables.get(kind)
+                if table is None:
+                    table = tables[kind] = _SortedTable(kind)
+                table.merge(rows)
+            staged.clear()
+        self._staged_count = 0
+
+    def _flushed(self, ioc_type):
+        if self._staged_count:
+            self.flush()
+        return self._tables.get(ioc_type, {})
+
+    def merge(self, other):
+        """Add every indicator, count and position from another store."""
+        other.flush()
+        self.flush()
+        for ioc_type, tables in other._tables.items():
+            mine = self._tables.setdefault(ioc_type, {})
+            self._staged.setdefault(ioc_type, {})
+            for kind, table in tables.items():
+                if kind not in mine:
+                    mine[kind] = _SortedTable(kind)
+                mine[kind].merge(table.rows())
+        return self
+
+    def records(self, ioc_type):
+        """Yield (value, count, first_position, last_position) for one type."""
+        for kind, table in sorted(self._flushed(ioc_type).items()):
+            decode = _decoder(kind)
+            for key, count, first, last in table.rows():
+                yield decode(key), count, first, last
+
+    def occurrences(self, ioc_type):
+        """Return how many times indicators of one type were observed in total."""
+        return sum(sum(table.counts) for table in self._flushed(ioc_type).values())
+
+    def keys(self):
+        return self._tables.keys()
+
+    def __getitem__(self, ioc_type):
+        if ioc_type not in self._tables:
+            raise KeyError(ioc_type)
+        return IOCView(self, ioc_type)
+
+    def __contains__(self, ioc_type):
+        return ioc_type in self._tables
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def items(self):
+        for ioc_type in self._tables:
+            yield ioc_type, IOCView(self, ioc_type)
+
+    def to_sets(self):
+        return {ioc_type: set(view) for ioc_type, view in self.items()}
+
+    def __repr__(self):
+        return f"IOCStore({ {ioc_type: len(view) for ioc_type, view in self.items()} })"
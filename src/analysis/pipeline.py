@@ -0,0 +1,106 @@
+from threading import Thread
+import locale
+import logging
+import queue
+
+from analysis.ioc_scanner import DEFAULT_BLOCK_SIZE, iter_blocks
+from instrumentation import metrics
+
+_DONE = object()
+
+
+class _ConsumerThread(Thread):
+    """Feed one consumer from a bounded queue on its own thread."""
+
+    def __init__(self, consumer, queue_size):
+        super().__init__(name=f"pipeline-{type(consumer).__name__}", daemon=True)
+        self.consumer = consumer
+        self.blocks = queue.Queue(maxsize=queue_size)
+        self.error = None
+
+    def run(self):
+        while True:
+            item = self.blocks.get()
+            if item is _DONE:
+                return
+            if self.error is None:
+                try:
+                    self.consumer.consume(*item)
+                except Exception as e:
+                    self.error = e
+
+
+class LinePipeline:
+    """Read a log file once and fan its blocks of lines out to several consumers.
+
+    A consumer implements start(path), consume(block, offset) and finish(),
+    where offset is the file offset of the block. Blocks hold whole lines
+    and are bytes for consumers whose ``binary`` attribute is true and str
+    otherwise; each block is decoded at most once. With threaded=True every
+    consumer runs on its own thread behind a bounded queue, so a slow
+    consumer applies back-pressure to the reader instead of buffering the
+    file.
+    """
+
+    def __init__(self, consumers, block_size=DEFAULT_BLOCK_SIZE, threaded=False, queue_size=4):
+        self.consumers = list(consumers)
+        self.block_size = block_size
+        self.threaded = threaded
+        self.queue_size = queue_size
+
+    def run(self, path, start=0, end=None):
+        """Stream path through every consumer and return their finish() results.
+
+        Only bytes from start up to end (default: the end of the file) are read;
+        both offsets must fall on line boundaries.
+        """
+        with open(path, 'rb') as f:
+            f.seek(start)
+            limit = None if end is None else end - start
+            return self.run_blocks(path, iter_blocks(f, self.block_size, limit), start)
+
+    def run_blocks(self, path, blocks, start=0):
+        """Stream blocks of whole lines (bytes or str) through every consumer.
+
+        path is what consumers are started with, for example the newest member
+        of a rotated set whose lines are merged into blocks; offsets count
+        from start in the units of the blocks. Afterwards self.end is the
+        offset just past the last block.
+        """
+        for consumer in self.consumers:
+            consumer.start(path)
+
+        encoding = locale.getpreferredencoding(False)
+        needs_text = any(not getattr(consumer, 'binary', False) for consumer in self.consumers)
+        needs_bytes = any(getattr(consumer, 'binary', False) for consumer in self.consumers)
+        threads = [_ConsumerThread(c, self.queue_size) for c in self.consumers] if self.threaded else []
+        for thread in threads:
+            thread.start()
+
+        try:
+            offset = self.end = start
+            for block in blocks:
+                if isinstance(block, str):
+                    text, raw = block, block.encode(encoding) if needs_bytes else None
+                else:
+                    text, raw = block.decode(encoding) if needs_text else None, block
+                for index, consumer in enumerate(self.consumers):
+                    item = raw if getattr(consumer, 'binary', False) else text
+                    if threads:
+                        threads[index].blocks.put((item, offset))
+                    else:
+                        consumer.consume(item, offset)
+                offset += len(block)
+                self.end = offset
+                metrics.add(bytes=len(block), lines=block.count('\n' if isinstance(block, str) else b'\n'))
+        finally:
+            for thread in threads:
+                thread.blocks.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        for thread in threads:
+            if thread.error is not None:
+                logging.error(f"{thread.name} failed: {thread.error}")
+                raise thread.error
+        return [consumer.finish() for consumer in self.consumers]
@@ -0,0 +1,179 @@
+"""Rotated log sets (syslog, syslog.1, syslog.2.gz, ...) read as one stream.
+
+Compressed members (gzip, bz2, xz, recognised by their magic bytes) are
+decompressed as they are read, never to disk. Every member is decompressed
+on its own thread; the compression modules release the GIL, so members
+inflate in parallel while their lines are merged into chronological order.
+"""
+from datetime import datetime, timezone
+from operator import itemgetter
+from threading import Event, Thread
+import bz2
+import gzip
+import heapq
+import locale
+import lzma
+import os
+import queue
+import re
+
+from analysis.ioc_scanner import DEFAULT_BLOCK_SIZE, iter_blocks
+from analysis.timestamps import DETECT_SAMPLE_LINES, detect_format
+
+OPENERS = ((b'\x1f\x8b', gzip.open), (b'BZh', bz2.open), (b'\xfd7zXZ\x00', lzma.open))
+MAGIC_LENGTH = 6
+
+_DONE = object()
+
+
+def open_member(path):
+    """Open a log file for binary reading, decompressing it if needed."""
+    with open(path, 'rb') as f:
+        head = f.read(MAGIC_LENGTH)
+    for magic, opener in OPENERS:
+        if head.startswith(magic):
+            return opener(path, 'rb')
+    return open(path, 'rb')
+
+
+def _rotation_pattern(base):
+    return re.compile(re.escape(base) + r'(?:\.(\d+)|-(\d{8}))(?:\.(?:gz|bz2|xz))?$')
+
+
+def rotated_set(path, limit=None):
+    """Return the rotated members of a log, oldest first and path itself last.
+
+    Numbered members (path.1, path.2.gz) are older the higher their number;
+    dated members (path-20240101.gz) sort by date. With a limit only the
+    newest limit rotated members are kept; path itself is not counted.
+    """
+    directory, base = os.path.split(os.path.abspath(path))
+    pattern = _rotation_pattern(base)
+    members = []
+    for entry in os.scandir(directory):
+        m = pattern.match(entry.name)
+        if m and entry.is_file():
+            key = (0, -int(m.group(1))) if m.group(1) else (1, int(m.group(2)))
+            members.append((key, entry.path))
+    paths = [path for _, path in sorted(members)]
+    if limit:
+        paths = paths[-limit:]
+    if os.path.isfile(path):
+        paths.append(os.path.abspath(path))
+    return paths
+
+
+def rotation_suffix(path, member):
+    """Return the rotation suffix of a member, e.g. '.2.gz' for syslog.2.gz."""
+    return os.path.basename(member)[len(os.path.basename(path)):]
+
+
+class _MemberReader(Thread):
+    """Decompress and decode one member into a bounded queue of text blocks.
+
+    close() stops the reader early and drains its queue, so a reader blocked
+    on a full queue is released and ends.
+    """
+
+    def __init__(self, path, block_size, queue_size, encoding):
+        super().__init__(name=f"rotated-{os.path.basename(path)}", daemon=True)
+        self.path = path
+        self.block_size = block_size
+        self.encoding = encoding
+        self.blocks = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.stop = Event()
+        self.drained = False
+
+    def run(self):
+        try:
+            with open_member(self.path) as f:
+                for block in iter_blocks(f, self.block_size):
+                    if self.stop.is_set():
+                        break
+                    self.blocks.put(block.decode(self.encoding))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.blocks.put(_DONE)
+
+    def __iter__(self):
+        while True:
+            block = self.blocks.get()
+            if block is _DONE:
+                self.drained = True
+                break
+            yield block
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.stop.set()
+        while not self.drained:
+            self.drained = self.blocks.get() is _DONE
+        self.join()
+
+
+def _timed_lines(blocks, reference):
+    """Yield (epoch, line) for a member's lines.
+
+    Lines without a timestamp keep the previous line's; a member whose format
+    is not recognised sorts before the others, in file order.
+    """
+    parse = None
+    detected = False
+    last = float('-inf')
+    for block in blocks:
+        lines = block.split('\n')
+        if not lines[-1]:
+            lines.pop()
+        if not detected:
+            _, parse = detect_format(lines[:DETECT_SAMPLE_LINES], reference)
+            detected = True
+        for line in lines:
+            if parse is not None:
+                epoch = parse(line)
+                if epoch is not None:
+                    last = epoch
+            yield last, line
+
+
+def iter_merged_blocks(paths, block_size=DEFAULT_BLOCK_SIZE, queue_size=4):
+    """Yield text blocks of whole lines from every member in chronological order.
+
+    Lines with equal timestamps keep their member order (oldest first) and
+    their order within the member.
+    """
+    encoding = locale.getpreferredencoding(False)
+    readers = [_MemberReader(path, block_size, queue_size, encoding) for path in paths]
+    for reader in readers:
+        reader.start()
+    try:
+        streams = [
+            _timed_lines(reader, datetime.fromtimestamp(os.path.getmtime(reader.path), timezone.utc))
+            for reader in readers
+        ]
+        batch = []
+        size = 0
+        for _, line in heapq.merge(*streams, key=itemgetter(0)):
+            batch.append(line)
+            size += len(line) + 1
+            if size >= block_size:
+                yield '\n'.join(batch) + '\n'
+                batch, size = [], 0
+        if batch:
+            yield '\n'.join(batch) + '\n'
+    finally:
+        # Also when the caller stops early or a member fails to read
+        for reader in readers:
+            reader.close()
+
+
+def iter_member_blocks(path, block_size=DEFAULT_BLOCK_SIZE, start=0):
+    """Yield bytes blocks of whole lines from one (possibly compressed) member.
+
+    start is an offset into the decompressed data, on a line boundary.
+    """
+    with open_member(path) as f:
+        f.seek(start)
+        yield from iter_blocks(f, block_size)
@@ -0,0 +1,220 @@
+"""Streaming IOC scan of structured (NDJSON and JSON) evidence.
+
+String values are picked out of the evidence and the distinct values of
+each batch joined with newlines for the combined IOCScanner. No pattern
+matches across a newline, so this finds exactly what scanning every value
+on its own would, without a regex pass per value. Keys, numbers, booleans
+and null are never scanned.
+
+Files are read in blocks of whole lines (JSON strings never contain a raw
+newline), so memory does not grow with the file and nesting depth is not
+limited by recursion:
+
+* Scanning every field, each block's string values are extracted with one
+  regex pass, a key being a string followed by ':'.
+* With a field filter, NDJSON is decoded a line at a time with json.loads
+  and walked with an explicit stack, so each value is known by its key.
+* Anything else (a filtered pretty-printed document, a single line longer
+  than a block or nested too deep for json) goes through an incremental
+  tokenizer that tracks keys across blocks.
+"""
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+import json
+import re
+
+from analysis.ioc_scanner import DEFAULT_BLOCK_SIZE
+from collectors.evidence_stream import SECTION_KEY
+
+STRUCTURED_PATTERNS = ("*.ndjson", "*.json")
+# Collection metadata (file hashes of the evidence itself), not evidence
+SKIPPED_FILES = ("manifest.json",)
+
+# A string and the ':' that makes it a key; section headers match whole and empty
+_STRING = re.compile(
+    rf'"{SECTION_KEY}"[ \t\r\n]*:[ \t\r\n]*"[^"\\]*(?:\\.[^"\\]*)*"|"([^"\\]*(?:\\.[^"\\]*)*)"([ \t\r\n]*:)?'
+)
+# A complete string (and the ':' that makes it a key), a bracket, or the
+# opening quote of a string that continues past the end of the buffer.
+_TOKEN = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"([ \t\r\n]*:)?|([\[\]{}])|(")')
+_TRAILING_SPACE = re.compile(r'[ \t\r\n]*\Z')
+
+
+def structured_files(evidence_path):
+    """Return the structured evidence files in a directory."""
+    paths = []
+    for pattern in STRUCTURED_PATTERNS:
+        paths.extend(path for path in sorted(Path(evidence_path).glob(pattern)) if path.name not in SKIPPED_FILES)
+    return paths
+
+
+def _unescape(text):
+    if '\\' not in text:
+        return text
+    try:
+        return json.loads(f'"{text}"')
+    except ValueError:
+        return text
+
+
+def iter_tokenized_strings(chunks):
+    """Yield (field, value) for each non-empty string value in JSON text arriving in chunks.
+
+    field is the key the value belongs to (an array's key for its items),
+    or None outside any object.
+    """
+    stack = []
+    key = None
+    buffer = ''
+    for chunk in chain(chunks, ('',)):
+        final = not chunk
+        buffer += chunk
+        pos = len(buffer)
+        for m in _TOKEN.finditer(buffer):
+            string, colon, bracket, unterminated = m.groups()
+            if bracket is not None:
+                if bracket in '{[':
+                    stack.append(key)
+                else:
+                    key = stack.pop() if stack else None
+            elif unterminated is not None or (
+                colon is None and not final and _TRAILING_SPACE.match(buffer, m.end())
+            ):
+                # Cut off by the end of the buffer (a key's ':' may be in the next chunk)
+                pos = m.start()
+                break
+            elif colon is not None:
+                key = _unescape(string)
+            elif string:
+                yield key, _unescape(string)
+        buffer = buffer[pos:]
+
+
+def _walk(value, fields, exclude, values):
+    """Append the string values of a decoded JSON value that pass the field filter."""
+    stack = [(None, value)]
+    while stack:
+        key, value = stack.pop()
+        if isinstance(value, str):
+            if value and key not in exclude and (fields is None or key in fields):
+                values.append(value)
+        elif isinstance(value, dict):
+            stack.extend(value.items())
+        elif isinstance(value, list):
+            stack.extend((key, item) for item in value)
+
+
+def _filtered(pairs, fields, exclude):
+    return [value for key, value in pairs if key not in exclude and (fields is None or key in fields)]
+
+
+def _block_values(block, fields, exclude):
+    """Return the string values of a block of whole lines, and the offset json gave up at (or None)."""
+    if fields is None and exclude == {SECTION_KEY}:
+        values = [value for value, colon in _STRING.findall(block) if value and not colon]
+        if '\\' in block:
+            values = [_unescape(value) for value in values]
+        return values, None
+    values = []
+    offset = 0
+    for line in block.split('\n'):
+        if line.strip():
+            try:
+                _walk(json.loads(line), fields, exclude, values)
+            except (ValueError, RecursionError):
+                # Not one value per line, or too deep for json
+                return values, offset
+        offset += len(line) + 1
+    return values, None
+
+
+def iter_string_values(path, fields=None, exclude_fields=(), block_size=DEFAULT_BLOCK_SIZE):
+    """Yield lists of the non-empty string values in a JSON or NDJSON file, block by block.
+
+    With fields only values of those keys (at any depth) are kept; values of
+    exclude_fields never are. Section headers of evidence files are skipped.
+    """
+    fields = set(fields) if fields else None
+    exclude = set(exclude_fields or ()) | {SECTION_KEY}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        rest = ''
+        while True:
+            chunk = f.read(block_size)
+            buffer = rest + chunk
+            if not buffer:
+                return
+            cut = buffer.rfind('\n') + 1 if chunk else len(buffer)
+            if not cut:
+                rest = buffer
+                if len(buffer) > block_size:
+                    break
+                continue
+            values, failed = _block_values(buffer[:cut], fields, exclude)
+            yield values
+            if failed is not None:
+                rest = buffer[failed:]
+                break
+            rest = buffer[cut:]
+            if not chunk:
+                return
+        # The rest is one line longer than a block or not line-delimited JSON
+        pairs = []
+        for pair in iter_tokenized_strings(chain((rest,), iter(lambda: f.read(block_size), ''))):
+            pairs.append(pair)
+            if len(pairs) >= 4096:
+                yield _filtered(pairs, fields, exclude)
+                pairs = []
+        yield _filtered(pairs, fields, exclude)
+
+
+class StructuredScanner:
+    """Scans the string values of structured evidence files in batches.
+
+    With fields, only values of those fields (at any depth) are scanned;
+    values of exclude_fields never are. Evidence repeats the same strings
+    (channels, sources, user names, addresses) across records, so each
+    distinct value in a batch is scanned once and its matches are counted as
+    many times as it occurs.
+    """
+
+    def __init__(self, scanner, fields=None, exclude_fields=(), batch_size=DEFAULT_BLOCK_SIZE):
+        self.scanner = scanner
+        self.fields = fields
+        self.exclude_fields = exclude_fields
+        self.batch_size = batch_size
+
+    def iter_batches(self, path):
+        """Yield a Counter of the scanned values for every batch_size characters of them."""
+        batch = Counter()
+        size = 0
+        for values in iter_string_values(path, self.fields, self.exclude_fields, self.batch_size):
+            batch.update(values)
+            size += sum(map(len, values)) + len(values)
+            if size >= self.batch_size:
+                yield batch
+                batch, size = Counter(), 0
+        if batch:
+            yield batch
+
+    def iter_matches(self, path):
+        """Yield (ioc_type, match, count) for every IOC in the scanned values of a file.
+
+        count is the number of times the value containing the match occurs
+        in its batch.
+        """
+        binary = self.scanner.binary
+        for batch in self.iter_batches(path):
+            values = list(batch)
+            parts = [value.encode('utf-8') for value in values] if binary else values
+            text = (b'\n' if binary else '\n').join(parts)
+            # Values may themselves contain newlines, so each match is traced
+            # back to its value by where the value starts in the joined text
+            starts = []
+            offset = 0
+            for part in parts:
+                starts.append(offset)
+                offset += len(part) + 1
+            for ioc_type, match, position in self.scanner.iter_positions(text):
+                yield ioc_type, match, batch[values[bisect_right(starts, position) - 1]]
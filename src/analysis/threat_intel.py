@@ -0,0 +1,405 @@
+"""Local threat-intel feed matching.
+
+Feeds are plain text files with one indicator per line (IP, CIDR range,
+domain, email or hash; '#' starts a comment). They are compiled once into an
+on-disk index, which is memory-mapped at analysis time:
+
+- ``bloom.bin``: Bloom filter over every exact indicator, checked first.
+- ``exact.bin``: sorted 64-bit records (48-bit indicator hash, 16-bit feed id).
+- ``cidr4.bin``, ``cidr6.bin``: IPv4 and IPv6 ranges, flattened into sorted
+  disjoint segments that each list the ranges covering them.
+- ``index.json``: feed names, sizes and Bloom parameters.
+
+Exact records are sorted in runs of EXACT_RUN_SIZE on disk and merged, so
+building never holds more than one run of them in memory.
+
+Build an index with ``python -m analysis.threat_intel OUTPUT_DIR FEED...``
+from the ``src`` directory.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import argparse
+import hashlib
+import heapq
+import ipaddress
+import json
+import logging
+import math
+import mmap
+import os
+from pathlib import Path
+import tempfile
+
+INDEX_VERSION = 2
+BLOOM_ERROR_RATE = 0.01
+FEED_BITS = 16
+MAX_FEEDS = 1 << FEED_BITS
+# Exact records sorted in memory at a time while building
+EXACT_RUN_SIZE = 1 << 20
+# Array items read or written at a time from run and index files
+IO_BLOCK = 1 << 16
+
+# Range files per IP version: (file name, array typecode, words per address, address bits)
+RANGE_FILES = {4: ("cidr4.bin", 'I', 1, 32), 6: ("cidr6.bin", 'Q', 2, 128)}
+
+_HASH_LENGTHS = (32, 40, 64, 128)
+
+
+def _digest(kind, value):
+    raw = hashlib.blake2b(f"{kind}:{value}".encode(), digest_size=16).digest()
+    return int.from_bytes(raw[:8], 'big'), int.from_bytes(raw[8:], 'big')
+
+
+def _bloom_positions(h1, h2, hashes, bits):
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def classify_indicator(text):
+    """Return (kind, normalized value) for a feed line, or None to skip it."""
+    value = text.strip().lower()
+    if not value:
+        return None
+    if '/' in value:
+        try:
+            return 'cidr', ipaddress.ip_network(value, strict=False)
+        except ValueError:
+            return None
+    try:
+        return 'ip', str(ipaddress.ip_address(value))
+    except ValueError:
+        pass
+    if len(value) in _HASH_LENGTHS and all(c in '0123456789abcdef' for c in value):
+        return 'hash', value
+    if '@' in value:
+        return 'email', value
+    if '.' in value:
+        return 'domain', value.rstrip('.')
+    return None
+
+
+def _iter_feed(path):
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            line = line.split('#', 1)[0].split(',', 1)[0]
+            entry = classify_indicator(line)
+            if entry is not None:
+                yield entry
+
+
+def _spill_run(records, seeds, work, runs):
+    """Write records sorted (with their Bloom seeds in the same order) as a run file pair."""
+    order = sorted(range(len(records)), key=records.__getitem__)
+    path = os.path.join(work, f"run{len(runs)}")
+    with open(path + ".records", 'wb') as f:
+        array('Q', (records[i] for i in order)).tofile(f)
+    with open(path + ".seeds", 'wb') as f:
+        array('Q', (seeds[i] for i in order)).tofile(f)
+    runs.append(path)
+
+
+def _iter_blocks(path, typecode='Q'):
+    """Yield arrays of up to IO_BLOCK items read from an array file."""
+    with open(path, 'rb') as f:
+        while True:
+            block = array(typecode)
+            block.frombytes(f.read(IO_BLOCK * block.itemsize))
+            if not block:
+                return
+            yield block
+
+
+def _iter_run(path):
+    for block in _iter_blocks(path):
+        yield from block
+
+
+def _merge_runs(runs, path):
+    """Merge sorted run files into one deduplicated array file and return its length."""
+    written = 0
+    previous = None
+    out = array('Q')
+    with open(path, 'wb') as f:
+        for record in heapq.merge(*(_iter_run(run + ".records") for run in runs)):
+            if record == previous:
+                continue
+            previous = record
+            out.append(record)
+            if len(out) >= IO_BLOCK:
+                out.tofile(f)
+                written += len(out)
+                out = array('Q')
+        out.tofile(f)
+    return written + len(out)
+
+
+def _flatten(ranges, last, typecode):
+    """Split sorted (start, end, feed id) ranges into disjoint segments.
+
+    Returns (segment starts, offsets, members): segment i covers addresses
+    from starts[i] up to the next segment's start and lies in the ranges
+    members[offsets[i]:offsets[i + 1]]. CIDR ranges either nest or are
+    disjoint, so a segment lists only the ranges nested around it.
+    """
+    segment_starts, offsets, members = [], array(typecode, [0]), array(typecode)
+    active = []
+    ends = []  # heap of the address after each active range
+    index = 0
+    while index < len(ranges) or ends:
+        bound = ranges[index][0] if index < len(ranges) else None
+        if ends and (bound is None or ends[0] <= bound):
+            bound = ends[0]
+        while ends and ends[0] == bound:
+            heapq.heappop(ends)
+        active = [member for member in active if ranges[member][1] >= bound]
+        while index < len(ranges) and ranges[index][0] == bound:
+            active.append(index)
+            if ranges[index][1] < last:
+                heapq.heappush(ends, ranges[index][1] + 1)
+            index += 1
+        segment_starts.append(bound)
+        members.extend(active)
+        offsets.append(len(members))
+    return segment_starts, offsets, members
+
+
+def _write_ranges(path, ranges, typecode, width, bits):
+    """Write ranges and their segments to path and return the column lengths."""
+    ranges.sort()
+    segment_starts, offsets, members = _flatten(ranges, (1 << bits) - 1, typecode)
+
+    def words(values):
+        column = array(typecode)
+        for value in values:
+            for shift in range(width - 1, -1, -1):
+                column.append((value >> (64 * shift)) & 0xFFFFFFFFFFFFFFFF)
+        return column
+
+    with open(path, 'wb') as f:
+        words(start for start, _, _ in ranges).tofile(f)
+        words(end for _, end, _ in ranges).tofile(f)
+        array(typecode, (feed_id for _, _, feed_id in ranges)).tofile(f)
+        words(segment_starts).tofile(f)
+        offsets.tofile(f)
+        members.tofile(f)
+    return {"ranges": len(ranges), "segments": len(segment_starts), "members": len(members)}
+
+
+def build_index(feed_paths, index_dir):
+    """Compile feed files into an index directory and return its metadata."""
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    feeds = [Path(path).stem for path in feed_paths]
+    if len(feeds) > MAX_FEEDS:
+        raise ValueError(f"At most {MAX_FEEDS} feeds can be indexed, got {len(feeds)}")
+
+    with tempfile.TemporaryDirectory(dir=index_dir) as work:
+        runs = []
+        records, seeds = array('Q'), array('Q')
+        count = 0
+        ranges = {4: [], 6: []}
+        for feed_id, path in enumerate(feed_paths):
+            for kind, value in _iter_feed(path):
+                if kind == 'cidr':
+                    ranges[value.version].append(
+                        (int(value.network_address), int(value.broadcast_address), feed_id)
+                    )
+                    continue
+                h1, h2 = _digest(kind, value)
+                records.append(((h1 >> FEED_BITS) << FEED_BITS) | feed_id)
+                seeds.append(h2)
+                if len(records) >= EXACT_RUN_SIZE:
+                    count += len(records)
+                    _spill_run(records, seeds, work, runs)
+                    records, seeds = array('Q'), array('Q')
+            logging.info(f"Loaded feed {path}")
+        count += len(records)
+        _spill_run(records, seeds, work, runs)
+        del records, seeds
+
+        # Bloom filter sized for the exact entries at the configured error rate
+        bits = max(64, int(-max(count, 1) * math.log(BLOOM_ERROR_RATE) / math.log(2) ** 2))
+        hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+        bloom = bytearray((bits + 7) // 8)
+        for run in runs:
+            for records, seeds in zip(_iter_blocks(run + ".records"), _iter_blocks(run + ".seeds")):
+                for record, h2 in zip(records, seeds):
+                    for position in _bloom_positions(record >> FEED_BITS, h2, hashes, bits):
+                        bloom[position >> 3] |= 1 << (position & 7)
+        with open(index_dir / "bloom.bin", 'wb') as f:
+            f.write(bloom)
+        del bloom
+
+        exact_entries = _merge_runs(runs, index_dir / "exact.bin")
+
+    meta = {
+        "version": INDEX_VERSION,
+        "feeds": feeds,
+        "exact_entries": exact_entries,
+        "bloom_bits": bits,
+        "bloom_hashes": hashes
+    }
+    for version, (name, typecode, width, address_bits) in RANGE_FILES.items():
+        meta[f"cidr{version}"] = _write_ranges(index_dir / name, ranges[version], typecode, width, address_bits)
+    with open(index_dir / "index.json", 'w') as f:
+        json.dump(meta, f)
+    logging.info(f"Built threat-intel index with {exact_entries} indicators and "
+                 f"{len(ranges[4]) + len(ranges[6])} ranges in {index_dir}")
+    return meta
+
+
+def _map(path, typecode):
+    if os.path.getsize(path) == 0:
+        return None, memoryview(b'').cast(typecode)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast(typecode)
+
+
+class _Wide:
+    """Read-only sequence of integers stored as several big-endian 64-bit words each."""
+
+    def __init__(self, words, width):
+        self.words = words
+        self.width = width
+
+    def __len__(self):
+        return len(self.words) // self.width
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        value = 0
+        for word in self.words[index * self.width:(index + 1) * self.width]:
+            value = (value << 64) | word
+        return value
+
+
+class _RangeTable:
+    """Memory-mapped ranges of one IP version and the disjoint segments they cover."""
+
+    def __init__(self, path, typecode, width, lengths):
+        self._map, column = _map(path, typecode)
+        n, segments = lengths["ranges"], lengths["segments"]
+        sizes = (n * width, n * width, n, segments * width, segments + 1, lengths["members"])
+        columns = []
+        offset = 0
+        for size in sizes:
+            columns.append(column[offset:offset + size])
+            offset += size
+        wide = (lambda words: words) if width == 1 else (lambda words: _Wide(words, width))
+        self.starts, self.ends = wide(columns[0]), wide(columns[1])
+        self.feed_ids = columns[2]
+        self.segment_starts = wide(columns[3])
+        self.offsets, self.members = columns[4], columns[5]
+
+    def lookup(self, value):
+        """Return (start, end, feed id) for every range containing value."""
+        index = bisect_right(self.segment_starts, value) - 1
+        if index < 0:
+            return []
+        return [(self.starts[member], self.ends[member], self.feed_ids[member])
+                for member in self.members[self.offsets[index]:self.offsets[index + 1]]]
+
+
+class ThreatIntelIndex:
+    """Memory-mapped threat-intel index; loading only maps files, so it is cheap."""
+
+    def __init__(self, index_dir):
+        index_dir = Path(index_dir)
+        with open(index_dir / "index.json", 'r') as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported threat-intel index version in {index_dir}")
+        self.feeds = meta["feeds"]
+        self.bloom_bits = meta["bloom_bits"]
+        self.bloom_hashes = meta["bloom_hashes"]
+        self._bloom_map, self.bloom = _map(index_dir / "bloom.bin", 'B')
+        self._exact_map, self.exact = _map(index_dir / "exact.bin", 'Q')
+        self.ranges = {
+            version: _RangeTable(index_dir / name, typecode, width, meta[f"cidr{version}"])
+            for version, (name, typecode, width, _) in RANGE_FILES.items()
+        }
+
+    def lookup(self, kind, value):
+        """Return the feeds listing an exact indicator."""
+        h1, h2 = _digest(kind, value)
+        for position in _bloom_positions(h1 >> FEED_BITS, h2, self.bloom_hashes, self.bloom_bits):
+            if not self.bloom[position >> 3] & (1 << (position & 7)):
+                return []
+        prefix = (h1 >> FEED_BITS) << FEED_BITS
+        index = bisect_left(self.exact, prefix)
+        feeds = []
+        while index < len(self.exact) and self.exact[index] >> FEED_BITS == h1 >> FEED_BITS:
+            feeds.append(self.feeds[self.exact[index] & (MAX_FEEDS - 1)])
+            index += 1
+        return feeds
+
+    def lookup_ip_ranges(self, address):
+        """Return (range, feed) pairs for every indexed CIDR containing address."""
+        ip = ipaddress.ip_address(address)
+        return [(self._range_text(start, end, ip.version), self.feeds[feed_id])
+                for start, end, feed_id in self.ranges[ip.version].lookup(int(ip))]
+
+    def _range_text(self, start, end, version=4):
+        first = ipaddress.ip_address(start) if version == 4 else ipaddress.IPv6Address(start)
+        last = ipaddress.ip_address(end) if version == 4 else ipaddress.IPv6Address(end)
+        return str(next(ipaddress.summarize_address_range(first, last)))
+
+    def match(self, ioc_type, value):
+        """Yield match dicts for one indicator found in the evidence."""
+        value = value.lower()
+        if ioc_type == 'ip':
+            try:
+                canonical = str(ipaddress.ip_address(value))
+            except ValueError:
+                return
+            for feed in self.lookup('ip', canonical):
+                yield self._result(ioc_type, value, canonical, feed, 'exact')
+            for cidr, feed in self.lookup_ip_ranges(canonical):
+                yield self._result(ioc_type, value, cidr, feed, 'cidr')
+        elif ioc_type == 'domain':
+            yield from self._match_domain(ioc_type, value, value)
+        elif ioc_type == 'email':
+            for feed in self.lookup('email', value):
+                yield self._result(ioc_type, value, value, feed, 'exact')
+            yield from self._match_domain(ioc_type, value, value.rsplit('@', 1)[-1])
+        else:
+            for feed in self.lookup(ioc_type, value):
+                yield self._result(ioc_type, value, value, feed, 'exact')
+
+    def _match_domain(self, ioc_type, value, domain):
+        labels = domain.rstrip('.').split('.')
+        # Check the domain itself and each parent down to the registrable level
+        for i in range(len(labels) - 1):
+            candidate = '.'.join(labels[i:])
+            for feed in self.lookup('domain', candidate):
+                yield self._result(ioc_type, value, candidate, feed, 'exact' if i == 0 else 'suffix')
+
+    def _result(self, ioc_type, value, indicator, feed, match):
+        return {
+            "type": "threat_intel",
+            "ioc_type": ioc_type,
+            "value": value,
+            "indicator": indicator,
+            "feed": feed,
+            "match": match
+        }
+
+    def match_iocs(self, iocs):
+        """Yield matches for every indicator in an IOCStore (or dict of sets)."""
+        for ioc_type, values in iocs.items():
+            for value in values:
+                yield from self.match(ioc_type, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a threat-intel index from feed files.")
+    parser.add_argument("output", help="Directory to write the index to")
+    parser.add_argument("feeds", nargs='+', help="Feed files, one indicator per line")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    build_index(args.feeds, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,191 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from operator import itemgetter
+import heapq
 import logging
 from pathlib import Path
 import json
 import os
 
+from collectors.evidence_stream import EvidenceReader
+from analysis.external_sort import ExternalSorter
+from analysis.ioc_scanner import DEFAULT_BLOCK_SIZE, iter_blocks
+from analysis.rotated_logs import iter_merged_blocks, rotated_set
+from analysis.timestamps import DETECT_SAMPLE_LINES, detect_format, parse_timestamp, to_datetime
+
+LOG_SOURCE = 'Log File'
+
+# Raw events are (epoch, sequence, line) tuples until they are emitted.
+_event_key = itemgetter(0, 1)
+_timestamp_key = itemgetter('timestamp')
+
 class TimelineAnalyzer:
     def __init__(self, config):
         self.config = config
         self.max_events = config['analysis']['timeline_max_events']
+        self.keep = config['analysis'].get('timeline_keep', 'latest')
+        self.sort_buffer = config['analysis'].get('timeline_sort_buffer', 100000)
+        self.block_size = config['analysis'].get('scan_block_size', DEFAULT_BLOCK_SIZE)
         self.timeline = []
+        self.unparsed_lines = 0
+        self.parse_misses = 0
 
     def build_timeline(self, evidence_path):
-        """Build a timeline of events from the evidence."""
-        timeline = []
+        """Build a timeline of events from the evidence.
+
+        With a positive timeline_max_events only the latest (or earliest, see
+        timeline_keep) events are kept, using a bounded heap. Otherwise the
+        full timeline is returned as an iterator sorted with an external merge
+        sort once it outgrows timeline_sort_buffer events. Rotated members of
+        the log (log_file.txt.1, log_file.txt.2.gz, ...) are merged in.
+        """
         log_file = os.path.join(evidence_path, "log_file.txt")
+        members = rotated_set(log_file)
         
-        if not os.path.exists(log_file):
+        if not members:
             logging.warning(f"Log file {log_file} does not exist.")
-            return timeline
+            return []
         
-        with open(log_file, 'r') as f:
-            for line in f:
-                # Placeholder for actual timeline building logic
-                event = {
-                    "timestamp": "2023-01-01T00:00:00Z",  # Placeholder timestamp
-                    "event": line.strip()
-                }
-                timeline.append(event)
+        self.start(members[-1])
+        if len(members) > 1:
+            for block in iter_merged_blocks(members, self.block_size):
+                self.consume(block)
+        else:
+            with open(log_file, 'r') as f:
+                for block in iter_blocks(f, self.block_size):
+                    self.consume(block)
+        return self.finish()
+
+    def start(self, log_file):
+        """Reset the per-file state before consuming a log file."""
+        self._log_file = log_file
+        self._reference = datetime.fromtimestamp(os.path.getmtime(log_file), timezone.utc)
+        self._sample = []
+        self._detected = False
+        self._parse = None
+        self._last = None
+        self._sequence = 0
+        self._heap = []
+        self._sorter = None if self.max_events else ExternalSorter(_event_key, self.sort_buffer)
+
+    def consume(self, block, offset=0):
+        """Add a block of whole log lines to the timeline.
+
+        The timestamp format is detected once from the first lines of the file.
+        Lines without a timestamp (such as continuation lines of a multi-line
+        entry) inherit the previous line's timestamp; leading lines with none
+        are skipped and counted in unparsed_lines. Every line without a
+        timestamp, kept or not, is counted in parse_misses.
+        """
+        if '\r' in block:
+            block = block.replace('\r\n', '\n')
+        lines = block.split('\n')
+        if not lines[-1]:
+            lines.pop()
+        if not self._detected:
+            self._sample.extend(lines)
+            if len(self._sample) < DETECT_SAMPLE_LINES:
+                return
+            lines, self._sample = self._sample, []
+            self._detect(lines)
+        self._add_lines(lines)
+
+    def finish(self):
+        """Return the timeline built from the consumed blocks."""
+        if not self._detected:
+            lines, self._sample = self._sample, []
+            self._detect(lines)
+            self._add_lines(lines)
+        if self._sorter is not None:
+            return (self._to_event(raw) for raw in self._sorter.sorted())
+
+        if self.keep == 'earliest':
+            kept = sorted((-epoch, -sequence, line) for epoch, sequence, line in self._heap)
+        else:
+            kept = sorted(self._heap)
+        self._heap = []
+        timeline = [self._to_event(raw) for raw in kept]
         
         logging.info(f"Built timeline with {len(timeline)} events from the log file.")
         return timeline
 
+    def _detect(self, lines):
+        self._detected = True
+        name, self._parse = detect_format(lines, self._reference)
+        if self._parse is None and any(lines):
+            logging.warning(f"No known timestamp format in {self._log_file}")
+        elif self._parse is not None:
+            logging.info(f"Detected {name} timestamps in {self._log_file}")
+
+    def _add_lines(self, lines):
+        parse = self._parse
+        if parse is None:
+            missed = sum(1 for line in lines if line)
+            self.unparsed_lines += missed
+            self.parse_misses += missed
+            return
+
+        heap = self._heap
+        earliest = self.keep == 'earliest'
+        last = self._last
+        sequence = self._sequence
+        misses = 0
+        for line in lines:
+            sequence += 1
+            if not line:
+                continue
+            epoch = parse(line)
+            if epoch is None:
+                misses += 1
+                if last is None:
+                    self.unparsed_lines += 1
+                    continue
+                epoch = last
+            last = epoch
+            if self._sorter is not None:
+                self._sorter.add((epoch, sequence, line))
+            elif earliest:
+                raw = (-epoch, -sequence, line)
+                if len(heap) < self.max_events:
+                    heapq.heappush(heap, raw)
+                else:
+                    heapq.heappushpop(heap, raw)
+            elif len(heap) < self.max_events:
+                heapq.heappush(heap, (epoch, sequence, line))
+            else:
+                heapq.heappushpop(heap, (epoch, sequence, line))
+        self._last = last
+        self._sequence = sequence
+        self.parse_misses += misses
+
+    def _to_event(self, raw):
+        return {
+            'timestamp': to_datetime(raw[0]),
+            'source': LOG_SOURCE,
+            'type': None,
+            'description': raw[2]
+        }
+
+    def add_structured_events(self, timeline, evidence_path):
+        """Merge events from the NDJSON evidence files in evidence_path into a timeline.
+
+        Sections are read lazily through EvidenceReader; only the resulting
+        events (bounded by the collection caps) are held in memory.
+        """
+        for path in sorted(Path(evidence_path).glob("*.ndjson")):
+            self._process_evidence(EvidenceReader(path))
+        if not self.timeline:
+            return timeline
+
+        extra = sorted(self.timeline, key=_timestamp_key)
+        self.timeline = []
+        merged = heapq.merge(timeline, extra, key=_timestamp_key)
+        if not isinstance(timeline, list):
+            return merged
+        merged = list(merged)
+        if self.max_events and len(merged) > self.max_events:
+            merged = merged[:self.max_events] if self.keep == 'earliest' else merged[-self.max_events:]
+        return merged
+
     def _process_evidence(self, data):
         # Process Windows evidence
         if 'event_logs' in data:
@@ -39,7 +194,7 @@ class TimelineAnalyzer:
                     timestamp=event['time_generated'],
                     source='Windows Event Log',
                     event_type=event['event_id'],
-                    description=f"{event['source']} - {event['event_category']}"
+                    description=f"{event['source_name']} - {event['event_category']}"
                 )
 
         # Process Linux evidence
@@ -64,7 +219,7 @@ class TimelineAnalyzer:
 
     def _add_event(self, timestamp, source, description, event_type=None):
         try:
-            parsed_time = datetime.fromisoformat(timestamp)
+            parsed_time = to_datetime(parse_timestamp(timestamp))
             self.timeline.append({
                 'timestamp': parsed_time,
                 'source': source,
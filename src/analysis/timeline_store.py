@@ -0,0 +1,240 @@
+"""SQLite timeline store with time-range queries, source filters and paged reads.
+
+Events are indexed by time and by source, so a window such as "02:10 to
+02:40 from the auth log" is read straight from the index instead of
+re-parsing the evidence. The checkpoint (see checkpoint.py) keeps its
+timeline in the same table, so a checkpoint file can be queried as well.
+
+Usage: python -m analysis.timeline_store STORE [--start T] [--end T] [--source S]...
+                                         [--page N] [--page-size N] [--ndjson]
+                                         [--count] [--sources] [--report DIR] [--config PATH]
+"""
+from pathlib import Path
+import argparse
+import json
+import logging
+import sqlite3
+
+from analysis.timestamps import parse_timestamp, to_datetime
+
+PAGE_SIZE = 10000
+
+EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    epoch REAL NOT NULL,
+    source TEXT,
+    type TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS events_epoch ON events (epoch, id);
+CREATE INDEX IF NOT EXISTS events_source ON events (source, epoch, id);
+"""
+
+
+def _bound(value):
+    """Epoch seconds for a range bound given as epoch, datetime or timestamp text."""
+    return None if value is None else parse_timestamp(value)
+
+
+def _to_event(row):
+    epoch, source, event_type, description = row
+    return {
+        'timestamp': to_datetime(epoch),
+        'source': source,
+        'type': event_type,
+        'description': description
+    }
+
+
+class TimelineWindow:
+    """The events of a TimelineStore within a time range and set of sources.
+
+    Iterating reads the window page by page in time order, afresh each time,
+    so it can be handed to several reporters without being held in memory.
+    """
+
+    def __init__(self, store, start=None, end=None, sources=None):
+        self.store = store
+        self.start = start
+        self.end = end
+        self.sources = sources
+
+    def __iter__(self):
+        for page in self.store.pages(self.start, self.end, self.sources):
+            yield from page
+
+    def __len__(self):
+        return self.store.count(self.start, self.end, self.sources)
+
+
+class TimelineStore:
+    """Timeline events on disk in SQLite, indexed by time and source.
+
+    Range bounds (start, end) are inclusive and may be epoch seconds,
+    datetimes or timestamp strings; sources restricts events to those
+    sources. Events come back in time order, ties in insertion order.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(EVENTS_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_events(self, events, max_events=0, keep='latest'):
+        """Append timeline events, then trim to the max_events that would be kept."""
+        rows = (
+            (parse_timestamp(event['timestamp']), event.get('source'), event.get('type'), event.get('description'))
+            for event in events
+        )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO events (epoch, source, type, description) VALUES (?, ?, ?, ?)", rows
+            )
+            if max_events:
+                order = "epoch, id" if keep == 'earliest' else "epoch DESC, id DESC"
+                self.conn.execute(
+                    f"DELETE FROM events WHERE id NOT IN (SELECT id FROM events ORDER BY {order} LIMIT ?)",
+                    (max_events,)
+                )
+
+    def replace_events(self, events):
+        """Replace every stored event with events, returning how many were stored."""
+        with self.conn:
+            self.conn.execute("DELETE FROM events")
+        self.record_events(events)
+        return self.count()
+
+    def load_timeline(self, max_events=0, keep='latest'):
+        """Return the stored timeline in time order.
+
+        With max_events the latest (or earliest) events are returned as a list,
+        otherwise a TimelineWindow over every stored event.
+        """
+        if not max_events:
+            return self.window()
+        if keep == 'earliest':
+            query = "SELECT epoch, source, type, description FROM events ORDER BY epoch, id LIMIT ?"
+            return [_to_event(row) for row in self.conn.execute(query, (max_events,))]
+        query = "SELECT epoch, source, type, description FROM events ORDER BY epoch DESC, id DESC LIMIT ?"
+        timeline = [_to_event(row) for row in self.conn.execute(query, (max_events,))]
+        timeline.reverse()
+        return timeline
+
+    def window(self, start=None, end=None, sources=None):
+        return TimelineWindow(self, _bound(start), _bound(end), list(sources) if sources else None)
+
+    def _where(self, start, end, sources):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("epoch >= ?")
+            params.append(_bound(start))
+        if end is not None:
+            clauses.append("epoch <= ?")
+            params.append(_bound(end))
+        if sources:
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, start=None, end=None, sources=None):
+        where, params = self._where(start, end, sources)
+        return self.conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def page(self, number, page_size=PAGE_SIZE, start=None, end=None, sources=None):
+        """Return page number (from 1) of the events in a window."""
+        where, params = self._where(start, end, sources)
+        query = f"SELECT epoch, source, type, description FROM events{where} ORDER BY epoch, id LIMIT ? OFFSET ?"
+        rows = self.conn.execute(query, params + [page_size, (number - 1) * page_size])
+        return [_to_event(row) for row in rows]
+
+    def pages(self, start=None, end=None, sources=None, page_size=PAGE_SIZE):
+        """Yield the events of a window as lists of at most page_size, in time order.
+
+        Each page continues from the last (epoch, id) seen, so every page is
+        an index seek rather than an OFFSET scan.
+        """
+        where, params = self._where(start, end, sources)
+        where += " AND " if where else " WHERE "
+        query = (f"SELECT epoch, source, type, description, id FROM events{where}(epoch, id) > (?, ?) "
+                 f"ORDER BY epoch, id LIMIT ?")
+        last = (float('-inf'), -1)
+        while True:
+            rows = self.conn.execute(query, params + [*last, page_size]).fetchall()
+            if not rows:
+                break
+            last = (rows[-1][0], rows[-1][4])
+            yield [_to_event(row[:4]) for row in rows]
+            if len(rows) < page_size:
+                break
+
+    def sources(self):
+        """Return [(source, event count)] for every source in the store."""
+        return self.conn.execute(
+            "SELECT source, COUNT(*) FROM events GROUP BY source ORDER BY COUNT(*) DESC"
+        ).fetchall()
+
+    def span(self):
+        """Return the (first, last) event times, or (None, None) if the store is empty."""
+        first, last = self.conn.execute("SELECT MIN(epoch), MAX(epoch) FROM events").fetchone()
+        if first is None:
+            return None, None
+        return to_datetime(first), to_datetime(last)
+
+
+def _report(config_path, window, report_path):
+    """Render a window of the timeline with the configured reporters."""
+    import plugins
+    from main import load_config
+    config = load_config(config_path)
+    for name in plugins.reporter_names(config):
+        plugins.load('reporter', name)(config).generate_report({}, window, [], report_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a timeline store (or checkpoint) by time range and source.")
+    parser.add_argument("store", help="Timeline store or checkpoint SQLite file")
+    parser.add_argument("--start", help="Earliest event time (ISO 8601, epoch seconds, ...), inclusive")
+    parser.add_argument("--end", help="Latest event time, inclusive")
+    parser.add_argument("--source", action="append", help="Only events from this source (repeatable)")
+    parser.add_argument("--page", type=int, default=1, help="Page of results to print, from 1")
+    parser.add_argument("--page-size", type=int, default=100, help="Events per page; 0 prints every event")
+    parser.add_argument("--ndjson", action="store_true", help="Print events as NDJSON")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matching events")
+    parser.add_argument("--sources", action="store_true", help="List sources with their event counts")
+    parser.add_argument("--report", metavar="DIR", help="Write reports of the matching events to DIR")
+    parser.add_argument("--config", default="config/config.yaml", help="Configuration file, for --report")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if not Path(args.store).exists():
+        parser.error(f"Timeline store {args.store} does not exist")
+    store = TimelineStore(args.store)
+    window = store.window(args.start, args.end, args.source)
+
+    if args.sources:
+        for source, count in store.sources():
+            print(f"{count:10d}  {source}")
+    elif args.count:
+        print(len(window))
+    elif args.report:
+        _report(args.config, window, args.report)
+    else:
+        events = window if args.page_size <= 0 else store.page(
+            args.page, args.page_size, window.start, window.end, window.sources
+        )
+        for event in events:
+            if args.ndjson:
+                print(json.dumps(dict(event, timestamp=event['timestamp'].isoformat())))
+            else:
+                print(f"{event['timestamp'].isoformat()}  {event['source']}  {event['type'] or '-'}  "
+                      f"{event['description']}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import calendar
+import re
+from datetime import datetime, timezone
+
+MONTHS = {name: index for index, name in enumerate(calendar.month_abbr) if name}
+
+SYSLOG_RE = re.compile(r'(\w{3}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})')
+ISO8601_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,9}))?(Z|[+-]\d{2}:?\d{2})?'
+)
+EPOCH_RE = re.compile(r'(\d{10})(?:\.(\d{1,9}))?\b')
+AUDIT_RE = re.compile(r'audit\((\d{10})(?:\.(\d{1,9}))?[:)]')
+APACHE_RE = re.compile(r'\[(\d{2})/(\w{3})/(\d{4}):(\d{2}):(\d{2}):(\d{2}) ([+-]\d{4})\]')
+
+# Number of leading lines inspected to pick a file's timestamp format.
+DETECT_SAMPLE_LINES = 50
+
+# Epoch seconds at the start of each (year, month), filled on demand.
+_month_starts = {}
+
+
+def _month_start(year, month):
+    start = _month_starts.get((year, month))
+    if start is None:
+        start = _month_starts[(year, month)] = calendar.timegm((year, month, 1, 0, 0, 0))
+    return start
+
+
+def _epoch(year, month, day, hour, minute, second):
+    return _month_start(year, month) + (day - 1) * 86400 + hour * 3600 + minute * 60 + second
+
+
+def _fraction(digits):
+    return int(digits) / 10 ** len(digits) if digits else 0.0
+
+
+def _offset(text):
+    if not text or text == 'Z':
+        return 0
+    sign = -1 if text[0] == '-' else 1
+    text = text[1:].replace(':', '')
+    return sign * (int(text[:2]) * 3600 + int(text[2:4]) * 60)
+
+
+def parse_iso8601(line):
+    m = ISO8601_RE.match(line)
+    if m is None:
+        return None
+    y, mo, d, h, mi, s, frac, tz = m.groups()
+    return _epoch(int(y), int(mo), int(d), int(h), int(mi), int(s)) + _fraction(frac) - _offset(tz)
+
+
+def parse_epoch(line):
+    m = EPOCH_RE.match(line) or AUDIT_RE.search(line)
+    if m is None:
+        return None
+    return int(m.group(1)) + _fraction(m.group(2))
+
+
+def parse_apache(line):
+    m = APACHE_RE.search(line)
+    if m is None:
+        return None
+    d, mon, y, h, mi, s, tz = m.groups()
+    month = MONTHS.get(mon)
+    if month is None:
+        return None
+    return _epoch(int(y), month, int(d), int(h), int(mi), int(s)) - _offset(tz)
+
+
+def make_syslog_parser(reference):
+    """Build a parser for syslog lines, which carry no year.
+
+    The year is taken from the reference time (usually the file's mtime); months
+    later than the reference month belong to the previous year.
+    """
+    def parse_syslog(line):
+        m = SYSLOG_RE.match(line)
+        if m is None:
+            return None
+        mon, d, h, mi, s = m.groups()
+        month = MONTHS.get(mon)
+        if month is None:
+            return None
+        year = reference.year - 1 if month > reference.month else reference.year
+        return _epoch(year, month, int(d), int(h), int(mi), int(s))
+    return parse_syslog
+
+
+def detect_format(lines, reference=None):
+    """Pick the timestamp parser that matches most of the sample lines.
+
+    Returns (name, parser) or (None, None) if no known format matches.
+    Naive timestamps (syslog, ISO 8601 without offset) are treated as UTC.
+    """
+    reference = reference or datetime.now(timezone.utc)
+    candidates = [
+        ('iso8601', parse_iso8601),
+        ('syslog', make_syslog_parser(reference)),
+        ('apache', parse_apache),
+        ('epoch', parse_epoch)
+    ]
+    best, best_hits = (None, None), 0
+    for name, parser in candidates:
+        hits = sum(1 for line in lines if parser(line) is not None)
+        if hits > best_hits:
+            best, best_hits = (name, parser), hits
+    return best
+
+
+def parse_timestamp(value):
+    """Parse a single timestamp of any supported kind into epoch seconds."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    for parser in (parse_iso8601, parse_epoch, parse_apache):
+        parsed = parser(value)
+        if parsed is not None:
+            return parsed
+    return parse_timestamp(datetime.fromisoformat(value))
+
+
+def to_datetime(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc)
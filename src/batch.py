@@ -0,0 +1,171 @@
+"""Non-interactive batch processing of many cases.
+
+Usage: python src/batch.py MANIFEST [--workers N] [--config PATH] [--summary PATH]
+                           [--profile] [--tracemalloc]
+
+The manifest is a YAML (or JSON) list of cases, or a mapping with a
+``cases`` list. Each case has ``log_file``, ``evidence_path`` and
+``report_path`` (relative paths are resolved against the manifest's
+directory) and an optional ``name``. Cases run in a process pool, one fresh
+worker process per case, so a crash or leak in one case never affects another.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+import yaml
+
+from instrumentation import metrics
+from main import RUN_REPORT, analyze_evidence, collect_evidence, generate_reports, load_config
+
+def load_manifest(manifest_path):
+    """Load the list of cases from a manifest file."""
+    with open(manifest_path, 'r') as f:
+        manifest = yaml.safe_load(f)
+    cases = manifest.get('cases', []) if isinstance(manifest, dict) else manifest
+    if not isinstance(cases, list):
+        raise ValueError(f"Manifest {manifest_path} must contain a list of cases")
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    resolved = []
+    for number, case in enumerate(cases, 1):
+        missing = [key for key in ('log_file', 'evidence_path', 'report_path') if not case.get(key)]
+        if missing:
+            raise ValueError(f"Case {number} in {manifest_path} is missing {', '.join(missing)}")
+        case = dict(case)
+        for key in ('log_file', 'evidence_path', 'report_path'):
+            case[key] = os.path.join(base, os.path.expanduser(case[key]))
+        case.setdefault('name', os.path.basename(os.path.normpath(case['evidence_path'])))
+        resolved.append(case)
+    names = [case['name'] for case in resolved]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Case names in {manifest_path} must be unique")
+    return resolved
+
+def run_case(config, case, profile=False, trace_memory=False, log_level=logging.INFO):
+    """Collect, analyze and report one case, returning a result record.
+
+    The case's run report (see instrumentation) is written to its report
+    directory and its log, from log_level up, to case.log there.
+    """
+    result = {'name': case['name'], 'status': 'ok', 'error': None, 'bytes': 0, 'stages': {}}
+    os.makedirs(case['report_path'], exist_ok=True)
+    metrics.reset(trace_memory=trace_memory, profile_dir=case['report_path'] if profile else None)
+    # A fresh worker process has no logging configured (root level WARNING)
+    logging.getLogger().setLevel(log_level)
+    handler = logging.FileHandler(os.path.join(case['report_path'], 'case.log'))
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logging.getLogger().addHandler(handler)
+    start = time.perf_counter()
+    try:
+        if not os.path.exists(case['log_file']):
+            raise FileNotFoundError(f"Log file {case['log_file']} does not exist")
+        result['bytes'] = os.path.getsize(case['log_file'])
+
+        with metrics.stage("collect"):
+            evidence = collect_evidence(config, case['log_file'], case['evidence_path'])
+
+        with metrics.stage("analyze"):
+            iocs, timeline, analysis_results = analyze_evidence(config, evidence)
+
+        with metrics.stage("report"):
+            generate_reports(config, iocs, timeline, analysis_results, case['report_path'])
+
+        result['iocs'] = {ioc_type: len(values) for ioc_type, values in iocs.items()}
+        result['matches'] = len(analysis_results)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['bytes'] = 0
+        logging.error(f"Case {case['name']} failed:\n{traceback.format_exc()}")
+    finally:
+        result['stages'] = {name: stage.wall for name, stage in metrics.stages.items() if '.' not in name}
+        metrics.write(os.path.join(case['report_path'], RUN_REPORT))
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+
+    result['seconds'] = time.perf_counter() - start
+    result['mb_per_s'] = result['bytes'] / (1024 * 1024) / result['seconds'] if result['seconds'] else 0.0
+    return result
+
+def _run_pool(config, cases, workers, profile=False, trace_memory=False):
+    """Run cases in one pool; return (results by name, cases lost to a broken pool)."""
+    results = {}
+    broken = []
+    log_level = logging.getLogger().getEffectiveLevel()
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as executor:
+        futures = {executor.submit(run_case, config, case, profile, trace_memory, log_level): case for case in cases}
+        for future in as_completed(futures):
+            case = futures[future]
+            try:
+                results[case['name']] = future.result()
+            except BrokenProcessPool:
+                broken.append(case)
+    return results, broken
+
+def run_batch(config, cases, workers=1, profile=False, trace_memory=False):
+    """Run every case, returning (results in manifest order, wall seconds)."""
+    start = time.perf_counter()
+    results, broken = _run_pool(config, cases, workers, profile, trace_memory)
+    # A worker that dies outright (e.g. killed for memory) breaks the whole
+    # pool, so cases caught up in it are retried alone to find the culprit.
+    for case in broken:
+        retried, lost = _run_pool(config, [case], 1, profile, trace_memory)
+        if lost:
+            retried[case['name']] = {'name': case['name'], 'status': 'failed', 'error': "Worker process died",
+                                     'bytes': 0, 'stages': {}, 'seconds': 0.0, 'mb_per_s': 0.0}
+        results.update(retried)
+    for case in cases:
+        result = results[case['name']]
+        logging.info(f"Case {result['name']} {result['status']} in {result['seconds']:.2f}s"
+                     + (f": {result['error']}" if result['error'] else ""))
+    return [results[case['name']] for case in cases], time.perf_counter() - start
+
+def summarize(results, elapsed):
+    """Return the overall batch summary for a list of case results."""
+    total_bytes = sum(result['bytes'] for result in results)
+    return {
+        'cases': len(results),
+        'succeeded': sum(result['status'] == 'ok' for result in results),
+        'failed': [result['name'] for result in results if result['status'] != 'ok'],
+        'seconds': elapsed,
+        'bytes': total_bytes,
+        'mb_per_s': total_bytes / (1024 * 1024) / elapsed if elapsed else 0.0,
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect, analyze and report many cases from a manifest.")
+    parser.add_argument("manifest", help="YAML or JSON manifest of cases")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Cases processed concurrently")
+    parser.add_argument("--config", default="config/config.yaml", help="Configuration file")
+    parser.add_argument("--summary", help="Write the batch summary as JSON to this path")
+    parser.add_argument("--profile", action="store_true", help="Profile each case's stages with cProfile")
+    parser.add_argument("--tracemalloc", action="store_true", help="Record peak traced memory per stage")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    config = load_config(args.config)
+    cases = load_manifest(args.manifest)
+
+    results, elapsed = run_batch(config, cases, args.workers, args.profile, args.tracemalloc)
+    summary = summarize(results, elapsed)
+
+    for result in results:
+        print(f"{result['name']:30s} {result['status']:7s} {result['seconds']:8.2f}s {result['mb_per_s']:8.1f} MB/s"
+              + (f"  {result['error']}" if result['error'] else ""))
+    print(f"{summary['succeeded']}/{summary['cases']} cases succeeded in {elapsed:.2f}s "
+          f"({summary['mb_per_s']:.1f} MB/s overall)")
+
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import errno
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import time
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Errors meaning the kernel copy path is unavailable for this pair of files.
+_KERNEL_COPY_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+def _write_all(fd, view):
+    written = os.write(fd, view)
+    while written < len(view):
+        written += os.write(fd, view[written:])
+
+
+def _copy_hashing(fsrc, fdst, hashers, buffer_size):
+    # An anonymous mapping gives a page-aligned buffer that is reused for every read.
+    size = 0
+    with mmap.mmap(-1, buffer_size) as buffer, memoryview(buffer) as view:
+        while True:
+            n = fsrc.readinto(buffer)
+            if not n:
+                break
+            with view[:n] as chunk:
+                for hasher in hashers:
+                    hasher.update(chunk)
+                _write_all(fdst.fileno(), chunk)
+            size += n
+    return size
+
+
+def _copy_kernel(fsrc, fdst, buffer_size):
+    infd, outfd = fsrc.fileno(), fdst.fileno()
+    size = 0
+    for copy in (getattr(os, 'copy_file_range', None), os.sendfile):
+        if copy is None:
+            continue
+        try:
+            while True:
+                if copy is os.sendfile:
+                    n = os.sendfile(outfd, infd, size, buffer_size)
+                else:
+                    n = copy(infd, outfd, buffer_size)
+                if n == 0:
+                    if size or copy is os.sendfile:
+                        return size
+                    # Some filesystems (procfs, sysfs) report nothing to
+                    # copy_file_range; sendfile reads them like read() does
+                    break
+                size += n
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_ERRNOS or size:
+                raise
+    shutil.copyfileobj(fsrc, fdst, buffer_size)
+    return fdst.tell()
+
+
+def copy_evidence(source, destination, algorithms=('sha256', 'md5'), buffer_size=DEFAULT_BUFFER_SIZE):
+    """Copy one evidence file and return its manifest entry.
+
+    With hash algorithms the file is hashed in the same pass as the copy.
+    Without them the copy stays in the kernel via copy_file_range or sendfile.
+    The destination is rewritten in place so its inode survives re-collection.
+    """
+    start = time.perf_counter()
+    hashers = [hashlib.new(name) for name in algorithms]
+    with open(source, 'rb', buffering=0) as fsrc, open(destination, 'wb', buffering=0) as fdst:
+        if hashers:
+            size = _copy_hashing(fsrc, fdst, hashers, buffer_size)
+        else:
+            size = _copy_kernel(fsrc, fdst, buffer_size)
+    shutil.copystat(source, destination)
+    elapsed = time.perf_counter() - start
+
+    entry = {
+        "source": str(source),
+        "destination": str(destination),
+        "size": size
+    }
+    for name, hasher in zip(algorithms, hashers):
+        entry[name] = hasher.hexdigest()
+    entry["seconds"] = round(elapsed, 6)
+    entry["mb_per_s"] = round(size / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None
+    logging.info(f"Copied {source} ({size} bytes) in {elapsed:.3f}s")
+    return entry
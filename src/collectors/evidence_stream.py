@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+from threading import Lock
+
+# Key marking a section header line; every other line is one record.
+SECTION_KEY = "__section__"
+INDEX_SUFFIX = ".idx"
+
+
+def index_path(path):
+    return f"{path}{INDEX_SUFFIX}"
+
+
+class EvidenceWriter:
+    """Append-only, record-per-line (NDJSON) evidence file.
+
+    Records are written as they are produced under a section header line, so
+    a collector never holds a whole section in memory. Sections may be
+    interleaved (for example by concurrent producers); each switch starts a
+    new header. On close an index of section header byte offsets is written
+    next to the file so readers can seek straight to a section; it records
+    the file size, so readers ignore it once the file has changed.
+    """
+
+    def __init__(self, path, index=True):
+        self.path = str(path)
+        self.index = index
+        self._file = open(self.path, 'wb')
+        # An index left by an earlier write of this path no longer applies
+        try:
+            os.remove(index_path(self.path))
+        except FileNotFoundError:
+            pass
+        self._offsets = {}
+        self._counts = {}
+        self._current = None
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _switch(self, section):
+        if section != self._current:
+            self._offsets.setdefault(section, []).append(self._file.tell())
+            self._file.write(json.dumps({SECTION_KEY: section}).encode() + b'\n')
+            self._current = section
+
+    def write(self, section, record):
+        line = json.dumps(record, default=str).encode() + b'\n'
+        with self._lock:
+            self._switch(section)
+            self._file.write(line)
+            self._counts[section] = self._counts.get(section, 0) + 1
+
+    def write_many(self, section, records):
+        """Write records from an iterable, returning how many were written."""
+        count = 0
+        for record in records:
+            self.write(section, record)
+            count += 1
+        if not count:
+            with self._lock:
+                self._switch(section)
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            size = self._file.tell()
+            self._file.close()
+            if self.index:
+                with open(index_path(self.path), 'w') as f:
+                    json.dump({"sections": self._offsets, "counts": self._counts, "size": size}, f)
+
+
+class EvidenceReader:
+    """Lazily iterate the sections of an NDJSON evidence file.
+
+    ``reader['processes']`` yields that section's records one at a time and
+    ``'processes' in reader`` checks for a section, so code written against
+    the old fully loaded evidence dicts keeps working without loading the file.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._offsets = None
+        self._names = None
+        try:
+            with open(index_path(self.path), 'r') as f:
+                index = json.load(f)
+            if index["size"] == os.path.getsize(self.path):
+                self._offsets = index["sections"]
+        except (OSError, ValueError, KeyError):
+            pass
+        if self._offsets is None:
+            logging.info(f"No usable index for {self.path}; sections will be found by scanning")
+
+    def sections(self):
+        if self._offsets is not None:
+            return list(self._offsets)
+        if self._names is None:
+            self._names = []
+            for section, _ in self._iter_lines(0, headers_only=True):
+                if section not in self._names:
+                    self._names.append(section)
+        return list(self._names)
+
+    def __contains__(self, section):
+        return section in self.sections()
+
+    def __getitem__(self, section):
+        if section not in self:
+            raise KeyError(section)
+        return self.iter_section(section)
+
+    def iter_section(self, section):
+        """Yield the records of one section."""
+        if self._offsets is None:
+            for name, record in self._iter_lines(0):
+                if name == section:
+                    yield record
+            return
+        for offset in self._offsets.get(section, []):
+            for name, record in self._iter_lines(offset, stop_at_header=True):
+                yield record
+
+    def iter_records(self):
+        """Yield (section, record) pairs in file order."""
+        return self._iter_lines(0)
+
+    def _iter_lines(self, offset, stop_at_header=False, headers_only=False):
+        section = None
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if line.startswith(b'{"' + SECTION_KEY.encode()):
+                    header = json.loads(line)
+                    if SECTION_KEY in header and len(header) == 1:
+                        if stop_at_header and section is not None:
+                            return
+                        section = header[SECTION_KEY]
+                        if headers_only:
+                            yield section, None
+                        continue
+                if headers_only or not line.strip():
+                    continue
+                yield section, json.loads(line)
@@ -1,28 +1,153 @@
 import os
-import shutil
+import glob
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+from analysis.rotated_logs import rotated_set, rotation_suffix
+from collectors.acquisition import DEFAULT_BUFFER_SIZE, copy_evidence
+from collectors.evidence_stream import EvidenceWriter
+from collectors.network_collector import NetworkCollector
+from collectors.process_collector import LinuxProcessCollector
+from instrumentation import metrics
+
+def expand_sources(patterns):
+    """Return the regular files matching glob patterns such as /var/log/*.log, sorted."""
+    return sorted({
+        path for pattern in patterns for path in glob.glob(os.path.expanduser(pattern))
+        if os.path.isfile(path)
+    })
+
 class LinuxCollector:
     def __init__(self, config, log_file_path, evidence_path):
         self.config = config
         self.log_file_path = log_file_path
         self.evidence_path = Path(evidence_path)
-        
+
         if self.evidence_path.is_file():
             raise ValueError(f"Evidence path {self.evidence_path} is a file, not a directory.")
-        
+
         self.evidence_path.mkdir(parents=True, exist_ok=True)
 
+        linux_config = config['collection']['linux']
+        self.hash_algorithms = linux_config.get('hash_algorithms', ['sha256', 'md5'])
+        self.buffer_size = linux_config.get('copy_buffer_size', DEFAULT_BUFFER_SIZE)
+        self.copy_workers = linux_config.get('copy_workers', 4)
+        self.sources = linux_config.get('sources', [])
+        self.collect_rotated = linux_config.get('collect_rotated', True)
+        self.max_logs = linux_config.get('max_logs', 500)
+        self.collect_processes_enabled = linux_config.get('collect_processes', True)
+        self.proc_root = linux_config.get('proc_root', '/proc')
+        self.collect_network_enabled = linux_config.get('collect_network', True)
+        self.manifest = []
+
     def collect(self):
         logging.info(f"Collecting evidence from {self.log_file_path}")
-        
+
+        start = time.perf_counter()
         self.collect_log_file()
+        self.collect_sources(self.sources)
+        if self.collect_processes_enabled:
+            self.collect_processes()
+        if self.collect_network_enabled:
+            self.collect_network()
+        self.write_manifest(time.perf_counter() - start)
 
         return self.evidence_path
 
     def collect_log_file(self):
         if os.path.exists(self.log_file_path):
-            shutil.copy(self.log_file_path, self.evidence_path / "log_file.txt")
+            self.manifest.append(self._copy(self.log_file_path, self.evidence_path / "log_file.txt"))
         else:
-            logging.warning(f"{self.log_file_path} does not exist")
\ No newline at end of file
+            logging.warning(f"{self.log_file_path} does not exist")
+        if self.collect_rotated:
+            self.collect_rotated_logs()
+
+    def collect_rotated_logs(self):
+        """Copy the log's rotated members (log.1, log.2.gz, ...) next to log_file.txt, concurrently.
+
+        Members are copied as-is, compressed or not, so their hashes match the
+        originals; analysis decompresses them as it reads.
+        """
+        members = [
+            member for member in rotated_set(self.log_file_path, self.max_logs)
+            if member != os.path.abspath(self.log_file_path)
+        ]
+        if not members:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as pool:
+            futures = {
+                pool.submit(self._copy, member,
+                            self.evidence_path / f"log_file.txt{rotation_suffix(self.log_file_path, member)}"): member
+                for member in members
+            }
+            for future, member in futures.items():
+                try:
+                    self.manifest.append(future.result())
+                except OSError as e:
+                    logging.error(f"Failed to collect {member}: {e}")
+        logging.info(f"Collected {len(members)} rotated members of {self.log_file_path}")
+
+    def collect_processes(self):
+        """Snapshot running processes into processes.ndjson."""
+        start = time.perf_counter()
+        processes = LinuxProcessCollector(self.config, self.proc_root).snapshot()
+        with EvidenceWriter(self.evidence_path / "processes.ndjson") as writer:
+            writer.write_many("processes", (process.to_dict() for process in processes))
+        metrics.count("collect.processes", len(processes))
+        logging.info(f"Collected {len(processes)} processes in {time.perf_counter() - start:.3f}s")
+
+    def collect_network(self):
+        """Snapshot sockets, ARP and routes from procfs into <case>_network_evidence.ndjson."""
+        network_config = self.config['collection'].get('network') or {}
+        collector = NetworkCollector(
+            self.evidence_path.name, {'collection': {'network': network_config}},
+            network_config.get('proc_root', self.proc_root), self.evidence_path
+        )
+        try:
+            output_file = collector.collect()
+        except OSError as e:
+            logging.error(f"Failed to collect network evidence: {e}")
+            return
+        logging.info(f"Collected network evidence into {output_file}")
+
+    def collect_sources(self, patterns):
+        """Copy every regular file matching the glob patterns into evidence/logs, concurrently."""
+        files = expand_sources(patterns)
+        if not files:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as pool:
+            futures = {pool.submit(self._copy_source, path): path for path in files}
+            for future, path in futures.items():
+                try:
+                    self.manifest.append(future.result())
+                except OSError as e:
+                    logging.error(f"Failed to collect {path}: {e}")
+
+    def write_manifest(self, elapsed):
+        total = sum(entry["size"] for entry in self.manifest)
+        metrics.add(bytes=total)
+        metrics.count("collect.files", len(self.manifest))
+        manifest = {
+            "collection_time": datetime.now().isoformat(),
+            "hash_algorithms": list(self.hash_algorithms),
+            "total_bytes": total,
+            "seconds": round(elapsed, 6),
+            "mb_per_s": round(total / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None,
+            "files": self.manifest
+        }
+        with open(self.evidence_path / "manifest.json", 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+    def _copy_source(self, path):
+        destination = self.evidence_path / "logs" / os.path.abspath(path).lstrip(os.sep)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        return self._copy(path, destination)
+
+    def _copy(self, source, destination):
+        return copy_evidence(source, destination, self.hash_algorithms, self.buffer_size)
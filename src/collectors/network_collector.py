@@ -1,36 +1,90 @@
 import subprocess
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 import socket
 import struct
 from datetime import datetime
 import os
 
+from collectors.evidence_stream import EvidenceWriter
+from collectors.procfs_network import SOCKET_TABLES, read_arp, read_routes, read_sockets, socket_owners
+
 class NetworkCollector:
-    def __init__(self, case_id, config):
+    def __init__(self, case_id, config, proc_root=None, evidence_path=None):
         self.case_id = case_id
         self.config = config
-        self.evidence_path = Path(config['collection']['network']['evidence_path'])
+        network_config = config['collection']['network']
+        self.evidence_path = Path(evidence_path or network_config['evidence_path'])
         self.evidence_path.mkdir(parents=True, exist_ok=True)
+        self.proc_root = proc_root or network_config.get('proc_root', '/proc')
 
     def collect(self):
         """Collect network-related evidence"""
-        evidence = {
-            "metadata": self._get_metadata(),
-            "active_connections": self._get_active_connections(),
-            "listening_ports": self._get_listening_ports(),
-            "arp_cache": self._get_arp_cache(),
-            "dns_cache": self._get_dns_cache(),
-            "routing_table": self._get_routing_table()
-        }
-        
-        # Save evidence to file
-        output_file = self.evidence_path / f"{self.case_id}_network_evidence.json"
-        with open(output_file, 'w') as f:
-            json.dump(evidence, f, default=str)
+        if os.name == 'nt':
+            sections = {
+                "active_connections": self._get_active_connections,
+                "listening_ports": self._get_listening_ports,
+                "arp_cache": self._get_arp_cache,
+                "dns_cache": self._get_dns_cache,
+                "routing_table": self._get_routing_table
+            }
+        else:
+            sections = {table: partial(read_sockets, self.proc_root, table) for table in SOCKET_TABLES}
+            sections.update({
+                "socket_owners": partial(socket_owners, self.proc_root),
+                "arp_cache": partial(read_arp, self.proc_root),
+                "dns_cache": self._get_dns_cache,
+                "routing_table": partial(read_routes, self.proc_root)
+            })
+        output_file = self.evidence_path / f"{self.case_id}_network_evidence.ndjson"
+        with EvidenceWriter(output_file) as writer:
+            writer.write("metadata", self._get_metadata())
+            sockets = self._collect_concurrently(sections, writer)
+            if os.name != 'nt':
+                self._write_sockets(sockets, writer)
         
-        return evidence
+        return output_file
+
+    def _collect_concurrently(self, sections, writer):
+        """Run independent collection sections on a thread pool.
+
+        Each section is streamed to the evidence file as soon as it finishes.
+        Linux socket tables and their owners are returned instead, to be joined.
+        """
+        held = {}
+        with ThreadPoolExecutor(max_workers=len(sections)) as pool:
+            futures = {pool.submit(collect): name for name, collect in sections.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    records = future.result()
+                except Exception as e:
+                    logging.error(f"Error collecting {name.replace('_', ' ')}: {e}")
+                    records = {} if name == "socket_owners" else []
+                if name in SOCKET_TABLES or name == "socket_owners":
+                    held[name] = records
+                else:
+                    writer.write_many(name, records)
+        return held
+
+    def _write_sockets(self, sockets, writer):
+        """Attach owning processes to parsed sockets and split listeners from connections."""
+        owners = sockets.pop("socket_owners")
+        listening = []
+        active = 0
+        for table in SOCKET_TABLES:
+            for record in sockets.pop(table):
+                record["pid"], record["process"] = owners.get(record["inode"], (None, None))
+                if record["state"] in ('LISTEN', 'UNCONN'):
+                    listening.append(record)
+                else:
+                    writer.write("active_connections", record)
+                    active += 1
+        if not active:
+            writer.write_many("active_connections", [])
+        writer.write_many("listening_ports", listening)
 
     def _get_metadata(self):
         return {
@@ -41,84 +95,48 @@ class NetworkCollector:
 
     def _get_active_connections(self):
         connections = []
-        try:
-            if os.name == 'nt':  # Windows
-                output = subprocess.check_output(['netstat', '-nao']).decode()
-            else:  # Linux/Unix
-                output = subprocess.check_output(['netstat', '-nutlp']).decode()
-            
-            for line in output.split('\n')[4:]:  # Skip header lines
-                if line.strip():
-                    connections.append(line.strip())
-        except Exception as e:
-            logging.error(f"Error collecting active connections: {e}")
-        
+        output = subprocess.check_output(['netstat', '-nao']).decode()
+        for line in output.split('\n')[4:]:  # Skip header lines
+            if line.strip():
+                connections.append(line.strip())
         return connections
 
     def _get_listening_ports(self):
         ports = []
-        try:
-            if os.name == 'nt':  # Windows
-                output = subprocess.check_output(['netstat', '-an', '|', 'findstr', 'LISTENING']).decode()
-            else:  # Linux/Unix
-                output = subprocess.check_output(['ss', '-lntu']).decode()
-            
-            for line in output.split('\n'):
-                if line.strip():
-                    ports.append(line.strip())
-        except Exception as e:
-            logging.error(f"Error collecting listening ports: {e}")
-        
+        output = subprocess.check_output(['netstat', '-an', '|', 'findstr', 'LISTENING']).decode()
+        for line in output.split('\n'):
+            if line.strip():
+                ports.append(line.strip())
         return ports
 
     def _get_arp_cache(self):
         arp_entries = []
-        try:
-            if os.name == 'nt':  # Windows
-                output = subprocess.check_output(['arp', '-a']).decode()
-            else:  # Linux/Unix
-                output = subprocess.check_output(['ip', 'neigh']).decode()
-            
-            for line in output.split('\n'):
-                if line.strip():
-                    arp_entries.append(line.strip())
-        except Exception as e:
-            logging.error(f"Error collecting ARP cache: {e}")
-        
+        output = subprocess.check_output(['arp', '-a']).decode()
+        for line in output.split('\n'):
+            if line.strip():
+                arp_entries.append(line.strip())
         return arp_entries
 
     def _get_dns_cache(self):
         dns_entries = []
-        try:
-            if os.name == 'nt':  # Windows
-                output = subprocess.check_output(['ipconfig', '/displaydns']).decode()
-            else:  # Linux/Unix
-                # On Linux, you might need to use nscd or check /etc/hosts
-                with open('/etc/hosts', 'r') as f:
-                    output = f.read()
-            
-            for line in output.split('\n'):
-                if line.strip():
-                    dns_entries.append(line.strip())
-        except Exception as e:
-            logging.error(f"Error collecting DNS cache: {e}")
+        if os.name == 'nt':  # Windows
+            output = subprocess.check_output(['ipconfig', '/displaydns']).decode()
+        else:  # Linux/Unix
+            # On Linux, you might need to use nscd or check /etc/hosts
+            with open('/etc/hosts', 'r') as f:
+                output = f.read()
         
+        for line in output.split('\n'):
+            if line.strip():
+                dns_entries.append(line.strip())
         return dns_entries
 
     def _get_routing_table(self):
         routes = []
-        try:
-            if os.name == 'nt':  # Windows
-                output = subprocess.check_output(['route', 'print']).decode()
-            else:  # Linux/Unix
-                output = subprocess.check_output(['ip', 'route']).decode()
-            
-            for line in output.split('\n'):
-                if line.strip():
-                    routes.append(line.strip())
-        except Exception as e:
-            logging.error(f"Error collecting routing table: {e}")
-        
+        output = subprocess.check_output(['route', 'print']).decode()
+        for line in output.split('\n'):
+            if line.strip():
+                routes.append(line.strip())
         return routes
 
 class LinuxCollector:
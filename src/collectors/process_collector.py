@@ -0,0 +1,158 @@
+import logging
+import os
+from datetime import datetime, timezone
+
+_READ_SIZE = 65536
+
+
+def _read(path):
+    """Read a small /proc file with the fewest syscalls (open, read, close)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, _READ_SIZE)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_boot_time(proc_root='/proc'):
+    data = _read(os.path.join(proc_root, 'stat')) or b''
+    for line in data.splitlines():
+        if line.startswith(b'btime '):
+            return int(line.split()[1])
+    return 0
+
+
+class ProcessRecord:
+    """One process from a /proc snapshot.
+
+    Only the raw bytes of stat, cmdline and status, the exe link and the
+    owner of the /proc/<pid> directory are kept; fields are parsed the first
+    time they are accessed.
+    """
+
+    __slots__ = ('pid', 'exe', 'owner', '_stat', '_cmdline', '_status', '_fields', '_boot_time', '_clock_ticks')
+
+    def __init__(self, pid, stat, cmdline, status, exe, boot_time, clock_ticks, owner=None):
+        self.pid = pid
+        self.exe = exe
+        self.owner = owner
+        self._stat = stat
+        self._cmdline = cmdline
+        self._status = status
+        self._fields = None
+        self._boot_time = boot_time
+        self._clock_ticks = clock_ticks
+
+    def _stat_fields(self):
+        if self._fields is None:
+            # comm may contain spaces and parentheses, so split after the last ')'
+            close = self._stat.rfind(b')')
+            self._fields = [self._stat[self._stat.find(b'(') + 1:close]] + self._stat[close + 2:].split()
+        return self._fields
+
+    @property
+    def name(self):
+        return self._stat_fields()[0].decode('utf-8', 'replace')
+
+    @property
+    def state(self):
+        return self._stat_fields()[1].decode()
+
+    @property
+    def ppid(self):
+        return int(self._stat_fields()[2])
+
+    @property
+    def create_time(self):
+        ticks = int(self._stat_fields()[20])
+        return datetime.fromtimestamp(self._boot_time + ticks / self._clock_ticks, timezone.utc).isoformat()
+
+    @property
+    def cmdline(self):
+        if not self._cmdline:
+            return []
+        return [arg.decode('utf-8', 'replace') for arg in self._cmdline.rstrip(b'\0').split(b'\0')]
+
+    @property
+    def uid(self):
+        """The real uid from status when it was read, else the owner of /proc/<pid> (the effective uid)."""
+        uid = self._status_value(b'Uid:', int)
+        return self.owner if uid is None else uid
+
+    @property
+    def threads(self):
+        return int(self._stat_fields()[18])
+
+    def _status_value(self, key, convert):
+        if not self._status:
+            return None
+        start = self._status.find(b'\n' + key)
+        if start == -1:
+            return None
+        end = self._status.find(b'\n', start + 1)
+        value = self._status[start + len(key) + 1:end if end != -1 else None].split()
+        return convert(value[0]) if value else None
+
+    def to_dict(self):
+        return {
+            "pid": self.pid,
+            "ppid": self.ppid,
+            "name": self.name,
+            "state": self.state,
+            "create_time": self.create_time,
+            "cmdline": self.cmdline,
+            "exe": self.exe,
+            "uid": self.uid,
+            "threads": self.threads
+        }
+
+
+class LinuxProcessCollector:
+    """Snapshot running processes by walking /proc with os.scandir."""
+
+    def __init__(self, config, proc_root='/proc'):
+        self.config = config
+        linux_config = config['collection']['linux']
+        self.proc_root = proc_root
+        self.max_processes = linux_config.get('max_processes', 1000)
+        self.read_status = linux_config.get('process_status', False)
+
+    def snapshot(self):
+        """Return a list of ProcessRecord, at most max_processes long."""
+        boot_time = read_boot_time(self.proc_root)
+        clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        records = []
+        with os.scandir(self.proc_root) as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                if len(records) >= self.max_processes:
+                    logging.warning(f"Process snapshot capped at {self.max_processes} processes")
+                    break
+                base = entry.path + os.sep
+                stat = _read(base + 'stat')
+                if stat is None:
+                    continue  # Exited between listing and reading
+                cmdline = _read(base + 'cmdline')
+                exe = None
+                if cmdline:
+                    # Kernel threads and zombies have an empty cmdline and no exe
+                    try:
+                        exe = os.readlink(base + 'exe')
+                    except OSError:
+                        pass  # Exited or not permitted
+                try:
+                    owner = entry.stat(follow_symlinks=False).st_uid
+                except OSError:
+                    owner = None
+                records.append(ProcessRecord(
+                    int(entry.name), stat, cmdline,
+                    _read(base + 'status') if self.read_status else None,
+                    exe, boot_time, clock_ticks, owner
+                ))
+        return records
@@ -0,0 +1,143 @@
+import logging
+import os
+import socket
+import struct
+
+TCP_STATES = {
+    '01': 'ESTABLISHED',
+    '02': 'SYN_SENT',
+    '03': 'SYN_RECV',
+    '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2',
+    '06': 'TIME_WAIT',
+    '07': 'CLOSE',
+    '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK',
+    '0A': 'LISTEN',
+    '0B': 'CLOSING',
+    '0C': 'NEW_SYN_RECV'
+}
+
+SOCKET_TABLES = ('tcp', 'tcp6', 'udp', 'udp6')
+
+
+def _read_table(path):
+    """Return the rows of a /proc/net table split on whitespace, without the header."""
+    try:
+        with open(path, 'r') as f:
+            next(f, None)
+            return [line.split() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def decode_address(value):
+    """Decode a hex 'ADDR:PORT' pair from /proc/net/{tcp,udp}[6]."""
+    address, port = value.split(':')
+    raw = bytes.fromhex(address)
+    if len(raw) == 4:
+        ip = socket.inet_ntop(socket.AF_INET, raw[::-1])
+    else:
+        # IPv6 addresses are four host-order (little-endian) 32-bit words.
+        ip = socket.inet_ntop(socket.AF_INET6, b''.join(raw[i:i + 4][::-1] for i in range(0, 16, 4)))
+    return ip, int(port, 16)
+
+
+def _decode_ipv4(value):
+    return socket.inet_ntop(socket.AF_INET, struct.pack('<I', int(value, 16)))
+
+
+def socket_owners(proc_root='/proc'):
+    """Map socket inodes to (pid, process name) by scanning /proc/*/fd links."""
+    owners = {}
+    try:
+        entries = list(os.scandir(proc_root))
+    except FileNotFoundError:
+        return owners
+    for entry in entries:
+        if not entry.name.isdigit():
+            continue
+        fd_dir = os.path.join(entry.path, 'fd')
+        try:
+            fds = list(os.scandir(fd_dir))
+        except OSError:
+            continue  # Process exited or is not ours to inspect
+        name = None
+        for fd in fds:
+            try:
+                target = os.readlink(fd.path)
+            except OSError:
+                continue
+            if not target.startswith('socket:['):
+                continue
+            if name is None:
+                try:
+                    with open(os.path.join(entry.path, 'comm'), 'r') as f:
+                        name = f.read().strip()
+                except OSError:
+                    name = ''
+            owners[int(target[8:-1])] = (int(entry.name), name)
+    return owners
+
+
+def read_sockets(proc_root='/proc', table='tcp'):
+    """Parse one of /proc/net/{tcp,tcp6,udp,udp6} into socket records."""
+    protocol = table.rstrip('6')
+    records = []
+    for row in _read_table(os.path.join(proc_root, 'net', table)):
+        if len(row) < 10:
+            continue
+        try:
+            local_ip, local_port = decode_address(row[1])
+            remote_ip, remote_port = decode_address(row[2])
+            uid, inode = int(row[7]), int(row[9])
+        except ValueError as e:
+            logging.warning(f"Skipping unreadable {table} entry {row}: {e}")
+            continue
+        if protocol == 'tcp':
+            state = TCP_STATES.get(row[3], row[3])
+        else:
+            state = 'ESTABLISHED' if remote_port else 'UNCONN'
+        records.append({
+            "protocol": table,
+            "local_address": local_ip,
+            "local_port": local_port,
+            "remote_address": remote_ip,
+            "remote_port": remote_port,
+            "state": state,
+            "uid": uid,
+            "inode": inode
+        })
+    return records
+
+
+def read_arp(proc_root='/proc'):
+    return [
+        {
+            "ip_address": row[0],
+            "hw_type": row[1],
+            "flags": row[2],
+            "hw_address": row[3],
+            "device": row[5]
+        }
+        for row in _read_table(os.path.join(proc_root, 'net', 'arp')) if len(row) >= 6
+    ]
+
+
+def read_routes(proc_root='/proc'):
+    routes = []
+    for row in _read_table(os.path.join(proc_root, 'net', 'route')):
+        if len(row) < 8:
+            continue
+        try:
+            routes.append({
+                "interface": row[0],
+                "destination": _decode_ipv4(row[1]),
+                "gateway": _decode_ipv4(row[2]),
+                "flags": int(row[3], 16),
+                "metric": int(row[6]),
+                "mask": _decode_ipv4(row[7])
+            })
+        except ValueError as e:
+            logging.warning(f"Skipping unreadable route entry {row}: {e}")
+    return routes
@@ -1,118 +1,107 @@
-import wmi
 import psutil
 import os
-import json
 import shutil
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 from pathlib import Path
 
-try:
-    import win32evtlog
-except ImportError:
-    win32evtlog = None
+from collectors.event_logs import DEFAULT_CHANNELS, Win32EventSource, collect_event_logs
+from collectors.evidence_stream import EvidenceWriter
+from instrumentation import metrics
 
 class WindowsCollector:
-    def __init__(self, config, log_file_path, evidence_path):
+    def __init__(self, config, log_file_path, evidence_path, event_source=None):
         self.config = config
         self.log_file_path = log_file_path
         self.evidence_path = Path(evidence_path)
         self.evidence_path.mkdir(parents=True, exist_ok=True)
-        self.wmi = wmi.WMI()
+        windows_config = config['collection']['windows']
+        self.max_logs = windows_config.get('max_logs', 500)
+        self.event_channels = windows_config.get('event_channels', list(DEFAULT_CHANNELS))
+        self.event_source = event_source
+        self._wmi = None
+
+    @property
+    def wmi(self):
+        """The WMI connection, opened on first use: only some sections need it."""
+        if self._wmi is None:
+            import wmi
+            self._wmi = wmi.WMI()
+        return self._wmi
 
     def collect(self):
-        if win32evtlog is None:
-            logging.error("win32evtlog module is not available. Ensure you are running on Windows.")
-            return None
+        if self.event_source is None:
+            if not Win32EventSource.available():
+                logging.error("win32evtlog module is not available. Ensure you are running on Windows.")
+                return None
+            self.event_source = Win32EventSource()
 
-        evidence = {
-            "metadata": self._get_metadata(),
-            "processes": self._get_processes(),
-            "network": self._get_network_connections(),
-            "services": self._get_services(),
-            "scheduled_tasks": self._get_scheduled_tasks(),
-            "system_info": self._get_system_info(),
-            "event_logs": self._get_event_logs()
+        # Each section is streamed to the evidence file record by record.
+        sections = {
+            "metadata": self._get_metadata,
+            "processes": self._get_processes,
+            "network": self._get_network_connections,
+            "services": self._get_services,
+            "scheduled_tasks": self._get_scheduled_tasks,
+            "system_info": self._get_system_info
         }
         
+        output_file = self.evidence_path / "windows_evidence.ndjson"
+        with EvidenceWriter(output_file) as writer:
+            for name, records in sections.items():
+                writer.write_many(name, records())
+            # Each channel is paged up to max_logs records on its own thread
+            counts = collect_event_logs(self.event_source, writer, self.event_channels, self.max_logs)
+        metrics.count("collect.event_logs", sum(counts.values()))
+        
         self.collect_log_file()
-
-        output_file = self.evidence_path / f"windows_evidence.json"
-        with open(output_file, 'w') as f:
-            json.dump(evidence, f, indent=4)
         
         return self.evidence_path
 
     def _get_metadata(self):
-        return {
-            "timestamp": datetime.now().isoformat()
+        yield {
+            "timestamp": datetime.now(timezone.utc).isoformat()
         }
 
     def _get_processes(self):
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'username']):
-            processes.append(proc.info)
-        return processes
+        for proc in psutil.process_iter(['pid', 'name', 'username', 'create_time']):
+            info = proc.info
+            if info.get('create_time') is not None:
+                # Aware UTC: parse_timestamp reads naive times as UTC
+                info['create_time'] = datetime.fromtimestamp(info['create_time'], tz=timezone.utc).isoformat()
+            yield info
 
     def _get_network_connections(self):
-        connections = []
         for conn in psutil.net_connections(kind='inet'):
-            connections.append(conn._asdict())
-        return connections
+            yield conn._asdict()
 
     def _get_services(self):
-        services = []
         for service in self.wmi.Win32_Service():
-            services.append({
+            yield {
                 "name": service.Name,
                 "state": service.State,
                 "start_mode": service.StartMode,
                 "start_name": service.StartName
-            })
-        return services
+            }
 
     def _get_scheduled_tasks(self):
-        tasks = []
         for task in self.wmi.Win32_ScheduledJob():
-            tasks.append({
+            yield {
                 "job_id": task.JobId,
                 "name": task.Name,
                 "start_time": task.StartTime,
                 "status": task.Status
-            })
-        return tasks
+            }
 
     def _get_system_info(self):
-        system_info = {}
         for os_info in self.wmi.Win32_OperatingSystem():
-            system_info = {
+            yield {
                 "name": os_info.Name,
                 "version": os_info.Version,
                 "manufacturer": os_info.Manufacturer,
                 "configuration": os_info.Configuration,
                 "build_type": os_info.BuildType
             }
-        return system_info
-
-    def _get_event_logs(self):
-        log_types = ["System", "Application", "Security"]
-        event_logs = {}
-        for log_type in log_types:
-            log = win32evtlog.OpenEventLog(None, log_type)
-            flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
-            events = win32evtlog.ReadEventLog(log, flags, 0)
-            event_logs[log_type] = []
-            for event in events:
-                event_logs[log_type].append({
-                    "event_category": event.EventCategory,
-                    "time_generated": event.TimeGenerated.isoformat(),
-                    "source_name": event.SourceName,
-                    "event_id": event.EventID,
-                    "event_type": event.EventType,
-                    "event_data": event.StringInserts
-                })
-            win32evtlog.CloseEventLog(log)
-        return event_logs
 
     def collect_log_file(self):
         if os.path.exists(self.log_file_path):
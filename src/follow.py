@@ -0,0 +1,227 @@
+"""Follow live logs and report indicators not seen before as NDJSON, within seconds.
+
+Usage: python src/follow.py [LOG ...] [--config PATH] [--output PATH] [--from-start]
+                            [--duration SECONDS]
+
+Follows the given logs, or collection.linux.sources when none are given.
+Only bytes appended after follow mode starts are scanned (all of them with
+--from-start). Each indicator is reported once, as
+``{"ioc_type": ..., "value": ..., "file": ..., "offset": ..., "detected": ...}``;
+IOCs already recorded in analysis.checkpoint_path count as seen.
+
+Files are polled on the asyncio loop, their reads running on worker
+threads. A file that just grew is polled again after follow.poll_interval;
+an idle one backs off up to follow.max_interval, which bounds how late an
+indicator is reported while keeping idle CPU use negligible. Offsets are
+byte offsets in the file, also for text that is not ASCII.
+"""
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import json
+import locale
+import logging
+import os
+import sys
+
+from analysis.checkpoint import CheckpointStore
+from analysis.ioc_extractor import IOCExtractor
+from collectors.linux_collector import expand_sources
+from main import load_config
+
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_MAX_INTERVAL = 1.0
+
+class FollowedFile:
+    """One followed log: its open file, the offset read to and any incomplete last line.
+
+    When the path names a different file (or none), the log was rotated: the
+    rest of the old file is read before the new one is followed from its
+    start. When the file is shorter than the offset read, it was truncated
+    (e.g. by copytruncate) and is followed again from byte 0.
+    """
+
+    def __init__(self, path, from_start=False):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.partial = b''
+        self._open(at_end=not from_start)
+
+    def _open(self, at_end=False):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        st = os.fstat(f.fileno())
+        self.file, self.inode = f, st.st_ino
+        self.offset = st.st_size if at_end else 0
+        self.partial = b''
+        f.seek(self.offset)
+        return True
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def read_blocks(self, block_size):
+        """Yield (file offset, bytes) blocks of the whole lines appended since the last read."""
+        if self.file is None and not self._open():
+            return
+        if os.fstat(self.file.fileno()).st_size < self.offset:
+            logging.info(f"{self.path} was truncated; following it from the start")
+            self.file.seek(0)
+            self.offset = 0
+            self.partial = b''
+        yield from self._drain(block_size)
+
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != self.inode:
+            # Lines written to the old file just before it was rotated come first
+            yield from self._drain(block_size)
+            if self.partial:
+                yield self.offset - len(self.partial), self.partial + b'\n'
+            logging.info(f"{self.path} was rotated; following the new file")
+            self.close()
+            if inode is not None and self._open():
+                yield from self._drain(block_size)
+
+    def _drain(self, block_size):
+        while True:
+            data = self.file.read(block_size)
+            if not data:
+                return
+            self.offset += len(data)
+            data = self.partial + data
+            # A line longer than a block is scanned in pieces rather than buffered
+            cut = data.rfind(b'\n') + 1 or (len(data) if len(data) >= block_size else 0)
+            self.partial = data[cut:]
+            if cut:
+                yield self.offset - len(data), data[:cut]
+
+class Follower:
+    """Follows logs on an asyncio loop and writes newly seen indicators to output."""
+
+    def __init__(self, config, paths, output, from_start=False, seen=None):
+        self.extractor = IOCExtractor(config)
+        self.seen = self.extractor.found_iocs if seen is None else seen
+        follow_config = config.get('follow') or {}
+        self.poll_interval = follow_config.get('poll_interval', DEFAULT_POLL_INTERVAL)
+        self.max_interval = follow_config.get('max_interval', DEFAULT_MAX_INTERVAL)
+        self.encoding = locale.getpreferredencoding(False)
+        self.files = [FollowedFile(path, from_start) for path in paths]
+        self.output = output
+        self.reported = 0
+
+    def _positions(self, block):
+        """Yield (ioc_type, value, byte offset in block) for every match, in block order."""
+        scanner = self.extractor.scanner
+        if scanner.binary or block.isascii():
+            text = block if scanner.binary else block.decode('ascii')
+            yield from sorted(scanner.iter_positions(text), key=lambda match: match[2])
+            return
+        # surrogateescape keeps undecodable bytes, so re-encoding a prefix of
+        # the text gives back exactly the bytes it came from
+        text = block.decode(self.encoding, errors='surrogateescape')
+        chars = size = 0
+        for ioc_type, value, position in sorted(scanner.iter_positions(text), key=lambda match: match[2]):
+            size += len(text[chars:position].encode(self.encoding, errors='surrogateescape'))
+            chars = position
+            yield ioc_type, value, size
+
+    def _scan(self, followed, offset, block):
+        new = []
+        for ioc_type, value, position in self._positions(block):
+            if value not in self.seen[ioc_type]:
+                new.append((ioc_type, value, offset + position))
+            self.seen.observe(ioc_type, value, offset + position)
+        if not new:
+            return
+        detected = datetime.now(timezone.utc).isoformat()
+        for ioc_type, value, position in new:
+            self.output.write(json.dumps({
+                "ioc_type": ioc_type,
+                "value": value,
+                "file": followed.path,
+                "offset": position,
+                "detected": detected
+            }) + '\n')
+        self.reported += len(new)
+
+    async def _follow(self, followed):
+        delay = self.poll_interval
+        while True:
+            grew = False
+            # Each read runs on a worker thread, so a slow disk (or a large
+            # append) never holds up the loop and the other files
+            blocks = followed.read_blocks(self.extractor.block_size)
+            while (item := await asyncio.to_thread(next, blocks, None)) is not None:
+                self._scan(followed, *item)
+                grew = True
+            if grew:
+                self.output.flush()
+                delay = self.poll_interval
+            else:
+                delay = min(delay * 2, self.max_interval)
+            await asyncio.sleep(delay)
+
+    async def follow(self, duration=None):
+        """Follow every file until duration seconds pass (forever if None) or one fails."""
+        tasks = [asyncio.create_task(self._follow(followed)) for followed in self.files]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=duration, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for followed in self.files:
+                followed.close()
+            self.output.flush()
+
+def load_seen(config):
+    """Return the IOCs recorded in the checkpoint, if one is configured and exists."""
+    checkpoint_path = config['analysis'].get('checkpoint_path')
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return None
+    store = CheckpointStore(checkpoint_path)
+    try:
+        return store.load_iocs(config['analysis']['ioc_types'])
+    finally:
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow live logs and report new IOCs as NDJSON.")
+    parser.add_argument("logs", nargs='*', help="Logs to follow (default: collection.linux.sources)")
+    parser.add_argument("--config", default="config/config.yaml", help="Configuration file")
+    parser.add_argument("--output", help="Append records to this file instead of standard output")
+    parser.add_argument("--from-start", action="store_true", help="Also scan what the logs already contain")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    config = load_config(args.config)
+    paths = args.logs or expand_sources(config['collection']['linux'].get('sources', []))
+    if not paths:
+        parser.error("No logs to follow: give them as arguments or in collection.linux.sources")
+
+    output = open(args.output, 'a') if args.output else sys.stdout
+    follower = Follower(config, paths, output, args.from_start, load_seen(config))
+    logging.info(f"Following {len(paths)} log(s)")
+    try:
+        asyncio.run(follower.follow(args.duration))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.output:
+            output.close()
+    logging.info(f"Reported {follower.reported} new indicators")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Per-stage run metrics: wall and CPU time, bytes, lines, memory and counters.
+
+Stages are timed with ``with metrics.stage("analyze"):``; code running inside
+a stage reports its work with ``metrics.add(bytes=..., lines=...)`` and
+``metrics.count(name, n)``, much like logging, without the metrics object
+being passed around. ``metrics.write(path)`` saves the JSON run report.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+import cProfile
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRACEMALLOC_TOP = 10
+
+
+def peak_rss_mb():
+    """Return the process's peak resident set size in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _children_cpu():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_cpu = 0.0
+        self.bytes = 0
+        self.lines = 0
+        self.peak_rss_mb = None
+        self.traced_peak = 0
+        self.tracemalloc = None
+        self.profile = None
+
+    def to_dict(self):
+        result = {
+            "wall_seconds": round(self.wall, 6),
+            "cpu_seconds": round(self.cpu, 6),
+            "child_cpu_seconds": round(self.child_cpu, 6),
+            "bytes": self.bytes,
+            "lines": self.lines,
+            "mb_per_s": round(self.bytes / (1024 * 1024) / self.wall, 3) if self.wall > 0 else None,
+            "lines_per_s": round(self.lines / self.wall, 1) if self.wall > 0 else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None
+        }
+        if self.tracemalloc is not None:
+            result["tracemalloc"] = self.tracemalloc
+        if self.profile is not None:
+            result["profile"] = self.profile
+        return result
+
+
+class RunMetrics:
+    """Collects stage timings, work amounts and counters for one run.
+
+    With trace_memory, tracemalloc runs for the whole run and each stage
+    records its peak traced memory and top allocation sites. With a
+    profile_dir, every outermost stage runs under cProfile and its stats are
+    written there as profile-<stage>.prof.
+    """
+
+    def __init__(self, trace_memory=False, profile_dir=None):
+        self.reset(trace_memory, profile_dir)
+
+    def reset(self, trace_memory=False, profile_dir=None):
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.started = datetime.now().isoformat()
+        self.stages = {}
+        self.counters = {}
+        self._active = []
+        self._lock = Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage(name)
+        profiler = cProfile.Profile() if self.profile_dir and not self._active else None
+        if self.trace_memory:
+            self._fold_peak()
+            tracemalloc.reset_peak()
+        self._active.append(stage)
+        wall, cpu, child_cpu = time.perf_counter(), time.process_time(), _children_cpu()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield stage
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            stage.wall += time.perf_counter() - wall
+            stage.cpu += time.process_time() - cpu
+            stage.child_cpu += _children_cpu() - child_cpu
+            stage.peak_rss_mb = peak_rss_mb()
+            if self.trace_memory:
+                self._fold_peak()
+                self._snapshot(stage)
+            self._active.pop()
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stage.profile = os.path.join(self.profile_dir, f"profile-{name}.prof")
+                profiler.dump_stats(stage.profile)
+            logging.info(f"Stage {name} took {stage.wall:.3f}s wall, {stage.cpu:.3f}s CPU")
+
+    def _fold_peak(self):
+        # Nested stages reset tracemalloc's peak, so every active stage keeps
+        # the highest peak seen while it ran.
+        _, peak = tracemalloc.get_traced_memory()
+        for stage in self._active:
+            stage.traced_peak = max(stage.traced_peak, peak)
+
+    def _snapshot(self, stage):
+        top = tracemalloc.take_snapshot().statistics('lineno')[:TRACEMALLOC_TOP]
+        stage.tracemalloc = {
+            "peak_mb": round(stage.traced_peak / (1024 * 1024), 3),
+            "top": [{"site": str(stat.traceback), "kb": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in top]
+        }
+
+    def add(self, bytes=0, lines=0):
+        """Add work done to the innermost active stage (and every enclosing one)."""
+        with self._lock:
+            for stage in self._active:
+                stage.bytes += bytes
+                stage.lines += lines
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        return {
+            "started": self.started,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "counters": dict(sorted(self.counters.items()))
+        }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=4)
+        logging.info(f"Run report written to {path}")
+
+
+metrics = RunMetrics()
@@ -1,28 +1,33 @@
 import argparse
+from collections.abc import Sized
 import logging
-import platform
 import os
 from pathlib import Path
 import yaml
 
-# Import collectors based on the operating system
-system_platform = platform.system()
-if system_platform == 'Windows':
-    from collectors.windows_collector import WindowsCollector
-else:
-    from collectors.linux_collector import LinuxCollector
+# Collectors, analyzers and reporters are imported by name when a run
+# selects them (see plugins), and the checkpoint, timeline store, rotated
+# log and threat-intel modules by the functions that use them, so importing
+# main (as batch and follow do) stays cheap.
+import plugins
+from analysis.ioc_store import IOCStore
+from collectors.evidence_stream import EvidenceReader, EvidenceWriter
+from instrumentation import metrics
 
-# Import analysis and reporting modules
-from analysis.ioc_extractor import IOCExtractor
-from analysis.timeline_analyzer import TimelineAnalyzer
-from reporting.html_reporter import HTMLReporter
-from reporting.pdf_reporter import PDFReporter
+RUN_REPORT = "run_report.json"
+# Analyzers whose results are the report's IOCs and timeline; the results of
+# any other analyzer are lists of findings added to the analysis results.
+IOC_ANALYZER = 'ioc'
+TIMELINE_ANALYZER = 'timeline'
 
 def load_config(config_path):
-    """Load the configuration file."""
+    """Load the configuration file, noting its path as config_path."""
     try:
         with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+            config = yaml.safe_load(f)
+        # Relative paths such as reporting.template_cache are resolved against it
+        config['config_path'] = os.path.abspath(config_path)
+        return config
     except FileNotFoundError:
         logging.error(f"Config file not found: {config_path}")
         raise
@@ -34,69 +39,275 @@ def load_config(config_path):
         raise
 
 def collect_evidence(config, log_file_path, evidence_path):
-    """Collect evidence based on the operating system."""
+    """Collect evidence with the configured collector (by default the one for this OS)."""
     try:
-        if system_platform == 'Windows':
-            collector = WindowsCollector(config, log_file_path, evidence_path)
-        else:
-            collector = LinuxCollector(config, log_file_path, evidence_path)
-        
+        collector = plugins.load('collector', plugins.collector_name(config))(config, log_file_path, evidence_path)
         evidence = collector.collect()
         return evidence
     except Exception as e:
         logging.error(f"Failed to collect evidence: {e}")
         raise
 
+def load_analyzers(config):
+    """Instantiate the configured analyzers, keyed by name, in the configured order."""
+    return {name: plugins.load('analyzer', name)(config) for name in plugins.analyzer_names(config)}
+
 def analyze_evidence(config, evidence_path):
-    """Analyze the collected evidence."""
+    """Analyze the collected evidence with the configured analyzers."""
     try:
-        ioc_extractor = IOCExtractor(config)
-        iocs = ioc_extractor.extract_from_evidence(evidence_path)
-        
         if not Path(evidence_path).exists():
             raise FileNotFoundError(f"Evidence path {evidence_path} does not exist.")
+        from analysis.rotated_logs import rotated_set
         
-        timeline_analyzer = TimelineAnalyzer(config)
-        timeline = timeline_analyzer.build_timeline(evidence_path)
+        analyzers = load_analyzers(config)
+        ioc_extractor = analyzers.get(IOC_ANALYZER)
+        timeline_analyzer = analyzers.get(TIMELINE_ANALYZER)
+        log_file = os.path.join(evidence_path, "log_file.txt")
+        
+        checkpoint_path = config['analysis'].get('checkpoint_path')
+        store = None
+        if checkpoint_path:
+            from analysis.checkpoint import CheckpointStore
+            store = CheckpointStore(checkpoint_path)
+        timeline_store = open_timeline_store(config, store) if timeline_analyzer is not None else None
+        if timeline_store is not None:
+            # Every event goes to the store; timeline_max_events only caps
+            # the events the reports list.
+            timeline_analyzer.max_events = 0
+        
+        # The log and its rotated members (log_file.txt.1, log_file.txt.2.gz, ...)
+        members = rotated_set(log_file)
+        
+        results = {}
+        if not members:
+            logging.warning(f"Log file {log_file} does not exist.")
+        else:
+            with metrics.stage("analyze.log"):
+                results = analyze_logs(config, log_file, members, analyzers, store)
+            if timeline_analyzer is not None:
+                # Lines dropped for lacking a timestamp, and every line whose
+                # timestamp failed to parse, including continuation lines
+                metrics.count("timeline.unparsed_lines", timeline_analyzer.unparsed_lines)
+                metrics.count("timeline.parse_misses", timeline_analyzer.parse_misses)
+        iocs = results.get(IOC_ANALYZER, ioc_extractor.found_iocs if ioc_extractor is not None else IOCStore())
+        timeline = results.get(TIMELINE_ANALYZER, [])
         
-        analysis_results = []  # Placeholder for additional analysis results
+        if store is not None:
+            if ioc_extractor is not None:
+                iocs = store.load_iocs(ioc_extractor.ioc_types)
+            if timeline_analyzer is not None:
+                timeline = store.load_timeline(timeline_analyzer.max_events, timeline_analyzer.keep)
+        
+        # Structured evidence (processes, network, Windows sections) is read
+        # lazily from its NDJSON files rather than loaded whole.
+        with metrics.stage("analyze.structured"):
+            if ioc_extractor is not None:
+                ioc_extractor.found_iocs = iocs
+                iocs = ioc_extractor.extract_from_structured(evidence_path)
+            if timeline_analyzer is not None:
+                timeline = timeline_analyzer.add_structured_events(timeline, evidence_path)
+        if timeline_store is not None:
+            with metrics.stage("analyze.timeline_store"):
+                stored = timeline_store.replace_events(timeline)
+            logging.info(f"Stored {stored} timeline events in {timeline_store.path}")
+            timeline = timeline_store.load_timeline(
+                config['analysis']['timeline_max_events'], timeline_analyzer.keep
+            )
+        for ioc_type in iocs:
+            metrics.count(f"ioc_matches.{ioc_type}", iocs.occurrences(ioc_type))
+            metrics.count(f"ioc_unique.{ioc_type}", len(iocs[ioc_type]))
+        
+        with metrics.stage("analyze.threat_intel"):
+            analysis_results = match_threat_intel(config, iocs)
+        metrics.count("threat_intel.matches", len(analysis_results))
+        for name, findings in results.items():
+            if name not in (IOC_ANALYZER, TIMELINE_ANALYZER):
+                analysis_results.extend(findings)
         return iocs, timeline, analysis_results
     except Exception as e:
         logging.error(f"Failed to analyze evidence: {e}")
         raise
 
+def open_timeline_store(config, checkpoint=None):
+    """Open the configured timeline store; a checkpoint already holds the timeline."""
+    timeline_path = config['analysis'].get('timeline_store')
+    if not timeline_path:
+        return None
+    if checkpoint is not None:
+        logging.info(f"Timeline events are kept in the checkpoint {checkpoint.path}; query it instead")
+        return None
+    from analysis.timeline_store import TimelineStore
+    return TimelineStore(timeline_path)
+
+def analyze_logs(config, log_file, members, analyzers, store=None):
+    """Analyze the log and its rotated members, returning each analyzer's results by name."""
+    from analysis.rotated_logs import iter_member_blocks, iter_merged_blocks
+    
+    rotated = [member for member in members if member != os.path.abspath(log_file)]
+    if rotated and store is None:
+        # Members are decompressed concurrently and merged by timestamp
+        logging.info(f"Analyzing a rotated set of {len(members)} logs in chronological order")
+        pipeline = build_pipeline(config, analyzers.values())
+        return dict(zip(analyzers, pipeline.run_blocks(
+            members[-1], iter_merged_blocks(members, pipeline.block_size, pipeline.queue_size)
+        )))
+    
+    # Rotated members are only left here with a checkpoint: each one is
+    # analyzed once and the checkpoint's event index orders the timeline. A
+    # member that was analyzed under its old name (log_file.txt before it
+    # became log_file.txt.1) resumes where that left off.
+    findings = {}
+    for member in rotated:
+        if store.is_unchanged(member):
+            continue
+        start = store.resume_offset(member)
+        pipeline = build_pipeline(config, analyzers.values())
+        results = dict(zip(analyzers, pipeline.run_blocks(
+            member, iter_member_blocks(member, pipeline.block_size, start), start
+        )))
+        record_results(store, analyzers, results)
+        store.save_offset(member, pipeline.end)
+        for name, result in results.items():
+            if name not in (IOC_ANALYZER, TIMELINE_ANALYZER):
+                findings.setdefault(name, []).extend(result)
+    
+    if not os.path.exists(log_file):
+        return findings
+    results = analyze_log_file(config, log_file, analyzers, store)
+    for name, found in findings.items():
+        results[name] = found + results[name]
+    return results
+
+def build_pipeline(config, consumers):
+    from analysis.pipeline import DEFAULT_BLOCK_SIZE, LinePipeline
+    return LinePipeline(
+        consumers,
+        block_size=config['analysis'].get('scan_block_size', DEFAULT_BLOCK_SIZE),
+        threaded=config['analysis'].get('pipeline_threads', False),
+        queue_size=config['analysis'].get('pipeline_queue_size', 4)
+    )
+
+def record_results(store, analyzers, results):
+    """Add the IOCs and timeline events of one read to the checkpoint."""
+    if IOC_ANALYZER in results:
+        ioc_extractor = analyzers[IOC_ANALYZER]
+        store.record_iocs(results[IOC_ANALYZER])
+        ioc_extractor.found_iocs = IOCStore(ioc_extractor.ioc_types)  # recorded; counts must not add up twice
+    if TIMELINE_ANALYZER in results:
+        timeline_analyzer = analyzers[TIMELINE_ANALYZER]
+        store.record_events(results[TIMELINE_ANALYZER], timeline_analyzer.max_events, timeline_analyzer.keep)
+
+def analyze_log_file(config, log_file, analyzers, store=None):
+    """Run the analyzers over a plain log file in one read, returning their results by name."""
+    # With a checkpoint only complete lines past the saved offset are
+    # read, so a line still being written is picked up next run.
+    start, end = 0, None
+    if store is not None:
+        from analysis.ioc_scanner import last_line_end
+        start, end = store.resume_offset(log_file), last_line_end(log_file)
+        logging.info(f"Analyzing {log_file} from byte {start} to {end}")
+    
+    # A parallel IOC scan maps the file itself; every other analyzer
+    # shares a single read of the log through the pipeline.
+    consumers = dict(analyzers)
+    ioc_extractor = analyzers.get(IOC_ANALYZER)
+    if ioc_extractor is not None and ioc_extractor.workers > 1:
+        ioc_extractor.scanner.scan_file_parallel(
+            log_file, ioc_extractor.found_iocs, ioc_extractor.workers,
+            ioc_extractor.chunk_size, ioc_extractor.block_size, start, end
+        )
+        del consumers[IOC_ANALYZER]
+    results = dict(zip(consumers, build_pipeline(config, consumers.values()).run(log_file, start, end)))
+    if ioc_extractor is not None:
+        results[IOC_ANALYZER] = ioc_extractor.found_iocs
+    
+    if store is not None:
+        record_results(store, analyzers, results)
+        store.save_offset(log_file, end)
+    return results
+
+def match_threat_intel(config, iocs):
+    """Match extracted IOCs against the local threat-intel index, if configured."""
+    intel_config = config['analysis'].get('threat_intel') or {}
+    index_path = intel_config.get('index_path')
+    if not index_path:
+        return []
+    from analysis.threat_intel import ThreatIntelIndex, build_index
+    
+    if not Path(index_path, "index.json").exists():
+        feeds = intel_config.get('feeds') or []
+        if not feeds:
+            logging.warning(f"No threat-intel index at {index_path} and no feeds to build one from.")
+            return []
+        build_index(feeds, index_path)
+    
+    index = ThreatIntelIndex(index_path)
+    matches = list(index.match_iocs(iocs))
+    logging.info(f"Found {len(matches)} threat-intel matches")
+    return matches
+
 def generate_reports(config, iocs, timeline, analysis_results, report_path):
-    """Generate HTML and PDF reports."""
+    """Generate a report in every configured format (HTML and PDF by default)."""
     try:
-        html_reporter = HTMLReporter(config)
-        html_reporter.generate_report(iocs, timeline, analysis_results, report_path)
+        # An uncapped timeline is a one-shot stream unless it is read from a
+        # timeline store; spool it to disk once so each reporter can read it
+        # without holding it in memory.
+        events = lambda: timeline
+        if not isinstance(timeline, Sized):
+            os.makedirs(report_path, exist_ok=True)
+            spool = os.path.join(report_path, "timeline.ndjson")
+            with metrics.stage("report.spool"), EvidenceWriter(spool) as writer:
+                metrics.count("timeline.events", writer.write_many("timeline", timeline))
+            events = lambda: EvidenceReader(spool).iter_section("timeline")
+        else:
+            metrics.count("timeline.events", len(timeline))
         
-        pdf_reporter = PDFReporter(config)
-        pdf_reporter.generate_report(iocs, timeline, analysis_results, report_path)
+        for name in plugins.reporter_names(config):
+            with metrics.stage(f"report.{name}"):
+                reporter = plugins.load('reporter', name)(config)
+                reporter.generate_report(iocs, events(), analysis_results, report_path)
     except Exception as e:
         logging.error(f"Failed to generate reports: {e}")
         raise
 
 def main():
+    parser = argparse.ArgumentParser(description="Collect, analyze and report on one case.")
+    parser.add_argument("--log-file", help="Log file to be reported")
+    parser.add_argument("--evidence", help="Directory to save the collected evidence")
+    parser.add_argument("--report", help="Directory to save the generated reports")
+    parser.add_argument("--config", default="config/config.yaml", help="Configuration file")
+    parser.add_argument("--formats", help="Comma-separated report formats, overriding the config (e.g. html)")
+    parser.add_argument("--profile", action="store_true", help="Profile each stage with cProfile into the report directory")
+    parser.add_argument("--tracemalloc", action="store_true", help="Record peak traced memory and top allocations per stage")
+    args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
     
-    # Interactive prompts for user input
-    log_file_path = input("Enter the path to the log file to be reported: ")
-    evidence_path = input("Enter the path to save the collected evidence: ")
-    report_path = input("Enter the path to save the generated reports: ")
+    # Prompt only for paths not given on the command line
+    log_file_path = args.log_file or input("Enter the path to the log file to be reported: ")
+    evidence_path = args.evidence or input("Enter the path to save the collected evidence: ")
+    report_path = args.report or input("Enter the path to save the generated reports: ")
     
     # Expand user and absolute paths
     log_file_path = os.path.abspath(os.path.expanduser(log_file_path))
     evidence_path = os.path.abspath(os.path.expanduser(evidence_path))
     report_path = os.path.abspath(os.path.expanduser(report_path))
     
-    config = load_config("config/config.yaml")
-    
-    evidence = collect_evidence(config, log_file_path, evidence_path)
-    
-    iocs, timeline, analysis_results = analyze_evidence(config, evidence)
+    config = load_config(args.config)
+    if args.formats is not None:
+        config['reporting']['formats'] = [name for name in args.formats.split(',') if name]
+    metrics.reset(trace_memory=args.tracemalloc, profile_dir=report_path if args.profile else None)
     
-    generate_reports(config, iocs, timeline, analysis_results, report_path)
+    try:
+        with metrics.stage("collect"):
+            evidence = collect_evidence(config, log_file_path, evidence_path)
+        
+        with metrics.stage("analyze"):
+            iocs, timeline, analysis_results = analyze_evidence(config, evidence)
+        
+        with metrics.stage("report"):
+            generate_reports(config, iocs, timeline, analysis_results, report_path)
+    finally:
+        metrics.write(os.path.join(report_path, RUN_REPORT))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""Collectors, analyzers and reporters declared by name and imported on first use.
+
+A plugin is declared as "module:attribute". Its module, and whatever it
+pulls in (reportlab, jinja2, WMI, ...), is only imported when a run selects
+it, so startup stays cheap for runs that never report or never touch Windows.
+
+Analyzers are LinePipeline consumers (start, consume, finish). The 'ioc' and
+'timeline' analyzers produce the report's IOCs and timeline; any other
+analyzer's finish() returns a list of findings added to the analysis results.
+"""
+import importlib
+import platform
+
+COLLECTORS = {
+    'linux': 'collectors.linux_collector:LinuxCollector',
+    'windows': 'collectors.windows_collector:WindowsCollector'
+}
+ANALYZERS = {
+    'ioc': 'analysis.ioc_extractor:IOCExtractor',
+    'timeline': 'analysis.timeline_analyzer:TimelineAnalyzer'
+}
+REPORTERS = {
+    'html': 'reporting.html_reporter:HTMLReporter',
+    'pdf': 'reporting.pdf_reporter:PDFReporter'
+}
+_REGISTRY = {'collector': COLLECTORS, 'analyzer': ANALYZERS, 'reporter': REPORTERS}
+
+
+def register(kind, name, target):
+    """Declare a plugin, e.g. register('reporter', 'csv', 'reporting.csv_reporter:CSVReporter')."""
+    if kind not in _REGISTRY:
+        raise ValueError(f"Unknown plugin kind {kind}; expected one of {', '.join(_REGISTRY)}")
+    _REGISTRY[kind][name] = target
+
+
+def load(kind, name):
+    """Import and return the plugin of a kind declared under name."""
+    plugins = _REGISTRY[kind]
+    if name not in plugins:
+        raise ValueError(f"Unknown {kind} {name}; expected one of {', '.join(plugins)}")
+    module, attribute = plugins[name].split(':')
+    return getattr(importlib.import_module(module), attribute)
+
+
+def collector_name(config):
+    """The configured collector, with 'auto' picking the one for this OS."""
+    name = config['collection'].get('collector') or 'auto'
+    if name == 'auto':
+        return 'windows' if platform.system() == 'Windows' else 'linux'
+    return name
+
+
+def analyzer_names(config):
+    """The configured analyzers; every analyzer if none are configured."""
+    return config['analysis'].get('analyzers', list(ANALYZERS))
+
+
+def reporter_names(config):
+    """The configured report formats; every reporter if none are configured."""
+    return config['reporting'].get('formats', list(REPORTERS))
@@ -1,19 +1,101 @@
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from itertools import islice
+from pathlib import Path
 import os
 import logging
 
+from instrumentation import metrics
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_STREAM_BUFFER = 64
+
+def _pages(items, page_size):
+    """Yield successive lists of at most page_size items."""
+    items = iter(items)
+    page = list(islice(items, page_size))
+    while page:
+        yield page
+        page = list(islice(items, page_size))
+
 class HTMLReporter:
+    """Streams a paged HTML report to disk.
+
+    report.html is an index page linking to timeline/ and iocs/ pages of at
+    most page_size entries each, so no single file (or rendered string) grows
+    with the size of the case. Compiled templates are cached on disk when
+    reporting.template_cache is set; a relative cache path is taken from the
+    config file's directory.
+    """
+
     def __init__(self, config):
         self.config = config
-        self.env = Environment(loader=FileSystemLoader(config['reporting']['template_path']))
+        reporting = config['reporting']
+        self.page_size = reporting.get('page_size', DEFAULT_PAGE_SIZE)
+        self.buffer_size = reporting.get('stream_buffer', DEFAULT_STREAM_BUFFER)
+        bytecode_cache = None
+        if reporting.get('template_cache'):
+            cache_dir = os.path.join(os.path.dirname(config.get('config_path', '')), reporting['template_cache'])
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(reporting['template_path']),
+            autoescape=select_autoescape(['html']),
+            bytecode_cache=bytecode_cache
+        )
         self.template = self.env.get_template('report_template.html')
+        self.globals = {'company_name': reporting['company_name'], 'case_id': reporting.get('case_id')}
+
+    def _write(self, template, output_file, **context):
+        with open(output_file, 'w') as f:
+            stream = template.stream(**self.globals, **context)
+            stream.enable_buffering(self.buffer_size)
+            stream.dump(f)
+
+    def _write_pages(self, template, items, directory, prefix, **context):
+        """Write items as numbered pages, returning (page paths, item count)."""
+        os.makedirs(directory, exist_ok=True)
+        for stale in Path(directory).glob(f"{prefix}-*.html"):
+            stale.unlink()
+        name = lambda number: f"{prefix}-{number:04d}.html"
+        paths = []
+        count = 0
+        pages = _pages(items, self.page_size)
+        page = next(pages, None)
+        number = 1
+        # Read one page ahead so each page knows whether a next page exists
+        while page is not None:
+            following = next(pages, None)
+            self._write(
+                template, os.path.join(directory, name(number)), page=number, events=page, values=page,
+                previous_page=name(number - 1) if number > 1 else None,
+                next_page=name(number + 1) if following is not None else None, **context
+            )
+            paths.append(f"{os.path.basename(directory)}/{name(number)}")
+            count += len(page)
+            page, number = following, number + 1
+        return paths, count
 
     def generate_report(self, iocs, timeline, analysis_results, report_path):
         os.makedirs(report_path, exist_ok=True)
         output_file = os.path.join(report_path, 'report.html')
-        
-        with open(output_file, 'w') as f:
-            html_content = self.template.render(iocs=iocs, timeline=timeline, analysis_results=analysis_results, company_name=self.config['reporting']['company_name'])
-            f.write(html_content)
-        
-        logging.info(f"HTML report generated at {output_file}")
\ No newline at end of file
+
+        ioc_template = self.env.get_template('report_iocs.html')
+        ioc_sections = []
+        for ioc_type, values in iocs.items():
+            pages, count = self._write_pages(
+                ioc_template, values, os.path.join(report_path, 'iocs'), ioc_type, ioc_type=ioc_type
+            )
+            ioc_sections.append({'type': ioc_type, 'count': count, 'pages': pages})
+
+        timeline_pages, timeline_count = self._write_pages(
+            self.env.get_template('report_timeline.html'), timeline,
+            os.path.join(report_path, 'timeline'), 'timeline'
+        )
+
+        self._write(
+            self.template, output_file, ioc_sections=ioc_sections, analysis_results=analysis_results,
+            timeline_pages=timeline_pages, timeline_count=timeline_count
+        )
+
+        metrics.count("report.html_pages", 1 + len(timeline_pages) + sum(len(s['pages']) for s in ioc_sections))
+        logging.info(f"HTML report generated at {output_file} with {len(timeline_pages)} timeline pages")
@@ -1,41 +1,188 @@
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+from itertools import islice
+import glob
 import os
 import logging
 
+from instrumentation import metrics
+
+MARGIN = 50
+FONT_SIZE = 7
+ROW_HEIGHT = 11
+TITLE_HEIGHT = 20
+SECTION_GAP = 15
+DEFAULT_MAX_EVENTS = 10000
+DEFAULT_MAX_IOCS = 5000
+DEFAULT_PAGES_PER_FILE = 500
+
+TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), 'Helvetica', FONT_SIZE),
+    ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', FONT_SIZE),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+])
+
+def _fit(text, width):
+    """Truncate text to roughly fit a column of the given width in points."""
+    text = str(text)
+    limit = max(4, int(width / (FONT_SIZE * 0.5)))
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+class _TimelineStats:
+    """Tallies every timeline event, including those past the page cap."""
+
+    def __init__(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.sources = {}
+
+    def rows(self, timeline, widths):
+        for event in timeline:
+            self.count += 1
+            timestamp = str(event['timestamp'])
+            if self.first is None:
+                self.first = timestamp
+            self.last = timestamp
+            self.sources[event['source']] = self.sources.get(event['source'], 0) + 1
+            yield [_fit(timestamp, widths[0]), _fit(event['source'], widths[1]),
+                   _fit(event.get('type') or '', widths[2]), _fit(event['description'], widths[3])]
+
 class PDFReporter:
+    """Writes a paginated PDF report of table pages.
+
+    Rows are pulled from the IOC and timeline iterators one page at a time
+    and each finished page is flushed with showPage(), so only one page of
+    rows is held in memory. reportlab keeps finished pages until the file is
+    saved, so after reporting.pdf_pages_per_file pages the report continues
+    in report-002.pdf and so on. Sections longer than their cap
+    (reporting.pdf_max_events / pdf_max_iocs, 0 for no cap) are truncated and
+    summarised at the end of the report.
+    """
+
     def __init__(self, config):
         self.config = config
+        reporting = config['reporting']
+        self.max_events = reporting.get('pdf_max_events', DEFAULT_MAX_EVENTS)
+        self.max_iocs = reporting.get('pdf_max_iocs', DEFAULT_MAX_IOCS)
+        self.pages_per_file = reporting.get('pdf_pages_per_file', DEFAULT_PAGES_PER_FILE)
+        self.width, self.height = letter
+        self.table_width = self.width - 2 * MARGIN
+
+    def _open(self, report_path, number):
+        name = 'report.pdf' if number == 1 else f'report-{number:03d}.pdf'
+        self.files.append(os.path.join(report_path, name))
+        self.canvas = canvas.Canvas(self.files[-1], pagesize=letter, pageCompression=1)
+        self.y = self.height - MARGIN
+
+    def _new_page(self):
+        if self.pages_per_file and self.canvas.getPageNumber() >= self.pages_per_file:
+            self.canvas.save()
+            self._open(os.path.dirname(self.files[-1]), len(self.files) + 1)
+        else:
+            self.canvas.showPage()
+            self.y = self.height - MARGIN
+
+    def _heading(self, text, size=12):
+        if self.y - TITLE_HEIGHT < MARGIN:
+            self._new_page()
+        self.canvas.setFont('Helvetica-Bold', size)
+        self.canvas.drawString(MARGIN, self.y - size, text)
+        self.y -= TITLE_HEIGHT
+
+    def _lines(self, lines):
+        self.canvas.setFont('Helvetica', 9)
+        for line in lines:
+            if self.y - ROW_HEIGHT < MARGIN:
+                self._new_page()
+                self.canvas.setFont('Helvetica', 9)
+            self.canvas.drawString(MARGIN, self.y - 9, line)
+            self.y -= ROW_HEIGHT + 2
+
+    def _table(self, title, header, rows, widths, cap=0):
+        """Draw rows as page-sized tables; return how many rows were drawn."""
+        rows = iter(rows)
+        drawn = 0
+        while not cap or drawn < cap:
+            fit = int((self.y - MARGIN - TITLE_HEIGHT) // ROW_HEIGHT) - 1
+            if fit < 1:
+                self._new_page()
+                continue
+            chunk = list(islice(rows, min(fit, cap - drawn) if cap else fit))
+            if not chunk:
+                break
+            self._heading(title if not drawn else f"{title} (continued)", size=10)
+            table = Table([header] + chunk, colWidths=widths, rowHeights=ROW_HEIGHT)
+            table.setStyle(TABLE_STYLE)
+            _, height = table.wrapOn(self.canvas, self.table_width, self.y - MARGIN)
+            table.drawOn(self.canvas, MARGIN, self.y - height)
+            self.y -= height + SECTION_GAP
+            drawn += len(chunk)
+        return drawn
+
+    def _ioc_rows(self, iocs, ioc_type, widths):
+        if hasattr(iocs, 'records'):
+            for value, count, _, _ in iocs.records(ioc_type):
+                yield [_fit(value, widths[0]), count]
+        else:
+            for value in iocs[ioc_type]:
+                yield [_fit(value, widths[0]), '']
 
     def generate_report(self, iocs, timeline, analysis_results, report_path):
         os.makedirs(report_path, exist_ok=True)
-        output_file = os.path.join(report_path, 'report.pdf')
-        
-        c = canvas.Canvas(output_file, pagesize=letter)
-        width, height = letter
-        
-        c.drawString(100, height - 100, f"Company: {self.config['reporting']['company_name']}")
-        c.drawString(100, height - 120, "Indicators of Compromise:")
-        y = height - 140
-        for ioc_type, ioc_values in iocs.items():
-            c.drawString(100, y, f"{ioc_type.capitalize()}:")
-            y -= 20
-            for ioc in ioc_values:
-                c.drawString(120, y, str(ioc))
-                y -= 20
-        
-        c.drawString(100, y - 20, "Timeline:")
-        y -= 40
-        for event in timeline:
-            c.drawString(100, y, str(event))
-            y -= 20
-        
-        c.drawString(100, y - 20, "Analysis Results:")
-        y -= 40
-        for result in analysis_results:
-            c.drawString(100, y, str(result))
-            y -= 20
-        
-        c.save()
-        
-        logging.info(f"PDF report generated at {output_file}")
\ No newline at end of file
+        # Continuation files of an earlier, longer report must not be mistaken for this one's
+        for stale in glob.glob(os.path.join(glob.escape(report_path), 'report-*.pdf')):
+            os.remove(stale)
+        self.files = []
+        self._open(report_path, 1)
+        self._heading(f"{self.config['reporting']['company_name']} Forensic Report", size=16)
+        summary = []
+
+        self._heading("Indicators of Compromise")
+        widths = [self.table_width * 0.8, self.table_width * 0.2]
+        for ioc_type, values in iocs.items():
+            total = len(values)
+            drawn = self._table(f"{ioc_type.upper()} ({total})", ['Value', 'Occurrences'],
+                                self._ioc_rows(iocs, ioc_type, widths), widths, self.max_iocs)
+            summary.append(f"{ioc_type.upper()}: {total} indicators"
+                           + (f", {total - drawn} not listed" if drawn < total else ""))
+
+        if analysis_results:
+            self._heading("Threat Intel Matches")
+            widths = [self.table_width * share for share in (0.3, 0.1, 0.3, 0.2, 0.1)]
+            rows = ([_fit(result.get(key, ''), width) for key, width in
+                     zip(('value', 'ioc_type', 'indicator', 'feed', 'match'), widths)]
+                    for result in analysis_results)
+            self._table(f"Matches ({len(analysis_results)})",
+                        ['Value', 'Type', 'Indicator', 'Feed', 'Match'], rows, widths)
+
+        self._heading("Timeline")
+        widths = [self.table_width * share for share in (0.22, 0.13, 0.1, 0.55)]
+        stats = _TimelineStats()
+        rows = stats.rows(timeline, widths)
+        drawn = self._table("Events", ['Timestamp', 'Source', 'Type', 'Description'],
+                            rows, widths, self.max_events)
+        for _ in rows:
+            pass  # tally events past the cap for the summary
+
+        summary.append(f"Timeline: {stats.count} events"
+                       + (f", {stats.count - drawn} not listed" if drawn < stats.count else ""))
+        if stats.count:
+            summary.append(f"Time range: {stats.first} to {stats.last}")
+            summary.extend(f"  {source}: {count} events" for source, count in
+                           sorted(stats.sources.items(), key=lambda item: -item[1]))
+        if analysis_results:
+            summary.append(f"Threat intel matches: {len(analysis_results)}")
+        self._heading("Summary")
+        self._lines(summary)
+
+        self.canvas.save()
+        metrics.count("report.pdf_files", len(self.files))
+
+        logging.info(f"PDF report generated at {self.files[0]} in {len(self.files)} file(s)")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, os.path.abspath(SRC))
+# Synthetic evidence generators are shared with the benchmarks
+BENCHMARKS = os.path.join(os.path.dirname(__file__), '..', 'benchmarks')
+sys.path.insert(0, os.path.abspath(BENCHMARKS))
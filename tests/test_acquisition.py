@@ -0,0 +1,85 @@
+import errno
+import hashlib
+import os
+
+import pytest
+
+from collectors.acquisition import copy_evidence
+
+MODES = [('sha256', 'md5'), ()]
+PROC_FILE = '/proc/version'
+
+
+def write(path, size):
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return data
+
+
+@pytest.mark.parametrize('algorithms', MODES)
+@pytest.mark.parametrize('size', [0, 1, 4096, 3 * 65536 + 17])
+def test_copy_matches_the_source(tmp_path, algorithms, size):
+    data = write(tmp_path / 'source.log', size)
+    entry = copy_evidence(tmp_path / 'source.log', tmp_path / 'copy.log', algorithms, buffer_size=65536)
+    assert (tmp_path / 'copy.log').read_bytes() == data
+    assert entry['size'] == size
+    assert entry['source'] == str(tmp_path / 'source.log') and entry['destination'] == str(tmp_path / 'copy.log')
+    for name in ('sha256', 'md5'):
+        if algorithms:
+            assert entry[name] == hashlib.new(name, data).hexdigest()
+        else:
+            assert name not in entry
+
+
+@pytest.mark.skipif(not os.path.exists(PROC_FILE), reason="needs procfs")
+@pytest.mark.parametrize('algorithms', MODES)
+def test_proc_files_are_copied_despite_a_zero_stat_size(tmp_path, algorithms):
+    assert os.stat(PROC_FILE).st_size == 0
+    with open(PROC_FILE, 'rb') as f:
+        data = f.read()
+    entry = copy_evidence(PROC_FILE, tmp_path / 'version', algorithms)
+    assert data and (tmp_path / 'version').read_bytes() == data
+    assert entry['size'] == len(data)
+
+
+def test_destination_is_rewritten_in_place(tmp_path):
+    write(tmp_path / 'copy.log', 10000)
+    inode = os.stat(tmp_path / 'copy.log').st_ino
+    data = write(tmp_path / 'source.log', 100)
+    copy_evidence(tmp_path / 'source.log', tmp_path / 'copy.log', ())
+    assert (tmp_path / 'copy.log').read_bytes() == data
+    assert os.stat(tmp_path / 'copy.log').st_ino == inode
+
+
+def failing(error):
+    def copy(*args):
+        raise OSError(error, os.strerror(error))
+    return copy
+
+
+@pytest.mark.parametrize('error', [errno.EXDEV, errno.ENOSYS, errno.EINVAL])
+def test_kernel_copy_falls_back(tmp_path, monkeypatch, error):
+    data = write(tmp_path / 'source.log', 200000)
+    monkeypatch.setattr(os, 'copy_file_range', failing(error), raising=False)
+    copy_evidence(tmp_path / 'source.log', tmp_path / 'sendfile.log', (), buffer_size=65536)
+    assert (tmp_path / 'sendfile.log').read_bytes() == data
+
+    monkeypatch.setattr(os, 'sendfile', failing(error))
+    entry = copy_evidence(tmp_path / 'source.log', tmp_path / 'read.log', (), buffer_size=65536)
+    assert (tmp_path / 'read.log').read_bytes() == data
+    assert entry['size'] == len(data)
+
+
+def test_copy_file_range_reporting_nothing_falls_back(tmp_path, monkeypatch):
+    # As it does on procfs with some kernels
+    data = write(tmp_path / 'source.log', 1000)
+    monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+    entry = copy_evidence(tmp_path / 'source.log', tmp_path / 'copy.log', ())
+    assert (tmp_path / 'copy.log').read_bytes() == data and entry['size'] == 1000
+
+
+def test_other_kernel_copy_errors_are_raised(tmp_path, monkeypatch):
+    write(tmp_path / 'source.log', 100)
+    monkeypatch.setattr(os, 'copy_file_range', failing(errno.EIO), raising=False)
+    with pytest.raises(OSError):
+        copy_evidence(tmp_path / 'source.log', tmp_path / 'copy.log', ())
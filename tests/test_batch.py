@@ -0,0 +1,38 @@
+import logging
+import os
+
+from batch import run_batch, run_case, summarize
+from main import load_config
+
+CONFIG = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
+
+
+def case_for(tmp_path, name, log_file):
+    return {'name': name, 'log_file': str(log_file),
+            'evidence_path': str(tmp_path / name / 'evidence'), 'report_path': str(tmp_path / name / 'report')}
+
+
+def config_for(tmp_path):
+    config = load_config(CONFIG)
+    config['reporting']['formats'] = ['html']
+    config['reporting']['template_path'] = os.path.join(os.path.dirname(CONFIG), '..', 'templates')
+    config['reporting']['template_cache'] = str(tmp_path / 'cache')
+    return config
+
+
+def test_missing_log_file_fails_the_case(tmp_path):
+    case = case_for(tmp_path, 'missing', tmp_path / 'absent.log')
+    result = run_case(config_for(tmp_path), case)
+    assert result['status'] == 'failed'
+    assert result['error'].startswith('FileNotFoundError') and 'absent.log' in result['error']
+    assert summarize([result], 1.0)['failed'] == ['missing']
+
+
+def test_worker_case_log_records_info(tmp_path):
+    log = tmp_path / 'auth.log'
+    log.write_text("Jan  1 00:00:01 host sshd[1]: Failed password for root from 10.0.0.1 port 22\n")
+    logging.getLogger().setLevel(logging.INFO)
+    results, _ = run_batch(config_for(tmp_path), [case_for(tmp_path, 'one', log)], workers=1)
+    assert results[0]['status'] == 'ok', results[0]['error']
+    case_log = (tmp_path / 'one' / 'report' / 'case.log').read_text()
+    assert ' INFO ' in case_log and 'HTML report generated' in case_log
@@ -0,0 +1,92 @@
+import gzip
+import os
+import sqlite3
+
+from analysis.checkpoint import CheckpointStore
+from analysis.ioc_store import IOCStore
+
+TYPES = ['ip', 'domain']
+
+
+def store_of(*observations):
+    found = IOCStore(TYPES)
+    for ioc_type, value, position in observations:
+        found.observe(ioc_type, value, position)
+    return found
+
+
+def records(found):
+    return {ioc_type: list(found.records(ioc_type)) for ioc_type in found}
+
+
+def test_iocs_round_trip_with_counts_and_positions(tmp_path):
+    checkpoint = CheckpointStore(tmp_path / 'checkpoint.sqlite')
+    checkpoint.record_iocs(store_of(('ip', '10.0.0.1', 5), ('ip', '10.0.0.1', 90), ('domain', 'evil.com', 7)))
+    assert records(checkpoint.load_iocs(TYPES)) == {
+        'ip': [('10.0.0.1', 2, 5, 90)],
+        'domain': [('evil.com', 1, 7, 7)]
+    }
+
+
+def test_later_runs_add_counts_and_widen_positions(tmp_path):
+    checkpoint = CheckpointStore(tmp_path / 'checkpoint.sqlite')
+    checkpoint.record_iocs(store_of(('ip', '10.0.0.1', 50)))
+    checkpoint.record_iocs(store_of(('ip', '10.0.0.1', 10), ('ip', '10.0.0.1', 200), ('ip', '10.0.0.2', 300)))
+    assert records(checkpoint.load_iocs(TYPES))['ip'] == [('10.0.0.1', 3, 10, 200), ('10.0.0.2', 1, 300, 300)]
+
+
+def test_old_checkpoints_gain_the_count_columns(tmp_path):
+    path = tmp_path / 'checkpoint.sqlite'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE iocs (type TEXT NOT NULL, value TEXT NOT NULL, first_seen REAL NOT NULL,
+                           last_seen REAL NOT NULL, PRIMARY KEY (type, value)) WITHOUT ROWID;
+        INSERT INTO iocs VALUES ('ip', '10.0.0.9', 1.0, 1.0);
+    """)
+    conn.commit()
+    conn.close()
+    checkpoint = CheckpointStore(path)
+    checkpoint.record_iocs(store_of(('ip', '10.0.0.9', 4)))
+    assert records(checkpoint.load_iocs(TYPES))['ip'] == [('10.0.0.9', 2, 0, 4)]
+
+
+def lines(first, count):
+    return ''.join(
+        f"Jan  1 00:{n // 60:02d}:{n % 60:02d} host sshd[1]: Failed password from 10.0.0.{n % 4} port 22\n"
+        for n in range(first, first + count)
+    )
+
+
+def analyze(evidence, checkpoint):
+    from main import analyze_evidence, load_config
+    config = load_config(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'))
+    config['analysis']['checkpoint_path'] = str(checkpoint)
+    config['analysis']['timeline_max_events'] = 0
+    iocs, _, _ = analyze_evidence(config, str(evidence))
+    store = CheckpointStore(checkpoint)
+    return store.count(), sum(count for _, count, _, _ in iocs.records('ip'))
+
+
+def test_rotated_members_resume_where_their_old_name_stopped(tmp_path):
+    evidence = tmp_path / 'evidence'
+    evidence.mkdir()
+    checkpoint = tmp_path / 'checkpoint.sqlite'
+    log = evidence / 'log_file.txt'
+    log.write_text(lines(0, 100))
+    assert analyze(evidence, checkpoint) == (100, 100)
+
+    # More lines, then renamed to .1 and a new log started
+    with open(log, 'a') as f:
+        f.write(lines(100, 20))
+    log.rename(evidence / 'log_file.txt.1')
+    log.write_text(lines(120, 30))
+    assert analyze(evidence, checkpoint) == (150, 150)
+    assert analyze(evidence, checkpoint) == (150, 150)
+
+    # .1 compressed to .2.gz, the log renamed to .1 and a new log started
+    with open(evidence / 'log_file.txt.1', 'rb') as f, gzip.open(evidence / 'log_file.txt.2.gz', 'wb') as out:
+        out.write(f.read())
+    log.rename(evidence / 'log_file.txt.1')
+    log.write_text(lines(150, 10))
+    assert analyze(evidence, checkpoint) == (160, 160)
+    assert analyze(evidence, checkpoint) == (160, 160)
@@ -0,0 +1,69 @@
+import logging
+from collections import Counter
+
+import pytest
+
+from collectors.event_logs import DEFAULT_CHANNELS, SECTION, EventSource, collect_event_logs, iter_records
+from collectors.evidence_stream import EvidenceReader, EvidenceWriter
+from synthetic import SyntheticEventSource
+
+
+def collect(tmp_path, source, channels=DEFAULT_CHANNELS, max_records=0):
+    path = tmp_path / 'windows_evidence.ndjson'
+    with EvidenceWriter(path) as writer:
+        counts = collect_event_logs(source, writer, channels, max_records)
+    return counts, list(EvidenceReader(path).iter_section(SECTION))
+
+
+def test_channels_are_read_page_by_page_newest_first():
+    source = SyntheticEventSource(450, page_size=200)
+    records = list(iter_records(source, 'System'))
+    assert len(records) == 450
+    assert source.pages == 4 and source.closed == 1  # 200, 200, 50 and the empty page
+    times = [record['time_generated'] for record in records]
+    assert times == sorted(times, reverse=True)
+
+
+@pytest.mark.parametrize('max_records, pages', [(250, 2), (200, 1), (1, 1), (1000, 4)])
+def test_cap_stops_reading_pages(max_records, pages):
+    source = SyntheticEventSource(450, page_size=200)
+    assert len(list(iter_records(source, 'System', max_records))) == min(max_records, 450)
+    assert source.pages == pages and source.closed == 1
+
+
+def test_abandoned_channel_is_closed():
+    source = SyntheticEventSource(450, page_size=200)
+    records = iter_records(source, 'System')
+    next(records)
+    records.close()
+    assert source.closed == 1
+
+
+def test_every_channel_is_written_and_capped(tmp_path):
+    counts, records = collect(tmp_path, SyntheticEventSource(300, page_size=64), max_records=100)
+    assert counts == dict.fromkeys(DEFAULT_CHANNELS, 100)
+    assert Counter(record['log_type'] for record in records) == counts
+
+
+def test_channels_are_read_in_parallel(tmp_path):
+    source = SyntheticEventSource(100, page_size=20, read_delay=0.02)
+    counts, records = collect(tmp_path, source)
+    assert counts == dict.fromkeys(DEFAULT_CHANNELS, 100) and len(records) == 300
+    assert source.most_reading == len(DEFAULT_CHANNELS)
+
+
+def test_unreadable_channel_is_skipped(tmp_path, caplog):
+    with caplog.at_level(logging.ERROR):
+        counts, records = collect(tmp_path, SyntheticEventSource(50, unreadable={'Security'}))
+    assert counts == {'System': 50, 'Application': 50, 'Security': 0}
+    assert {record['log_type'] for record in records} == {'System', 'Application'}
+    assert 'Failed to read the Security event log' in caplog.text
+
+
+def test_sources_must_implement_reading():
+    class OpenOnly(EventSource):
+        def open(self, channel):
+            return channel
+
+    with pytest.raises(TypeError):
+        OpenOnly()
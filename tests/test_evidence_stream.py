@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+
+import pytest
+
+from collectors.evidence_stream import SECTION_KEY, EvidenceReader, EvidenceWriter, index_path
+
+
+def records(section, count):
+    return [{'section': section, 'n': n, 'text': f'{section} record {n}'} for n in range(count)]
+
+
+@pytest.fixture
+def evidence(tmp_path):
+    """Interleaved sections: processes, network, processes again, then an empty one."""
+    path = tmp_path / 'case_evidence.ndjson'
+    with EvidenceWriter(path) as writer:
+        assert writer.write_many('processes', records('processes', 3)) == 3
+        writer.write_many('network', records('network', 2))
+        writer.write_many('processes', records('processes', 5)[3:])
+        assert writer.write_many('empty', []) == 0
+    return path
+
+
+def read_all(path):
+    reader = EvidenceReader(path)
+    return {section: list(reader[section]) for section in reader.sections()}
+
+
+def test_index_holds_header_offsets_and_counts(evidence):
+    with open(index_path(evidence)) as f:
+        index = json.load(f)
+    assert index['counts'] == {'processes': 5, 'network': 2}
+    assert [len(offsets) for offsets in index['sections'].values()] == [2, 1, 1]
+    with open(evidence, 'rb') as f:
+        for section, offsets in index['sections'].items():
+            for offset in offsets:
+                f.seek(offset)
+                assert json.loads(f.readline()) == {SECTION_KEY: section}
+    assert index['size'] == evidence.stat().st_size
+
+
+def test_sections_read_back_in_order(evidence):
+    assert read_all(evidence) == {'processes': records('processes', 5), 'network': records('network', 2),
+                                  'empty': []}
+    reader = EvidenceReader(evidence)
+    assert 'network' in reader and 'missing' not in reader
+    with pytest.raises(KeyError):
+        reader['missing']
+    assert [section for section, _ in reader.iter_records()] == ['processes'] * 3 + ['network'] * 2 + ['processes'] * 2
+
+
+def test_concurrent_writers_interleave_whole_records(tmp_path):
+    path = tmp_path / 'threads.ndjson'
+    with EvidenceWriter(path) as writer:
+        threads = [threading.Thread(target=writer.write_many, args=(name, records(name, 2000)))
+                   for name in ('a', 'b', 'c')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert read_all(path) == {name: records(name, 2000) for name in ('a', 'b', 'c')}
+
+
+def test_a_section_is_read_without_scanning_the_others(evidence):
+    # Corrupt the network section in place: only an indexed read can still
+    # return the processes records
+    data = evidence.read_bytes()
+    start = data.index(b'{"section": "network"')
+    end = data.index(b'\n{"' + SECTION_KEY.encode(), start)
+    evidence.write_bytes(data[:start] + b'x' * (end - start) + data[end:])
+    assert list(EvidenceReader(evidence)['processes']) == records('processes', 5)
+    with pytest.raises(ValueError):
+        list(EvidenceReader(evidence)['network'])
+
+
+def test_missing_or_broken_index_falls_back_to_scanning(evidence):
+    expected = read_all(evidence)
+    with open(index_path(evidence), 'w') as f:
+        f.write('not json')
+    assert EvidenceReader(evidence)._offsets is None
+    assert read_all(evidence) == expected
+    os.remove(index_path(evidence))
+    assert read_all(evidence) == expected
+
+
+def test_stale_index_falls_back_to_scanning(evidence):
+    with open(index_path(evidence)) as f:
+        stale = f.read()
+    # The file changed after the index was written
+    with open(evidence, 'ab') as f:
+        f.write(json.dumps({SECTION_KEY: 'network'}).encode() + b'\n')
+        f.write(json.dumps({'section': 'network', 'n': 2, 'text': 'appended'}).encode() + b'\n')
+    reader = EvidenceReader(evidence)
+    assert reader._offsets is None
+    assert list(reader['network'])[-1]['text'] == 'appended'
+
+    # Rewritten without an index: the old one is removed rather than trusted
+    with EvidenceWriter(evidence, index=False) as writer:
+        writer.write_many('other', records('other', 1))
+    assert not os.path.exists(index_path(evidence))
+    with open(index_path(evidence), 'w') as f:
+        f.write(stale)
+    assert read_all(evidence) == {'other': records('other', 1)}
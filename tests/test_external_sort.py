@@ -0,0 +1,48 @@
+import os
+import random
+
+from analysis.external_sort import ExternalSorter, external_sort
+
+
+def items(count, seed=1):
+    rng = random.Random(seed)
+    return [{'timestamp': rng.randint(0, 50), 'n': n} for n in range(count)]
+
+
+def key(item):
+    return item['timestamp']
+
+
+def test_small_inputs_stay_in_memory(tmp_path):
+    data = items(10)
+    assert list(external_sort(data, key, 100, tmp_path)) == sorted(data, key=key)
+    assert os.listdir(tmp_path) == []
+
+
+def test_spilled_runs_merge_stably_and_are_removed(tmp_path):
+    data = items(1000)
+    sorter = ExternalSorter(key, 64, tmp_path)
+    for item in data:
+        sorter.add(item)
+    assert len(sorter._runs) == 15
+    # Equal timestamps keep their input order, as with sorted()
+    assert list(sorter.sorted()) == sorted(data, key=key)
+    assert os.listdir(tmp_path) == []
+
+
+def test_abandoned_merge_still_removes_runs(tmp_path):
+    merged = external_sort(items(500), key, 50, tmp_path)
+    assert next(merged)['timestamp'] == 0
+    assert len(os.listdir(tmp_path)) == 1
+    merged.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_sorter_can_be_reused(tmp_path):
+    sorter = ExternalSorter(key, 8, tmp_path)
+    for item in items(20):
+        sorter.add(item)
+    assert len(list(sorter.sorted())) == 20
+    for item in items(5, seed=2):
+        sorter.add(item)
+    assert list(sorter.sorted()) == sorted(items(5, seed=2), key=key)
@@ -0,0 +1,70 @@
+import asyncio
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from follow import Follower
+
+LINES = 60
+
+# Appends lines with multi-byte text before each indicator, some in two writes
+# so the follower sees partial lines, and optionally rotates the log halfway
+WRITER = r"""
+import os, sys, time
+path, rotate, lines = sys.argv[1], sys.argv[2] == '1', int(sys.argv[3])
+log = open(path, 'ab')
+for n in range(lines):
+    if rotate and n == lines // 2:
+        log.close()
+        os.rename(path, path + '.1')
+        log = open(path, 'ab')
+    line = f'ünïcödé → {"é" * n} host{n}.example.com from 10.9.{n}.1\n'.encode('utf-8')
+    cut = len(line) // 3 if n % 3 == 0 else len(line)
+    for part in (line[:cut], line[cut:]):
+        log.write(part)
+        log.flush()
+        time.sleep(0.005)
+log.close()
+"""
+
+
+def config():
+    return {'analysis': {'ioc_types': ['ip', 'domain']},
+            'follow': {'poll_interval': 0.01, 'max_interval': 0.05}}
+
+
+async def follow_writer(follower, writer):
+    task = asyncio.create_task(follower.follow())
+    while writer.poll() is None:
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.5)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.parametrize('rotate', [False, True])
+def test_appended_indicators_are_reported_once_at_their_byte_offsets(tmp_path, rotate):
+    log = tmp_path / 'app.log'
+    log.write_bytes('started → before following 10.9.255.1\n'.encode('utf-8'))
+    output = io.StringIO()
+    follower = Follower(config(), [str(log)], output)
+    follower.encoding = 'utf-8'
+    writer = subprocess.Popen([sys.executable, '-c', WRITER, str(log), '1' if rotate else '0', str(LINES)])
+    asyncio.run(follow_writer(follower, writer))
+    assert writer.returncode == 0
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    expected = {f'host{n}.example.com' for n in range(LINES)} | {f'10.9.{n}.1' for n in range(LINES)}
+    assert sorted(record['value'] for record in records) == sorted(expected)
+    assert follower.reported == len(expected)
+    rotated = (tmp_path / 'app.log.1').read_bytes() if rotate else b''
+    current = log.read_bytes()
+    for record in records:
+        n = int(record['value'].split('.')[2] if record['ioc_type'] == 'ip' else record['value'][4:].split('.')[0])
+        data = rotated if rotate and n < LINES // 2 else current
+        value = record['value'].encode('utf-8')
+        assert record['file'] == str(log)
+        assert data[record['offset']:record['offset'] + len(value)] == value
@@ -0,0 +1,31 @@
+import os
+
+from reporting.html_reporter import HTMLReporter
+
+TEMPLATES = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+
+def config_for(tmp_path, **reporting):
+    reporting = dict({'company_name': 'SOC <Ops>', 'template_path': TEMPLATES, 'template_cache': None}, **reporting)
+    return {'config_path': str(tmp_path / 'config' / 'config.yaml'), 'reporting': reporting}
+
+
+def test_evidence_text_is_escaped(tmp_path):
+    timeline = [{'timestamp': '2024-01-01 00:00:00', 'source': 'auth.log',
+                 'description': '<script>alert(1)</script> & more'}]
+    iocs = {'domain': ['<b>evil.example.com</b>']}
+    HTMLReporter(config_for(tmp_path)).generate_report(iocs, timeline, [], tmp_path / 'report')
+    index = (tmp_path / 'report' / 'report.html').read_text()
+    page = (tmp_path / 'report' / 'timeline' / 'timeline-0001.html').read_text()
+    values = (tmp_path / 'report' / 'iocs' / 'domain-0001.html').read_text()
+    assert 'SOC &lt;Ops&gt;' in index
+    assert '&lt;script&gt;alert(1)&lt;/script&gt; &amp; more' in page and '<script>' not in page
+    assert '&lt;b&gt;evil.example.com&lt;/b&gt;' in values
+
+
+def test_relative_template_cache_is_next_to_the_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'config').mkdir()
+    HTMLReporter(config_for(tmp_path, template_cache='../.cache/templates'))
+    assert (tmp_path / '.cache' / 'templates').is_dir()
+    assert not (tmp_path / 'config' / '.cache').exists()
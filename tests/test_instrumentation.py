@@ -0,0 +1,126 @@
+import json
+import os
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pytest
+import yaml
+
+from instrumentation import RunMetrics
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+@pytest.fixture
+def traced():
+    yield RunMetrics(trace_memory=True)
+    tracemalloc.stop()
+
+
+def busy(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_nested_stages_share_their_work():
+    metrics = RunMetrics()
+    with metrics.stage('outer'):
+        metrics.add(bytes=100)
+        with metrics.stage('inner'):
+            time.sleep(0.05)
+            busy(0.05)
+            metrics.add(bytes=2 * 1024 * 1024, lines=10)
+    metrics.add(bytes=5)  # outside every stage: not recorded
+    stages = metrics.report()['stages']
+    assert stages['outer']['bytes'] == 2 * 1024 * 1024 + 100 and stages['inner']['bytes'] == 2 * 1024 * 1024
+    assert stages['outer']['lines'] == stages['inner']['lines'] == 10
+    inner = stages['inner']
+    assert inner['wall_seconds'] >= 0.1 and inner['cpu_seconds'] >= 0.05
+    assert stages['outer']['wall_seconds'] >= inner['wall_seconds']
+    assert inner['mb_per_s'] == pytest.approx(2 / inner['wall_seconds'], rel=0.01)
+    assert inner['lines_per_s'] == pytest.approx(10 / inner['wall_seconds'], rel=0.01)
+
+
+def test_repeated_stages_accumulate_and_empty_stages_have_no_rate():
+    metrics = RunMetrics()
+    for _ in range(3):
+        with metrics.stage('scan'):
+            metrics.add(lines=2)
+    assert metrics.report()['stages']['scan']['lines'] == 6
+    with pytest.raises(ValueError), metrics.stage('failing'):
+        raise ValueError
+    assert metrics.stages['failing'].wall >= 0 and metrics._active == []
+
+
+def test_counters_accumulate_and_are_written_sorted(tmp_path):
+    metrics = RunMetrics()
+    metrics.count('b')
+    metrics.count('a', 3)
+    metrics.count('b', 2)
+    with metrics.stage('collect'):
+        metrics.add(bytes=1)
+    path = tmp_path / 'reports' / 'run_report.json'
+    metrics.write(path)
+    report = json.loads(path.read_text())
+    assert list(report['counters'].items()) == [('a', 3), ('b', 3)]
+    assert report['stages']['collect']['bytes'] == 1
+    assert 'tracemalloc' not in report['stages']['collect'] and 'profile' not in report['stages']['collect']
+    assert {'started', 'peak_rss_mb'} <= set(report)
+
+
+def test_tracemalloc_records_each_stage_peak(traced):
+    with traced.stage('outer'):
+        with traced.stage('allocate'):
+            data = bytearray(8 * 1024 * 1024)
+            del data
+        with traced.stage('small'):
+            pass
+    stages = traced.report()['stages']
+    assert stages['allocate']['tracemalloc']['peak_mb'] >= 8
+    assert stages['outer']['tracemalloc']['peak_mb'] >= 8
+    assert stages['small']['tracemalloc']['peak_mb'] < 8
+    assert stages['allocate']['tracemalloc']['top']
+
+
+def test_only_outermost_stages_are_profiled(tmp_path):
+    metrics = RunMetrics(profile_dir=str(tmp_path))
+    with metrics.stage('analyze'):
+        with metrics.stage('analyze.log'):
+            busy(0.01)
+    assert sorted(os.listdir(tmp_path)) == ['profile-analyze.prof']
+    assert metrics.report()['stages']['analyze']['profile'] == str(tmp_path / 'profile-analyze.prof')
+    assert pstats.Stats(str(tmp_path / 'profile-analyze.prof')).total_calls > 0
+
+
+def test_main_writes_the_run_report_with_profiles_and_memory(tmp_path):
+    with open(os.path.join(ROOT, 'config', 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['collection']['linux'].update(collect_processes=False, collect_network=False)
+    config['reporting'].update(template_path=os.path.join(ROOT, 'templates'), template_cache=None)
+    (tmp_path / 'config.yaml').write_text(yaml.safe_dump(config))
+    (tmp_path / 'case.log').write_text(
+        "2024-03-01T10:00:00Z sshd: Failed password for root from 10.0.0.1\n"
+        "    continuation without a time\n"
+        "2024-03-01T10:00:01Z sshd: Accepted password for root from 10.0.0.2\n"
+    )
+    report = tmp_path / 'report'
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'src', 'main.py'), '--config', str(tmp_path / 'config.yaml'),
+         '--log-file', str(tmp_path / 'case.log'), '--evidence', str(tmp_path / 'evidence'),
+         '--report', str(report), '--formats', 'html', '--profile', '--tracemalloc'],
+        cwd=tmp_path, check=True, capture_output=True
+    )
+    run = json.loads((report / 'run_report.json').read_text())
+    assert {'collect', 'analyze', 'report', 'analyze.log'} <= set(run['stages'])
+    for name in ('collect', 'analyze', 'report'):
+        assert run['stages'][name]['profile'] == str(report / f'profile-{name}.prof')
+        assert os.path.exists(run['stages'][name]['profile'])
+        assert run['stages'][name]['tracemalloc']['peak_mb'] > 0
+    assert 'profile' not in run['stages']['analyze.log']
+    assert run['counters']['ioc_unique.ip'] == 2
+    assert run['counters']['timeline.unparsed_lines'] == 0
+    assert run['counters']['timeline.parse_misses'] == 1
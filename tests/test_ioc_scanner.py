@@ -0,0 +1,141 @@
+import io
+import re
+
+import pytest
+
+from analysis.ioc_extractor import IOCExtractor
+from analysis.ioc_scanner import IOCScanner, iter_blocks, iter_range_blocks, split_ranges
+from analysis.ioc_store import IOCStore
+
+PATTERNS = IOCExtractor({'analysis': {'ioc_types': ['ip', 'domain', 'hash', 'email']}}).ioc_patterns
+
+LINES = [
+    "Jan  1 00:00:01 host sshd[1]: Failed password for root from 10.0.0.1 port 22\n",
+    "Jan  1 00:00:02 host postfix[2]: from=<alice@evil.example.com> relay=mail.example.org\n",
+    "Jan  1 00:00:03 host av[3]: quarantined sha256=" + "ab" * 32 + "\n",
+    "Jan  1 00:00:04 host sshd[1]: Failed password for root from 10.0.0.1 port 22\n",
+    "Jan  1 00:00:05 host kernel: nothing to see here\n",
+    "Jan  1 00:00:06 host app: version 1.2.3.4.5 and 999.1.1.1 from 10.0.0.2\n",
+]
+TEXT = ''.join(LINES)
+
+
+def reference(text):
+    """Counts from running re.findall per type on every line."""
+    counts = {}
+    for line in text.splitlines():
+        for ioc_type, pattern in PATTERNS.items():
+            for match in re.findall(pattern, line):
+                counts[ioc_type, match] = counts.get((ioc_type, match), 0) + 1
+    return counts
+
+
+def counted(store):
+    return {(ioc_type, value): count for ioc_type in store for value, count, _, _ in store.records(ioc_type)}
+
+
+def positions(store):
+    return {(ioc_type, value): (first, last) for ioc_type in store for value, _, first, last in store.records(ioc_type)}
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('exact', [False, True])
+def test_scan_counts_match_findall(binary, exact):
+    scanner = IOCScanner(PATTERNS, binary, exact)
+    store = IOCStore(PATTERNS)
+    scanner.scan(TEXT.encode() if binary else TEXT, store, 100)
+    assert counted(store) == reference(TEXT)
+
+
+def test_exact_positions_are_match_offsets():
+    store = IOCStore(PATTERNS)
+    IOCScanner(PATTERNS, exact_positions=True).scan(TEXT, store, 100)
+    first = TEXT.index('10.0.0.1')
+    last = TEXT.rindex('10.0.0.1')
+    assert positions(store)['ip', '10.0.0.1'] == (100 + first, 100 + last)
+
+
+def test_block_positions_are_block_or_line_offsets():
+    store = IOCStore(PATTERNS)
+    scanner = IOCScanner(PATTERNS)
+    base = 0
+    for block in iter_blocks(io.StringIO(TEXT * 4), block_size=len(TEXT)):
+        scanner.scan(block, store, base)
+        base += len(block)
+    assert positions(store)['ip', '10.0.0.1'] == (0, len(TEXT) * 3)
+
+
+def test_rare_literals_are_placed_by_line():
+    filler = "Jan  1 00:00:00 host kernel: nothing to see here\n" * 20
+    text = filler + LINES[1] + filler
+    store = IOCStore(PATTERNS)
+    IOCScanner(PATTERNS).scan(text, store, 1000)
+    assert positions(store)['email', 'alice@evil.example.com'] == (1000 + len(filler), 1000 + len(filler))
+
+
+def test_iter_positions_gives_offsets_in_text():
+    for ioc_type, value, position in IOCScanner(PATTERNS).iter_positions(TEXT):
+        assert TEXT[position:position + len(value)] == value
+
+
+def check_tiling(data, ranges, start, end):
+    assert ranges[0][0] == start and ranges[-1][1] == end
+    for (_, stop), (next_start, _) in zip(ranges, ranges[1:]):
+        assert stop == next_start
+    for range_start, stop in ranges:
+        assert range_start < stop
+        assert stop == end or data[stop - 1:stop] == b'\n'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1000, 1 << 20])
+@pytest.mark.parametrize('start, end', [(0, None), (0, 300), (57, None), (57, 301)])
+def test_ranges_tile_the_slice_on_line_ends(chunk_size, start, end):
+    data = (TEXT + 'x' * 500 + '\n' + TEXT + 'unterminated').encode()
+    ranges = split_ranges(data, chunk_size, start, end)
+    check_tiling(data, ranges, start, len(data) if end is None else end)
+    blocks = [block for range_start, stop in ranges for block in iter_range_blocks(data, range_start, stop, 40)]
+    assert b''.join(blocks) == data[start:end]
+    assert all(block.endswith(b'\n') for block in blocks[:-1])
+
+
+def test_a_line_longer_than_a_chunk_is_never_split():
+    data = b'short\n' + b'y' * 300 + b'\nshort\n'
+    assert split_ranges(data, 10) == [(0, 307), (307, 313)]
+
+
+def write_corpus(path):
+    lines = LINES + [f"Jan  1 00:01:{n % 60:02d} host app: peer 10.1.{n % 7}.{n % 13} host{n % 5}.example.net\n"
+                     for n in range(400)]
+    path.write_text(''.join(lines * 5))
+    return path
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('exact', [False, True])
+def test_parallel_scan_matches_serial_scan(tmp_path, binary, exact):
+    path = write_corpus(tmp_path / 'log_file.txt')
+    scanner = IOCScanner(PATTERNS, binary, exact)
+    serial, parallel = IOCStore(PATTERNS), IOCStore(PATTERNS)
+    scanner.scan_file(path, serial, block_size=4096)
+    assert scanner.scan_file_parallel(path, parallel, 2, chunk_size=20000, block_size=4096) == path.stat().st_size
+    serial.flush()
+    assert counted(parallel) == counted(serial)
+    if exact:
+        assert positions(parallel) == positions(serial)
+
+
+def test_parallel_scan_of_a_slice(tmp_path):
+    path = write_corpus(tmp_path / 'log_file.txt')
+    data = path.read_bytes()
+    start = data.index(b'\n', len(data) // 3) + 1
+    end = data.index(b'\n', 2 * len(data) // 3) + 1
+    scanner = IOCScanner(PATTERNS, exact_positions=True)
+    found = IOCStore(PATTERNS)
+    assert scanner.scan_file_parallel(path, found, 2, chunk_size=5000, start=start, end=end) == end - start
+    assert counted(found) == reference(data[start:end].decode())
+    expected = IOCStore(PATTERNS)
+    scanner.scan(data[start:end].decode(), expected, start)
+    expected.flush()
+    assert positions(found) == positions(expected)
+    assert min(first for first, _ in positions(found).values()) >= start
+    assert max(last for _, last in positions(found).values()) < end
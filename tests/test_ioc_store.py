@@ -0,0 +1,83 @@
+import pytest
+
+from analysis import ioc_store
+from analysis.ioc_store import IOCStore, classify
+
+TYPES = ['ip', 'domain', 'hash', 'email']
+HASH = 'ab' * 32
+
+
+def store_of(*observations):
+    store = IOCStore(TYPES)
+    for ioc_type, value, position in observations:
+        store.observe(ioc_type, value, position)
+    return store
+
+
+def records(store):
+    return {ioc_type: sorted(store.records(ioc_type)) for ioc_type in store}
+
+
+@pytest.mark.parametrize('ioc_type, value, kind', [
+    ('ip', '10.0.0.1', 'ipv4'),
+    ('ip', '010.0.0.1', 'str'),
+    ('ip', '2001:db8::1', 'ipv6'),
+    ('ip', '2001:DB8::1', 'str'),
+    ('hash', HASH, 'hash32'),
+    ('hash', 'AB' * 16, 'str'),
+    ('domain', 'evil.example.com', 'str'),
+])
+def test_values_round_trip_exactly(ioc_type, value, kind):
+    assert classify(ioc_type, value)[0] == kind
+    store = store_of((ioc_type, value, 0))
+    assert [v for v, _, _, _ in store.records(ioc_type)] == [value]
+    assert value in store[ioc_type]
+
+
+def test_counts_and_positions():
+    store = store_of(('ip', '10.0.0.1', 50), ('ip', '10.0.0.1', 10), ('ip', '10.0.0.1', 90), ('ip', '10.0.0.2', 5))
+    store.observe_counts('ip', {'10.0.0.1': 3, '10.0.0.3': 2}, 200)
+    assert records(store)['ip'] == [('10.0.0.1', 6, 10, 200), ('10.0.0.2', 1, 5, 5), ('10.0.0.3', 2, 200, 200)]
+    assert store.occurrences('ip') == 9
+    assert len(store['ip']) == 3
+
+
+def test_merge_adds_counts_and_widens_positions():
+    left = store_of(('ip', '10.0.0.1', 100), ('hash', HASH, 7), ('domain', 'a.example.com', 3))
+    right = store_of(('ip', '10.0.0.1', 20), ('ip', '10.0.0.1', 300), ('ip', '2001:db8::1', 4), ('domain', 'b.example.com', 1))
+    right.observe('url', 'http://x.example.com/', 9)
+    left.merge(right)
+    assert records(left) == {
+        'ip': [('10.0.0.1', 3, 20, 300), ('2001:db8::1', 1, 4, 4)],
+        'domain': [('a.example.com', 1, 3, 3), ('b.example.com', 1, 1, 1)],
+        'hash': [(HASH, 1, 7, 7)],
+        'email': [],
+        'url': [('http://x.example.com/', 1, 9, 9)]
+    }
+
+
+def test_merge_matches_observing_everything_in_one_store(monkeypatch):
+    monkeypatch.setattr(ioc_store, 'STAGE_MIN', 4)
+    observations = [('ip', f'10.0.{n % 7}.{n % 13}', n) for n in range(200)]
+    observations += [('domain', f'host{n % 11}.example.com', n) for n in range(200)]
+    whole = store_of(*observations)
+    parts = [store_of(*observations[i::3]) for i in range(3)]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert records(merged) == records(whole)
+
+
+def test_staged_values_are_found_without_a_flush():
+    store = IOCStore(TYPES)
+    store.observe('ip', '10.0.0.1')
+    assert '10.0.0.1' in store['ip'] and '10.0.0.2' not in store['ip']
+    assert store._staged_count == 1
+    store.flush()
+    assert '10.0.0.1' in store['ip'] and '10.0.0.2' not in store['ip']
+
+
+def test_reads_like_a_dict_of_sets():
+    store = store_of(('ip', '10.0.0.1', 0), ('email', 'bad@evil.example.com', 0))
+    assert store.to_sets() == {'ip': {'10.0.0.1'}, 'domain': set(), 'hash': set(), 'email': {'bad@evil.example.com'}}
+    assert [ioc_type for ioc_type, _ in store.items()] == TYPES
+    with pytest.raises(KeyError):
+        store['url']
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+
+from collectors.linux_collector import LinuxCollector, expand_sources
+
+
+def make_logs(root):
+    (root / 'var').mkdir()
+    for name, text in (('auth.log', 'sshd accepted\n'), ('syslog', 'cron ran\n'), ('app.log', '')):
+        (root / 'var' / name).write_text(text)
+    (root / 'var' / 'journal.d').mkdir()
+    return root / 'var'
+
+
+def test_sources_are_expanded_deduplicated_and_sorted(tmp_path):
+    logs = make_logs(tmp_path)
+    patterns = [str(logs / '*.log'), str(logs / 'auth.log'), str(logs / '*'), str(logs / 'missing')]
+    assert expand_sources(patterns) == [str(logs / name) for name in ('app.log', 'auth.log', 'syslog')]
+    assert expand_sources([]) == []
+
+
+def test_manifest_records_every_copy(tmp_path):
+    logs = make_logs(tmp_path)
+    (tmp_path / 'case.log').write_text('started\n')
+    config = {'collection': {'linux': {
+        'hash_algorithms': ['sha256'], 'sources': [str(logs / '*.log'), str(logs / 'auth.log')],
+        'collect_rotated': False, 'collect_processes': False, 'collect_network': False
+    }}}
+    evidence = tmp_path / 'evidence'
+    LinuxCollector(config, str(tmp_path / 'case.log'), evidence).collect()
+
+    manifest = json.loads((evidence / 'manifest.json').read_text())
+    assert manifest['hash_algorithms'] == ['sha256']
+    files = {entry['source']: entry for entry in manifest['files']}
+    assert sorted(files) == sorted([str(tmp_path / 'case.log'), str(logs / 'app.log'), str(logs / 'auth.log')])
+    for source, entry in files.items():
+        data = open(source, 'rb').read()
+        assert entry['size'] == len(data)
+        assert entry['sha256'] == hashlib.sha256(data).hexdigest() and 'md5' not in entry
+        assert open(entry['destination'], 'rb').read() == data
+    assert files[str(logs / 'auth.log')]['destination'] == str(evidence / 'logs' / str(logs / 'auth.log').lstrip(os.sep))
+    assert files[str(tmp_path / 'case.log')]['destination'] == str(evidence / 'log_file.txt')
+    assert manifest['total_bytes'] == sum(entry['size'] for entry in manifest['files'])
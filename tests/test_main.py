@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import plugins
+from main import analyze_evidence, load_config
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+CONFIG = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
+# Imported only by the functions (or plugins) that use them
+LAZY = ('sqlite3', 'lzma', 'bz2', 'gzip', 'reportlab', 'jinja2', 'wmi', 'win32evtlog', 'reporting',
+        'analysis.checkpoint', 'analysis.timeline_store', 'analysis.threat_intel', 'analysis.rotated_logs',
+        'analysis.pipeline', 'analysis.ioc_scanner', 'analysis.ioc_extractor', 'analysis.timeline_analyzer',
+        'collectors.linux_collector', 'collectors.windows_collector')
+# batch always runs cases in a process pool, whose import pulls in shutil (and with it bz2 and lzma)
+LAZY_IN_BATCH = tuple(name for name in LAZY if name not in ('lzma', 'bz2'))
+
+
+def imported_after(module):
+    result = subprocess.run(
+        [sys.executable, '-c', f'import sys, {module}; print("\\n".join(sys.modules))'],
+        cwd=SRC, capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize('module, lazy', [('main', LAZY), ('batch', LAZY_IN_BATCH)])
+def test_import_leaves_heavy_modules_unloaded(module, lazy):
+    loaded = imported_after(module)
+    assert [name for name in loaded if name in lazy or name.split('.')[0] in lazy] == []
+
+
+def test_import_time_log_has_no_reporting_or_windows_modules():
+    # The same measurement as benchmarks/bench_startup.py, so a regression shows up here
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=SRC, capture_output=True, text=True, check=True)
+    imported = [line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines()
+                if line.startswith('import time:') and '|' in line]
+    assert 'main' in imported
+    heavy = ('reportlab', 'jinja2', 'collectors.windows_collector', 'wmi', 'win32evtlog')
+    assert [name for name in imported if name in heavy or name.split('.')[0] in heavy] == []
+
+
+class FailedLogins:
+    """An extra analyzer: one finding per failed login."""
+
+    def __init__(self, config):
+        self.findings = []
+
+    def start(self, log_file):
+        pass
+
+    def consume(self, block, offset=0):
+        for line in block.splitlines():
+            if 'Failed password' in line:
+                self.findings.append({'type': 'failed_login', 'value': line.split()[-3], 'offset': offset})
+
+    def finish(self):
+        return self.findings
+
+
+@pytest.fixture
+def evidence(tmp_path):
+    directory = tmp_path / 'evidence'
+    directory.mkdir()
+    (directory / 'log_file.txt').write_text(
+        "Jan  1 00:00:01 host sshd[1]: Failed password for root from 10.0.0.1 port 22\n"
+        "Jan  1 00:00:02 host sshd[1]: Accepted password for root from 10.0.0.2 port 22\n"
+    )
+    return directory
+
+
+def config_with(analyzers):
+    config = load_config(CONFIG)
+    config['analysis']['analyzers'] = analyzers
+    return config
+
+
+def test_default_analyzers(evidence):
+    iocs, timeline, results = analyze_evidence(load_config(CONFIG), str(evidence))
+    assert set(iocs['ip']) == {'10.0.0.1', '10.0.0.2'}
+    assert len(list(timeline)) == 2
+    assert results == []
+
+
+def test_only_configured_analyzers_run(evidence):
+    iocs, timeline, _ = analyze_evidence(config_with(['timeline']), str(evidence))
+    assert list(iocs) == [] and len(list(timeline)) == 2
+    iocs, timeline, _ = analyze_evidence(config_with(['ioc']), str(evidence))
+    assert set(iocs['ip']) == {'10.0.0.1', '10.0.0.2'} and list(timeline) == []
+
+
+def test_registered_analyzer_findings_join_the_results(evidence, monkeypatch):
+    monkeypatch.setitem(plugins.ANALYZERS, 'failed_logins', 'test_main:FailedLogins')
+    iocs, timeline, results = analyze_evidence(config_with(['ioc', 'failed_logins']), str(evidence))
+    assert results == [{'type': 'failed_login', 'value': '10.0.0.1', 'offset': 0}]
+    assert set(iocs['ip']) == {'10.0.0.1', '10.0.0.2'}
+
+
+def test_unknown_analyzer_is_an_error(evidence):
+    with pytest.raises(ValueError, match='Unknown analyzer'):
+        analyze_evidence(config_with(['ioc', 'yara']), str(evidence))
@@ -0,0 +1,35 @@
+from analysis.ioc_store import IOCStore
+from reporting.pdf_reporter import PDFReporter, _TimelineStats
+
+WIDTHS = [100, 100, 100, 300]
+
+
+def test_missing_event_type_is_blank():
+    timeline = [
+        {'timestamp': '2024-01-01 00:00:00', 'source': 'auth.log', 'type': None, 'description': 'login'},
+        {'timestamp': '2024-01-01 00:00:01', 'source': 'auth.log', 'description': 'logout'},
+        {'timestamp': '2024-01-01 00:00:02', 'source': 'security', 'type': 'logon', 'description': 'event 4624'}
+    ]
+    stats = _TimelineStats()
+    assert [row[2] for row in stats.rows(timeline, WIDTHS)] == ['', '', 'logon']
+    assert (stats.count, stats.first, stats.last) == (3, '2024-01-01 00:00:00', '2024-01-01 00:00:02')
+    assert stats.sources == {'auth.log': 2, 'security': 1}
+
+
+def events(count):
+    return [{'timestamp': f'2024-01-01 00:{n // 60 % 60:02d}:{n % 60:02d}', 'source': 'auth.log', 'type': None,
+             'description': f'event {n}'} for n in range(count)]
+
+
+def test_rerun_removes_stale_continuation_files(tmp_path):
+    config = {'reporting': {'company_name': 'SOC', 'pdf_pages_per_file': 1}}
+    (tmp_path / 'notes.pdf').write_bytes(b'kept')
+    reporter = PDFReporter(config)
+    reporter.generate_report(IOCStore(['ip']), events(200), [], tmp_path)
+    assert len(reporter.files) >= 3
+    assert sorted(path.name for path in tmp_path.glob('report*.pdf')) == sorted(
+        path.rsplit('/', 1)[1] for path in reporter.files)
+
+    reporter.generate_report(IOCStore(['ip']), events(1), [], tmp_path)
+    assert reporter.files == [str(tmp_path / 'report.pdf')]
+    assert sorted(path.name for path in tmp_path.glob('*.pdf')) == ['notes.pdf', 'report.pdf']
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from analysis.pipeline import LinePipeline
+
+TEXT = ''.join(f"line {n} from 10.0.0.{n % 7}\n" for n in range(500))
+
+
+class Recorder:
+    def __init__(self, binary=False, fail_at=None):
+        self.binary = binary
+        self.fail_at = fail_at
+        self.blocks = []
+
+    def start(self, path):
+        self.path = path
+
+    def consume(self, block, offset):
+        if self.fail_at is not None and len(self.blocks) == self.fail_at:
+            raise ValueError(f"bad block at {offset}")
+        self.blocks.append((block, offset))
+
+    def finish(self):
+        return len(self.blocks)
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / 'log_file.txt'
+    path.write_text(TEXT)
+    return path
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_binary_and_text_consumers_get_the_same_blocks(log, threaded):
+    text, binary = Recorder(), Recorder(binary=True)
+    pipeline = LinePipeline([text, binary], block_size=1000, threaded=threaded, queue_size=2)
+    assert pipeline.run(log) == [len(text.blocks), len(binary.blocks)]
+    assert len(text.blocks) > 5 and text.path == binary.path == log
+    for (block, offset), (raw, raw_offset) in zip(text.blocks, binary.blocks, strict=True):
+        assert isinstance(block, str) and isinstance(raw, bytes)
+        assert block.encode() == raw and offset == raw_offset
+        assert TEXT[offset:offset + len(block)] == block and block.endswith('\n')
+    assert ''.join(block for block, _ in text.blocks) == TEXT
+    assert pipeline.end == len(TEXT)
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_a_slice_starts_at_its_offset(log, threaded):
+    start = TEXT.index('line 100 ')
+    end = TEXT.index('line 200 ')
+    recorder = Recorder()
+    pipeline = LinePipeline([recorder], block_size=256, threaded=threaded)
+    pipeline.run(log, start, end)
+    assert recorder.blocks[0][1] == start and pipeline.end == end
+    assert ''.join(block for block, _ in recorder.blocks) == TEXT[start:end]
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_str_blocks_are_counted_in_characters(threaded):
+    blocks = ['café 10.0.0.1\n', 'naïve\nline\n', 'x\n']
+    text, binary = Recorder(), Recorder(binary=True)
+    pipeline = LinePipeline([text, binary], threaded=threaded)
+    pipeline.run_blocks('merged', iter(blocks), 40)
+    assert [offset for _, offset in text.blocks] == [40, 54, 65]
+    assert pipeline.end == 40 + sum(map(len, blocks))
+    assert [raw for raw, _ in binary.blocks] == [block.encode() for block in blocks]
+    assert [offset for _, offset in binary.blocks] == [40, 54, 65]
+
+
+def test_consumer_errors_are_raised_after_the_threads_are_joined(log):
+    failing, other = Recorder(fail_at=2), Recorder(binary=True)
+    pipeline = LinePipeline([failing, other], block_size=1000, threaded=True, queue_size=1)
+    with pytest.raises(ValueError, match="bad block at"):
+        pipeline.run(log)
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith('pipeline-')]
+    # The reader kept feeding the healthy consumer to the end of the file
+    assert b''.join(block for block, _ in other.blocks) == TEXT.encode()
+    assert len(failing.blocks) == 2
+
+
+def test_unthreaded_consumer_errors_propagate(log):
+    with pytest.raises(ValueError):
+        LinePipeline([Recorder(fail_at=0)]).run(log)
@@ -0,0 +1,101 @@
+import os
+from datetime import datetime, timezone
+
+from collectors.process_collector import LinuxProcessCollector, read_boot_time
+
+BOOT_TIME = 1700000000
+
+
+def stat_line(pid, comm, state='S', ppid=1, threads=1, start_ticks=0):
+    return (f"{pid} ({comm}) {state} {ppid} {pid} {pid} 0 -1 4194560 100 0 0 0 5 3 0 0 20 0 "
+            f"{threads} 0 {start_ticks} 1000000 250 18446744073709551615\n")
+
+
+def add_process(root, pid, comm='worker', cmdline=b'/usr/bin/worker\0', exe='/usr/bin/worker',
+                status=None, **stat):
+    base = root / str(pid)
+    base.mkdir()
+    (base / 'stat').write_text(stat_line(pid, comm, **stat))
+    (base / 'cmdline').write_bytes(cmdline)
+    if exe is not None:
+        os.symlink(exe, base / 'exe')
+    if status is not None:
+        (base / 'status').write_text(status)
+    return base
+
+
+def make_proc(root):
+    (root / 'stat').write_text(f"cpu  1 2 3 4\nbtime {BOOT_TIME}\n")
+    (root / 'self').mkdir()
+    return root
+
+
+def snapshot(root, **linux):
+    linux.setdefault('max_processes', 1000)
+    return {record.pid: record for record in LinuxProcessCollector({'collection': {'linux': linux}}, root).snapshot()}
+
+
+def test_stat_fields(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 10, comm='my proc', ppid=4, threads=7, start_ticks=250)
+    record = snapshot(root)[10]
+    started = BOOT_TIME + 250 / os.sysconf('SC_CLK_TCK')
+    assert (record.name, record.state, record.ppid, record.threads) == ('my proc', 'S', 4, 7)
+    assert record.create_time == datetime.fromtimestamp(started, timezone.utc).isoformat()
+    assert read_boot_time(root) == BOOT_TIME
+
+
+def test_comm_with_parentheses_and_spaces(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 11, comm='evil) R 99 (x', state='R', ppid=3)
+    record = snapshot(root)[11]
+    assert (record.name, record.state, record.ppid) == ('evil) R 99 (x', 'R', 3)
+
+
+def test_cmdline_arguments(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 12, cmdline=b'/bin/sh\0-c\0curl http://evil.example.com\0')
+    add_process(root, 13, cmdline=b'python3\0caf\xc3\xa9\0\xff\0')
+    records = snapshot(root)
+    assert records[12].cmdline == ['/bin/sh', '-c', 'curl http://evil.example.com']
+    assert records[13].cmdline == ['python3', 'café', '�']
+
+
+def test_kernel_thread_has_no_cmdline_or_exe(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 2, comm='kthreadd', cmdline=b'', exe=None, ppid=0)
+    add_process(root, 14, comm='kworker/0:1', cmdline=b'', exe='/should/not/be/read', ppid=2)
+    records = snapshot(root)
+    assert (records[2].cmdline, records[2].exe) == ([], None)
+    assert (records[14].cmdline, records[14].exe) == ([], None)
+
+
+def test_vanished_and_non_process_entries_are_skipped(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 20)
+    (root / '21').mkdir()  # Exited between listing and reading: no stat left
+    add_process(root, 22, exe='/deleted (deleted)')
+    (root / 'net').mkdir()
+    records = snapshot(root)
+    assert sorted(records) == [20, 22]
+    assert records[20].exe == '/usr/bin/worker'
+
+
+def test_uid_defaults_to_the_owner_and_status_gives_the_real_uid(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 30, status="Name:\tworker\nUid:\t1000\t0\t0\t0\nThreads:\t1\n")
+    assert snapshot(root)[30].uid == os.getuid()
+    assert snapshot(root, process_status=True)[30].uid == 1000
+
+
+def test_missing_status_falls_back_to_the_owner(tmp_path):
+    root = make_proc(tmp_path)
+    add_process(root, 31)
+    assert snapshot(root, process_status=True)[31].uid == os.getuid()
+
+
+def test_max_processes_caps_the_snapshot(tmp_path):
+    root = make_proc(tmp_path)
+    for pid in range(100, 110):
+        add_process(root, pid)
+    assert len(snapshot(root, max_processes=4)) == 4
@@ -0,0 +1,116 @@
+import os
+
+from collectors.evidence_stream import EvidenceReader
+from collectors.network_collector import NetworkCollector
+from collectors.procfs_network import decode_address, read_arp, read_routes, read_sockets, socket_owners
+
+HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+
+def row(number, local, remote, state, uid, inode):
+    return f"  {number}: {local} {remote} {state} 00000000:00000000 00:00000000 00000000  {uid}        0 {inode} 1 0 20 4 -1\n"
+
+
+def make_proc(root, tables=None, processes=None):
+    """Write a procfs fixture: net tables by name and {pid: (comm, [socket inodes])}."""
+    net = root / 'net'
+    net.mkdir(parents=True, exist_ok=True)
+    for name, rows in (tables or {}).items():
+        (net / name).write_text(HEADER + ''.join(rows))
+    for pid, (comm, inodes) in (processes or {}).items():
+        fd = root / str(pid) / 'fd'
+        fd.mkdir(parents=True)
+        (root / str(pid) / 'comm').write_text(comm + '\n')
+        for number, inode in enumerate(inodes):
+            os.symlink(f'socket:[{inode}]', fd / str(number))
+        os.symlink('/dev/null', fd / str(len(inodes)))
+    return root
+
+
+def test_decode_ipv4_is_little_endian():
+    assert decode_address('0100007F:0016') == ('127.0.0.1', 22)
+    assert decode_address('0A01A8C0:01BB') == ('192.168.1.10', 443)
+
+
+def test_decode_ipv6_words_are_host_order():
+    assert decode_address('00000000000000000000000001000000:0050') == ('::1', 80)
+    assert decode_address('B80D0120000000000000000001000000:1F90') == ('2001:db8::1', 8080)
+
+
+def test_read_tcp_tables(tmp_path):
+    root = make_proc(tmp_path, {
+        'tcp': [
+            row(0, '0100007F:0016', '00000000:0000', '0A', 0, 100),
+            row(1, '0A01A8C0:C350', '08080808:0035', '01', 1000, 101)
+        ],
+        'tcp6': [row(0, 'B80D0120000000000000000001000000:1F90', '00000000000000000000000000000000:0000', '0A', 0, 102)]
+    })
+    listening, established = read_sockets(root, 'tcp')
+    assert (listening['local_address'], listening['local_port'], listening['state']) == ('127.0.0.1', 22, 'LISTEN')
+    assert (established['remote_address'], established['remote_port']) == ('8.8.8.8', 53)
+    assert (established['state'], established['uid'], established['inode']) == ('ESTABLISHED', 1000, 101)
+    [ipv6] = read_sockets(root, 'tcp6')
+    assert (ipv6['protocol'], ipv6['local_address'], ipv6['remote_address']) == ('tcp6', '2001:db8::1', '::')
+
+
+def test_udp_state_follows_the_remote_port(tmp_path):
+    root = make_proc(tmp_path, {'udp': [
+        row(0, '00000000:0044', '00000000:0000', '07', 0, 200),
+        row(1, '0A01A8C0:D431', '08080808:0035', '01', 0, 201)
+    ]})
+    assert [record['state'] for record in read_sockets(root, 'udp')] == ['UNCONN', 'ESTABLISHED']
+
+
+def test_malformed_rows_are_skipped(tmp_path):
+    root = make_proc(tmp_path, {'tcp': [
+        "  0: truncated row\n",
+        row(1, 'ZZZZZZZZ:0016', '00000000:0000', '0A', 0, 300),
+        row(2, '0100007F:0016', '00000000:0000', '0A', 'x', 301),
+        row(3, '0100007F:0017', '00000000:0000', '0A', 0, 302)
+    ]})
+    assert [record['inode'] for record in read_sockets(root, 'tcp')] == [302]
+
+
+def test_missing_tables_read_as_empty(tmp_path):
+    assert read_sockets(tmp_path, 'udp6') == []
+    assert read_arp(tmp_path) == []
+    assert read_routes(tmp_path) == []
+
+
+def test_socket_owners_map_inodes_to_processes(tmp_path):
+    root = make_proc(tmp_path, processes={42: ('sshd', [100, 102]), 77: ('curl', [101])})
+    (tmp_path / 'self').mkdir()
+    assert socket_owners(root) == {100: (42, 'sshd'), 102: (42, 'sshd'), 101: (77, 'curl')}
+
+
+def test_arp_and_routes(tmp_path):
+    root = make_proc(tmp_path)
+    (root / 'net' / 'arp').write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.168.1.1      0x1         0x2         aa:bb:cc:dd:ee:ff     *        eth0\n"
+    )
+    (root / 'net' / 'route').write_text(
+        "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+        "eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+        "eth0\tnothex\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n"
+    )
+    assert read_arp(root) == [{"ip_address": "192.168.1.1", "hw_type": "0x1", "flags": "0x2",
+                               "hw_address": "aa:bb:cc:dd:ee:ff", "device": "eth0"}]
+    [route] = read_routes(root)
+    assert (route['destination'], route['gateway'], route['metric']) == ('0.0.0.0', '192.168.1.1', 100)
+
+
+def test_collector_joins_owners_and_splits_listeners(tmp_path):
+    root = make_proc(tmp_path / 'proc', {
+        'tcp': [
+            row(0, '0100007F:0016', '00000000:0000', '0A', 0, 100),
+            row(1, '0A01A8C0:C350', '08080808:0035', '01', 1000, 101)
+        ]
+    }, {42: ('sshd', [100]), 77: ('curl', [101])})
+    config = {'collection': {'network': {'evidence_path': str(tmp_path / 'unused')}}}
+    output = NetworkCollector('case', config, root, tmp_path / 'evidence').collect()
+    reader = EvidenceReader(output)
+    [listening] = reader.iter_section('listening_ports')
+    [active] = reader.iter_section('active_connections')
+    assert (listening['pid'], listening['process']) == (42, 'sshd')
+    assert (active['pid'], active['process'], active['remote_address']) == (77, 'curl', '8.8.8.8')
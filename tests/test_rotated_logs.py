@@ -0,0 +1,88 @@
+import bz2
+import gzip
+import lzma
+import threading
+import time
+
+import pytest
+
+from analysis.rotated_logs import iter_member_blocks, iter_merged_blocks, open_member, rotated_set
+
+COMPRESSORS = {'': lambda data: data, '.gz': gzip.compress, '.bz2': bz2.compress, '.xz': lzma.compress}
+
+
+def line(second, text):
+    return f"2024-03-01T10:{second // 60:02d}:{second % 60:02d}Z {text}\n"
+
+
+def write_member(path, lines, suffix=''):
+    path = path.with_name(path.name + suffix)
+    path.write_bytes(COMPRESSORS[suffix](''.join(lines).encode()))
+    return path
+
+
+def merged_lines(members, block_size=64):
+    return ''.join(iter_merged_blocks([str(member) for member in members], block_size, 2)).splitlines()
+
+
+def readers_alive():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('rotated-') and thread.is_alive()]
+
+
+def test_members_are_ordered_oldest_first_and_limited(tmp_path):
+    log = tmp_path / 'syslog'
+    for name in ('syslog', 'syslog.1', 'syslog.2.gz', 'syslog.10.gz', 'syslog.3.xz', 'syslog-old', 'other.1'):
+        (tmp_path / name).write_text('x\n')
+    names = [path.rsplit('/', 1)[1] for path in rotated_set(log)]
+    assert names == ['syslog.10.gz', 'syslog.3.xz', 'syslog.2.gz', 'syslog.1', 'syslog']
+    # The limit counts rotated members only; the live log is always included
+    assert [path.rsplit('/', 1)[1] for path in rotated_set(log, 2)] == ['syslog.2.gz', 'syslog.1', 'syslog']
+    log.unlink()
+    assert [path.rsplit('/', 1)[1] for path in rotated_set(log, 2)] == ['syslog.2.gz', 'syslog.1']
+
+
+@pytest.mark.parametrize('suffix', list(COMPRESSORS))
+def test_members_are_decompressed_by_their_magic(tmp_path, suffix):
+    lines = [line(n, f"event {n}") for n in range(100)]
+    member = write_member(tmp_path / 'syslog.1', lines, suffix)
+    with open_member(member) as f:
+        assert f.read().decode() == ''.join(lines)
+    start = len(''.join(lines[:40]))
+    assert b''.join(iter_member_blocks(member, 100, start)).decode() == ''.join(lines[40:])
+
+
+def test_members_merge_chronologically_with_ties_in_member_order(tmp_path):
+    log = tmp_path / 'syslog'
+    oldest = write_member(log.with_name('syslog.2'), [line(n, f"two {n}") for n in range(0, 60, 3)], '.gz')
+    older = write_member(log.with_name('syslog.1'), [line(n, f"one {n}") for n in range(1, 60, 3)] +
+                         ["  continuation of one 58\n"], '.bz2')
+    newest = write_member(log, [line(n, f"live {n}") for n in range(0, 60, 2)])
+    lines = merged_lines([oldest, older, newest])
+
+    assert len(lines) == 20 + 21 + 30
+    texts = [entry.split(' ', 1)[1] if entry.startswith('2024') else entry for entry in lines]
+    seconds = [int(text.split()[-1]) for text in texts]
+    assert seconds == sorted(seconds)
+    # Equal timestamps: the older member first
+    assert texts.index('two 0') < texts.index('live 0') and texts.index('one 4') < texts.index('live 4')
+    assert texts[texts.index('one 58') + 1] == '  continuation of one 58'
+
+
+def test_closing_the_merge_early_stops_the_readers(tmp_path):
+    members = [write_member(tmp_path / f'syslog.{n}', [line(s, f"member {n} {'x' * 50}") for s in range(3000)])
+               for n in (3, 2, 1)]
+    blocks = iter_merged_blocks([str(member) for member in members], 256, 1)
+    next(blocks)
+    time.sleep(0.05)
+    assert len(readers_alive()) == 3  # each blocked on its full queue
+    blocks.close()
+    assert readers_alive() == []
+
+
+def test_a_failing_member_stops_the_others(tmp_path):
+    good = write_member(tmp_path / 'syslog.1', [line(s, 'ok') for s in range(3000)])
+    bad = tmp_path / 'syslog.2.gz'
+    bad.write_bytes(gzip.compress(b''.join(line(s, 'ok').encode() for s in range(3000)))[:200])
+    with pytest.raises(EOFError):
+        merged_lines([bad, good], block_size=128)
+    assert readers_alive() == []
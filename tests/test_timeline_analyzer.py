@@ -0,0 +1,104 @@
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from analysis.external_sort import ExternalSorter
+from analysis.timeline_analyzer import TimelineAnalyzer
+
+# Out of order, with ties: events 2, 3 and 4 share a second
+LINES = [
+    "2024-03-01T10:00:05Z event 0",
+    "2024-03-01T10:00:01Z event 1",
+    "2024-03-01T10:00:03Z event 2",
+    "2024-03-01T10:00:03Z event 3",
+    "2024-03-01T10:00:03Z event 4",
+    "2024-03-01T10:00:09Z event 5",
+    "2024-03-01T10:00:00Z event 6",
+]
+IN_ORDER = ['event 6', 'event 1', 'event 2', 'event 3', 'event 4', 'event 0', 'event 5']
+
+
+def analyzer(max_events, keep='latest', sort_buffer=100000):
+    return TimelineAnalyzer({'analysis': {'timeline_max_events': max_events, 'timeline_keep': keep,
+                                          'timeline_sort_buffer': sort_buffer}})
+
+
+def build(tmp_path, lines, **options):
+    (tmp_path / 'log_file.txt').write_text('\n'.join(lines) + '\n')
+    timeline_analyzer = analyzer(**options)
+    return timeline_analyzer, timeline_analyzer.build_timeline(tmp_path)
+
+
+def described(timeline):
+    return [event['description'].split(' ', 1)[1] for event in timeline]
+
+
+@pytest.mark.parametrize('keep, max_events, expected', [
+    ('latest', 4, IN_ORDER[-4:]),
+    ('earliest', 4, IN_ORDER[:4]),
+    ('latest', 3, ['event 4', 'event 0', 'event 5']),
+    ('earliest', 3, ['event 6', 'event 1', 'event 2']),
+    ('latest', 100, IN_ORDER),
+])
+def test_capped_timeline_keeps_latest_or_earliest_with_ties_in_line_order(tmp_path, keep, max_events, expected):
+    _, timeline = build(tmp_path, LINES, max_events=max_events, keep=keep)
+    assert isinstance(timeline, list)
+    assert described(timeline) == expected
+    assert timeline[0]['timestamp'].tzinfo is not None
+
+
+def test_uncapped_timeline_goes_through_the_external_sort(tmp_path, monkeypatch):
+    sorters = []
+    original = ExternalSorter.__init__
+
+    def recording(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        sorters.append(self)
+    monkeypatch.setattr(ExternalSorter, '__init__', recording)
+
+    _, timeline = build(tmp_path, LINES * 3, max_events=0, sort_buffer=4)
+    assert isinstance(timeline, types.GeneratorType)
+    assert len(sorters) == 1 and len(sorters[0]._runs) == 5
+    # Equal timestamps keep their line order across the spilled runs
+    lines = LINES * 3
+    expected = sorted(range(len(lines)), key=lambda n: (lines[n][:20], n))
+    assert [event['description'] for event in timeline] == [lines[n] for n in expected]
+    assert sorters[0]._runs == []
+
+
+def test_continuation_lines_inherit_the_previous_timestamp(tmp_path):
+    lines = [
+        "Traceback header without a time",
+        "  and another",
+        "2024-03-01T10:00:00Z error raised",
+        "  File \"app.py\", line 3",
+        "",
+        "    ValueError: bad",
+        "2024-03-01T10:00:02Z recovered",
+    ]
+    timeline_analyzer, timeline = build(tmp_path, lines, max_events=10)
+    assert [event['description'] for event in timeline] == [line for line in lines[2:] if line]
+    start = datetime(2024, 3, 1, 10, tzinfo=timezone.utc)
+    assert [event['timestamp'] for event in timeline[:3]] == [start] * 3
+    assert timeline_analyzer.unparsed_lines == 2
+    # The continuation lines were kept, but their timestamps failed to parse too
+    assert timeline_analyzer.parse_misses == 4
+
+
+def test_logs_without_a_known_format_count_every_line(tmp_path):
+    timeline_analyzer, timeline = build(tmp_path, ["no time here", "", "nor here"], max_events=10)
+    assert timeline == []
+    assert timeline_analyzer.unparsed_lines == timeline_analyzer.parse_misses == 2
+
+
+def test_blocks_split_mid_file_build_the_same_timeline(tmp_path):
+    lines = [f"2024-03-01T10:{n % 60:02d}:{n * 7 % 60:02d}Z event {n}" for n in range(200)]
+    (tmp_path / 'log_file.txt').write_text('\n'.join(lines) + '\n')
+    whole = analyzer(50)
+    expected = described(whole.build_timeline(tmp_path))
+    blocks = analyzer(50)
+    blocks.start(str(tmp_path / 'log_file.txt'))
+    for n in range(0, 200, 7):
+        blocks.consume(''.join(line + '\r\n' for line in lines[n:n + 7]))
+    assert described(blocks.finish()) == expected
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+import yaml
+
+from analysis import timeline_store
+from analysis.timeline_store import TimelineStore
+
+BASE = 1700000000
+TEMPLATES = os.path.join(os.path.dirname(__file__), '..', 'templates')
+
+
+def make_events(count=30):
+    # Pairs of events share a second, so ties straddle page boundaries
+    return [{'timestamp': BASE + n // 2 * 60, 'source': ('auth.log', 'syslog', 'kern.log')[n % 3],
+             'type': 'login' if n % 2 else None, 'description': f'event {n}'} for n in range(count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TimelineStore(tmp_path / 'timeline.sqlite')
+    store.record_events(make_events())
+    yield store
+    store.close()
+
+
+def described(events):
+    return [event['description'] for event in events]
+
+
+def expected(start=None, end=None, sources=None):
+    return [event['description'] for event in make_events()
+            if (start is None or event['timestamp'] >= start) and (end is None or event['timestamp'] <= end)
+            and (not sources or event['source'] in sources)]
+
+
+@pytest.mark.parametrize('start, end, sources', [
+    (None, None, None),
+    (BASE + 120, BASE + 300, None),
+    (BASE + 120, None, ['syslog']),
+    (None, BASE + 60, ['auth.log', 'kern.log']),
+    (BASE + 10000, None, None),
+])
+def test_windows_are_inclusive_and_in_insertion_order_on_ties(store, start, end, sources):
+    window = store.window(start, end, sources)
+    assert described(window) == expected(start, end, sources)
+    assert len(window) == store.count(start, end, sources) == len(expected(start, end, sources))
+
+
+def test_bounds_may_be_datetimes_or_text(store):
+    start = datetime.fromtimestamp(BASE + 120, timezone.utc)
+    end = datetime.fromtimestamp(BASE + 300, timezone.utc).isoformat()
+    assert described(store.window(start, end)) == expected(BASE + 120, BASE + 300)
+
+
+@pytest.mark.parametrize('page_size', [1, 4, 7, 30, 100])
+@pytest.mark.parametrize('sources', [None, ['syslog']])
+def test_keyset_pages_match_offset_pages(store, page_size, sources):
+    pages = list(store.pages(BASE + 60, None, sources, page_size))
+    total = store.count(BASE + 60, None, sources)
+    assert len(pages) == -(-total // page_size)
+    for number, page in enumerate(pages, 1):
+        assert page == store.page(number, page_size, BASE + 60, None, sources)
+        assert len(page) <= page_size
+    assert described(event for page in pages for event in page) == expected(BASE + 60, None, sources)
+
+
+def test_span_and_sources(store, tmp_path):
+    first, last = store.span()
+    assert first == datetime.fromtimestamp(BASE, timezone.utc)
+    assert last == datetime.fromtimestamp(BASE + 14 * 60, timezone.utc)
+    assert sorted(store.sources()) == [('auth.log', 10), ('kern.log', 10), ('syslog', 10)]
+    empty = TimelineStore(tmp_path / 'empty.sqlite')
+    assert empty.span() == (None, None) and empty.sources() == []
+    empty.close()
+
+
+@pytest.mark.parametrize('keep, descriptions', [('latest', ['event 26', 'event 27', 'event 28', 'event 29']),
+                                                ('earliest', ['event 0', 'event 1', 'event 2', 'event 3'])])
+def test_capped_timelines(store, keep, descriptions):
+    assert described(store.load_timeline(4, keep)) == descriptions
+    store.record_events(make_events(), max_events=4, keep=keep)
+    assert store.count() == 4
+
+
+def run(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, 'argv', ['timeline_store', *map(str, args)])
+    timeline_store.main()
+    return capsys.readouterr().out
+
+
+def test_cli_count_page_and_ndjson(store, monkeypatch, capsys):
+    path = store.path
+    assert run(monkeypatch, capsys, path, '--count') == '30\n'
+    assert run(monkeypatch, capsys, path, '--count', '--source', 'syslog', '--start', BASE + 60) == '9\n'
+
+    lines = run(monkeypatch, capsys, path, '--ndjson', '--page', 2, '--page-size', 4).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert described(records) == expected()[4:8]
+    assert records[0]['timestamp'] == datetime.fromtimestamp(BASE + 120, timezone.utc).isoformat()
+
+    lines = run(monkeypatch, capsys, path, '--source', 'auth.log', '--page-size', 0).splitlines()
+    assert len(lines) == 10 and lines[0].endswith('auth.log  -  event 0')
+    listed = [line.split() for line in run(monkeypatch, capsys, path, '--sources').splitlines()]
+    assert sorted(listed) == [['10', 'auth.log'], ['10', 'kern.log'], ['10', 'syslog']]
+
+
+def test_cli_report_caches_templates_next_to_the_config(store, tmp_path, monkeypatch, capsys):
+    (tmp_path / 'config').mkdir()
+    (tmp_path / 'run' / 'here').mkdir(parents=True)
+    config_path = tmp_path / 'config' / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({'reporting': {
+        'company_name': 'SOC', 'formats': ['html'], 'template_path': TEMPLATES,
+        'template_cache': '../.cache/templates'
+    }}))
+    monkeypatch.chdir(tmp_path / 'run' / 'here')
+    run(monkeypatch, capsys, store.path, '--report', tmp_path / 'report', '--config', config_path,
+        '--source', 'syslog')
+    assert (tmp_path / '.cache' / 'templates').is_dir()
+    assert not (tmp_path / 'run' / '.cache').exists()
+    assert 'event 1' in (tmp_path / 'report' / 'timeline' / 'timeline-0001.html').read_text()
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from analysis.timestamps import detect_format, make_syslog_parser, parse_timestamp
+
+REFERENCE = datetime(2024, 3, 15, tzinfo=timezone.utc)
+
+
+def epoch(*args, offset=0):
+    return datetime(*args, tzinfo=timezone(timedelta(hours=offset))).timestamp()
+
+
+SAMPLES = {
+    'iso8601': ["2024-03-01T10:00:00Z app started", "2024-03-01 10:00:01.250+02:00 request"],
+    'syslog': ["Mar  1 10:00:00 host sshd[1]: Accepted", "Mar 11 10:00:01 host cron[2]: job"],
+    'apache': ['10.0.0.1 - - [01/Mar/2024:10:00:00 +0000] "GET / HTTP/1.1" 200',
+               '10.0.0.2 - - [01/Mar/2024:11:00:01 +0100] "GET /a HTTP/1.1" 404'],
+    'epoch': ["1709287200 event=login", 'type=SYSCALL msg=audit(1709287201.123:42): arch=c000003e']
+}
+
+
+@pytest.mark.parametrize('name', SAMPLES)
+def test_detects_each_format(name):
+    assert detect_format(SAMPLES[name], REFERENCE)[0] == name
+
+
+def test_detected_parsers_give_utc_epochs():
+    parse = dict((name, detect_format(lines, REFERENCE)[1]) for name, lines in SAMPLES.items())
+    assert parse['iso8601'](SAMPLES['iso8601'][0]) == epoch(2024, 3, 1, 10, 0, 0)
+    assert parse['iso8601'](SAMPLES['iso8601'][1]) == epoch(2024, 3, 1, 10, 0, 1, 250000, offset=2)
+    assert parse['syslog'](SAMPLES['syslog'][1]) == epoch(2024, 3, 11, 10, 0, 1)
+    assert parse['apache'](SAMPLES['apache'][1]) == epoch(2024, 3, 1, 11, 0, 1, offset=1)
+    assert parse['epoch'](SAMPLES['epoch'][1]) == pytest.approx(1709287201.123)
+
+
+def test_majority_format_wins_and_unknown_lines_give_none():
+    lines = SAMPLES['syslog'] + ["2024-03-01T10:00:00Z one iso line", "no timestamp here"]
+    name, parser = detect_format(lines, REFERENCE)
+    assert name == 'syslog'
+    assert parser("no timestamp here") is None
+    assert detect_format(["nothing", "to see"], REFERENCE) == (None, None)
+
+
+def test_syslog_months_after_the_reference_are_last_year():
+    parse = make_syslog_parser(REFERENCE)
+    assert parse("Dec 31 23:59:59 host kernel: x") == epoch(2023, 12, 31, 23, 59, 59)
+    assert parse("Mar 15 00:00:00 host kernel: x") == epoch(2024, 3, 15)
+    assert parse("Foo 15 00:00:00 host kernel: x") is None
+
+
+@pytest.mark.parametrize('value, expected', [
+    (datetime(2024, 3, 1, 10), epoch(2024, 3, 1, 10)),
+    (datetime(2024, 3, 1, 10, tzinfo=timezone(timedelta(hours=-5))), epoch(2024, 3, 1, 10, offset=-5)),
+    (1709287200, 1709287200.0),
+    ("2024-03-01T10:00:00+02:00", epoch(2024, 3, 1, 10, offset=2)),
+    ("  1709287200.5 ", 1709287200.5),
+    ("[01/Mar/2024:10:00:00 +0000]", epoch(2024, 3, 1, 10)),
+    ("2024-03-01", epoch(2024, 3, 1)),
+])
+def test_parse_timestamp(value, expected):
+    assert parse_timestamp(value) == expected
+
+
+def test_parse_timestamp_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_timestamp("yesterday")
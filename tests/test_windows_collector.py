@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from analysis.timestamps import parse_timestamp
+from collectors import windows_collector
+from collectors.windows_collector import WindowsCollector
+
+CONFIG = {'collection': {'windows': {'max_logs': 10}}}
+
+
+class FakeProcess:
+    def __init__(self, **info):
+        self.info = info
+
+
+@pytest.fixture
+def eastern_time(monkeypatch):
+    """Run with a local time zone five hours behind UTC."""
+    monkeypatch.setenv('TZ', 'EST+5')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_process_create_time_is_utc(tmp_path, monkeypatch, eastern_time):
+    created = 1700000000.5
+    monkeypatch.setattr(windows_collector.psutil, 'process_iter', lambda attrs: iter([
+        FakeProcess(pid=4, name='System', username=None, create_time=created),
+        FakeProcess(pid=8, name='gone.exe', username=None, create_time=None)
+    ]))
+    processes = list(WindowsCollector(CONFIG, 'missing.log', tmp_path)._get_processes())
+    assert processes[0]['create_time'].endswith('+00:00')
+    assert parse_timestamp(processes[0]['create_time']) == created
+    assert processes[1]['create_time'] is None